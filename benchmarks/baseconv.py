@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Callable
+
+from utils.baseconv import BASES, decode, encode
+
+__all__ = (
+    'TEXTS',
+    'run',
+)
+
+_FORMATS = {2: '08b', 8: '03o', 10: 'd', 16: '02x'}
+
+TEXTS: dict[str, str] = {
+    'ascii': 'The quick brown fox jumps over the lazy dog. 0123456789\n',
+    # three UTF-8 bytes per character
+    'thai': 'สวัสดีครับเพื่อน ๆ นักศึกษาวิทยาการคอมพิวเตอร์ มหาวิทยาลัยรามคำแหง\n',
+    'mixed': 'RU CS ยินดีต้อนรับ, tag list @member แสดงแท็กทั้งหมด 42\n',
+}
+
+
+def _naive_encode(text: str, base: int) -> str:
+    # a format() call per byte, what the tables and bytes.hex replace
+    return ' '.join(format(byte, _FORMATS[base]) for byte in text.encode('utf-8'))
+
+
+def _throughput(convert: Callable[[], Any], chars: int, seconds: float) -> float:
+    runs = 0
+    started_at = time.perf_counter()
+    while True:
+        convert()
+        runs += 1
+        elapsed = time.perf_counter() - started_at
+        if elapsed >= seconds:
+            return chars * runs / elapsed
+
+
+def run(*, chars: int = 100_000, seconds: float = 0.5) -> list[dict[str, Any]]:
+    """Converts about ``chars`` characters of each of :data:`TEXTS` in every base.
+
+    Reports characters of the original text per second for :func:`encode`,
+    :func:`decode` of its output and a naive per byte ``format`` encoder, and
+    whether the text survives the round trip.
+    """
+    results = []
+    for name, sample in TEXTS.items():
+        text = sample * max(1, chars // len(sample))
+        for base in BASES:
+            encoded = encode(text, base)
+            results.append({
+                'text': name,
+                'base': base,
+                'chars': len(text),
+                'bytes': len(text.encode('utf-8')),
+                'encode': _throughput(lambda: encode(text, base), len(text), seconds),
+                'decode': _throughput(lambda: decode(encoded, base), len(text), seconds),
+                'naive_encode': _throughput(lambda: _naive_encode(text, base), len(text), seconds),
+                'round_trip': decode(encoded, base) == text,
+            })
+    return results
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import time
+import asyncio
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Awaitable, Callable
+
+from utils.calculator import CalculationError, Calculator, evaluate
+from utils.stats import LatencyHistogram, LoopLagMonitor
+
+__all__ = (
+    'HOSTILE',
+    'run',
+)
+
+# what people send to a public calculator, all within MAX_EXPRESSION_LENGTH
+HOSTILE: tuple[str, ...] = (
+    '9**9**9',
+    '2**3322 - 1',
+    '(2**3000) * (3**1800)',
+    '1 << 3300',
+    'factorial(450)',
+    'factorial(450) // factorial(449) + factorial(448) % 97',
+    # round(1, -n) builds 10 ** n, seconds of CPU before it was capped
+    'round(1, -9999999)',
+    'round(1, -99999999)',
+    'round(2.5, 99999999)',
+    '-' * 200 + '1',
+    '(' * 90 + '1' + ')' * 90,
+    '1' + ' * 7' * 63,
+    '10**308 * 10.0',
+    'sqrt(-1)',
+    '__import__("os").system("true")',
+)
+
+
+async def _measure(
+        name: str,
+        evaluate_one: Callable[[str], Awaitable[Any]],
+        expressions: int,
+        concurrency: int,
+        interval: float,
+) -> dict[str, Any]:
+    histogram = LatencyHistogram()
+    monitor = LoopLagMonitor(histogram, interval=interval)
+    monitor.start()
+    # a few undisturbed samples first
+    await asyncio.sleep(interval * 4)
+
+    queue = itertools.islice(itertools.cycle(HOSTILE), expressions)
+    rejected = 0
+
+    async def worker() -> None:
+        nonlocal rejected
+        for expression in queue:
+            try:
+                await evaluate_one(expression)
+            except CalculationError:
+                rejected += 1
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started_at
+    monitor.stop()
+
+    return {
+        'mode': name,
+        'expressions': expressions,
+        'rejected': rejected,
+        'elapsed': elapsed,
+        'lag_samples': histogram.count,
+        'lag_p50': histogram.quantile(0.5),
+        'lag_p99': histogram.quantile(0.99),
+        'lag_max': histogram.max,
+    }
+
+
+async def run(
+        *,
+        expressions: int = 3000,
+        concurrency: int = 4,
+        interval: float = 0.005,
+        slow: int = 8,
+        slow_digits: int = 2_000_000,
+) -> list[dict[str, Any]]:
+    """Evaluates :data:`HOSTILE` expressions while :class:`LoopLagMonitor` samples the event loop.
+
+    ``pool`` goes through :class:`Calculator`, the way ``calculate`` does.
+    ``inline`` runs the same sandboxed :func:`evaluate` on the event loop,
+    yielding between expressions, which is what the pool keeps off the loop.
+    ``idle`` only sleeps for as long as the pool took, as the baseline. Lag
+    is how late an ``interval`` second sleep wakes up.
+
+    The caps reject every :data:`HOSTILE` expression quickly, so ``slow
+    inline`` and ``slow pool`` stand in for one they miss: ``slow`` calls of
+    the uncapped ``round(1, -slow_digits)``, on the loop and in spawned
+    worker processes.
+    """
+    calculator = Calculator()
+    calculator.warm_up()
+    try:
+        # wait for the workers, starting them isn't what's measured
+        await calculator.evaluate('0')
+        pool = await _measure('pool', calculator.evaluate, expressions, concurrency, interval)
+    finally:
+        calculator.close()
+
+    async def sleep(expression: str) -> None:
+        await asyncio.sleep(pool['elapsed'] * concurrency / expressions)
+
+    async def inline(expression: str) -> str:
+        await asyncio.sleep(0)
+        return evaluate(expression)
+
+    idle = await _measure('idle', sleep, expressions, concurrency, interval)
+    results = [idle, pool, await _measure('inline', inline, expressions, concurrency, interval)]
+
+    async def slow_inline(expression: str) -> int:
+        await asyncio.sleep(0)
+        return round(1, -slow_digits)
+
+    executor = ProcessPoolExecutor(max_workers=concurrency, mp_context=multiprocessing.get_context('spawn'))
+    try:
+        loop = asyncio.get_running_loop()
+        # start the workers before measuring, like warm_up does
+        await asyncio.gather(*(loop.run_in_executor(executor, round, 0) for _ in range(concurrency)))
+
+        async def slow_pool(expression: str) -> int:
+            return await loop.run_in_executor(executor, round, 1, -slow_digits)
+
+        results.append(await _measure('slow inline', slow_inline, slow, concurrency, interval))
+        results.append(await _measure('slow pool', slow_pool, slow, concurrency, interval))
+    finally:
+        executor.shutdown(cancel_futures=True)
+    return results
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import time
+import random
+import asyncio
+import statistics
+from typing import Any, Awaitable, Callable
+
+import asyncpg
+import discord
+
+from utils.db import PoolConfig, create_pool, init_connection
+from utils.queries import PreparedConnection, registry
+from utils.tag_queries import TAG_GET, TAG_INSERT
+
+__all__ = (
+    'BENCH_GUILD_ID',
+    'prepared_vs_adhoc',
+    'create_race',
+    'bulk_create',
+)
+
+# no real guild has a negative ID, so the rows the benchmarks make are easy to clean up
+BENCH_GUILD_ID = -1
+
+
+async def _cleanup(con: asyncpg.Connection) -> None:
+    await con.execute('DELETE FROM rucs_tags WHERE guild_id=$1;', BENCH_GUILD_ID)
+
+
+async def _seed(con: asyncpg.Connection, tags: int) -> list[str]:
+    names = [f'bench tag {i}' for i in range(tags)]
+    await con.copy_records_to_table(
+        'rucs_tags',
+        records=[(name, f'content of {name}', 0, BENCH_GUILD_ID) for name in names],
+        columns=('name', 'content', 'owner_id', 'guild_id'),
+    )
+    return names
+
+
+async def _time(lookup: Callable[[str], Awaitable[Any]], names: list[str], iterations: int) -> dict[str, float]:
+    rng = random.Random(0)
+    # warm up, the first call of every mode pays for connecting and planning
+    for name in names[:10]:
+        await lookup(name)
+
+    latencies = []
+    started_at = time.perf_counter()
+    for _ in range(iterations):
+        name = rng.choice(names)
+        start = time.perf_counter()
+        await lookup(name)
+        latencies.append(time.perf_counter() - start)
+    elapsed = time.perf_counter() - started_at
+
+    latencies.sort()
+    return {
+        'p50': statistics.median(latencies),
+        'p95': latencies[int(len(latencies) * 0.95)],
+        'per_second': iterations / elapsed,
+    }
+
+
+async def prepared_vs_adhoc(dsn: str, *, tags: int = 1000, iterations: int = 5000) -> list[dict[str, Any]]:
+    """Looks tags up with ``TAG_GET`` one query at a time, three ways.
+
+    ``ad-hoc`` turns asyncpg's statement cache off, so every call parses and
+    plans the query again. ``cached`` is a plain connection with asyncpg's
+    default statement cache. ``registry`` is how the bot runs it, a
+    :class:`PreparedConnection` set up by :func:`init_connection` and queried
+    through the registry. ``tags`` rows are added to :data:`BENCH_GUILD_ID`
+    and removed again afterwards.
+    """
+    setup = await asyncpg.connect(dsn)
+    try:
+        await _cleanup(setup)
+        names = await _seed(setup, tags)
+
+        modes: dict[str, Callable[[], Awaitable[asyncpg.Connection]]] = {
+            'ad-hoc': lambda: asyncpg.connect(dsn, statement_cache_size=0),
+            'cached': lambda: asyncpg.connect(dsn),
+            'registry': lambda: asyncpg.connect(dsn, connection_class=PreparedConnection),
+        }
+
+        results = []
+        for mode, connect in modes.items():
+            con = await connect()
+            try:
+                if mode == 'registry':
+                    await init_connection(con)
+
+                    async def lookup(name: str) -> Any:
+                        return await registry.fetchrow(con, TAG_GET, BENCH_GUILD_ID, name)
+                else:
+                    async def lookup(name: str) -> Any:
+                        return await con.fetchrow(TAG_GET.sql, BENCH_GUILD_ID, name)
+
+                results.append({'mode': mode, 'iterations': iterations, **await _time(lookup, names, iterations)})
+            finally:
+                await con.close()
+        return results
+    finally:
+        await _cleanup(setup)
+        await setup.close()
+
+
+class _Bot:
+    def __init__(self, pool: asyncpg.Pool) -> None:
+        self.pool: asyncpg.Pool = pool
+
+
+class _Context:
+    """Just enough of :class:`GuildContext` for :meth:`TagCommands.create_tag`."""
+
+    def __init__(self, pool: asyncpg.Pool, author_id: int) -> None:
+        self.db: asyncpg.Pool = pool
+        self.author = discord.Object(id=author_id)
+        self.guild = discord.Object(id=BENCH_GUILD_ID)
+        self.sent: list[str] = []
+
+    async def send(self, content: str) -> None:
+        self.sent.append(content)
+
+
+def _cog(pool: asyncpg.Pool) -> Any:
+    # imported here, cogs pull in the rest of the bot
+    from cogs.tags import TagCommands
+
+    return TagCommands(_Bot(pool))  # type: ignore
+
+
+async def create_race(dsn: str, *, contenders: int = 50, rounds: int = 10) -> dict[str, Any]:
+    """Has ``contenders`` members create the same tag at the same moment, ``rounds`` times.
+
+    Goes through :meth:`TagCommands.create_tag` on a pool like the bot's, so
+    exactly one of them should be told the tag was created each round and the
+    rest that it already exists, with one row per round owned by the winner.
+    """
+    config = PoolConfig(dsn, min_size=contenders, max_size=contenders, connect_retries=1)
+    pool = await create_pool(config)
+    try:
+        await _cleanup(pool)
+        cog = _cog(pool)
+        created = duplicates = errors = owners_match = 0
+        started_at = time.perf_counter()
+        for round_number in range(rounds):
+            name = f'race tag {round_number}'
+            contexts = [_Context(pool, author_id) for author_id in range(1, contenders + 1)]
+            await asyncio.gather(*(cog.create_tag(ctx, name, f'content from {ctx.author.id}') for ctx in contexts))
+
+            winners = [ctx for ctx in contexts if ctx.sent == [f'สร้างแท็ก `{name}` สำเร็จแล้ว.']]
+            created += len(winners)
+            duplicates += sum(ctx.sent == [f'แท็ก `{name}` มีอยู่แล้ว.'] for ctx in contexts)
+            errors += sum(ctx.sent == ['ไม่สามารถสร้างแท็ก.'] for ctx in contexts)
+            owner_id = await pool.fetchval(
+                'SELECT owner_id FROM rucs_tags WHERE guild_id=$1 AND LOWER(name)=$2;', BENCH_GUILD_ID, name
+            )
+            owners_match += len(winners) == 1 and winners[0].author.id == owner_id
+
+        rows = await pool.fetchval('SELECT COUNT(*) FROM rucs_tags WHERE guild_id=$1;', BENCH_GUILD_ID)
+        return {
+            'contenders': contenders,
+            'rounds': rounds,
+            'created': created,
+            'duplicates': duplicates,
+            'errors': errors,
+            'rows': rows,
+            'owners_match': owners_match,
+            'elapsed': time.perf_counter() - started_at,
+        }
+    finally:
+        await _cleanup(pool)
+        await pool.close()
+
+
+async def bulk_create(dsn: str, *, tags: int = 10000) -> list[dict[str, Any]]:
+    """Creates ``tags`` tags one ``TAG_INSERT`` at a time, then with :meth:`TagCommands.bulk_create_tags`.
+
+    The bulk path runs twice over the same names, the second time everything
+    already exists and nothing should be created.
+    """
+    con = await asyncpg.connect(dsn, connection_class=PreparedConnection)
+    try:
+        await init_connection(con)
+        await _cleanup(con)
+        records = [(f'bulk tag {i}', f'content of bulk tag {i}', 0, BENCH_GUILD_ID) for i in range(tags)]
+        results = []
+
+        started_at = time.perf_counter()
+        created = 0
+        for record in records:
+            created += await registry.fetchval(con, TAG_INSERT, *record) is not None
+        results.append({'mode': 'insert', 'tags': tags, 'created': created, 'elapsed': time.perf_counter() - started_at})
+        await _cleanup(con)
+
+        cog = _cog(None)  # type: ignore
+        for mode in ('copy', 'copy again'):
+            started_at = time.perf_counter()
+            created = len(await cog.bulk_create_tags(con, records))
+            results.append({'mode': mode, 'tags': tags, 'created': created, 'elapsed': time.perf_counter() - started_at})
+        return results
+    finally:
+        await _cleanup(con)
+        await con.close()
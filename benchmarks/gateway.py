@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import gc
+import random
+import tracemalloc
+from typing import Any
+
+import discord
+
+from utils.config import GatewayConfig
+
+__all__ = (
+    'replay',
+)
+
+GUILD_ID = 900000000000000000
+CHANNEL_ID = 900000000000000001
+ROLE_IDS = (994917404859711528, 994917240711413831, 994917733030436954)
+_TIMESTAMP = '2022-07-08T00:00:00.000000+00:00'
+
+
+def _user(user_id: int) -> dict[str, Any]:
+    return {
+        'id': str(user_id),
+        'username': f'student{user_id % 1_000_000}',
+        'discriminator': '0',
+        'global_name': f'Student {user_id % 1_000_000}',
+        'avatar': None,
+    }
+
+
+def _member(user_id: int, rng: random.Random) -> dict[str, Any]:
+    return {
+        'user': _user(user_id),
+        'roles': [str(rng.choice(ROLE_IDS))],
+        'joined_at': _TIMESTAMP,
+        'nick': None,
+        'deaf': False,
+        'mute': False,
+        'flags': 0,
+    }
+
+
+def _guild(members: list[dict[str, Any]], member_count: int) -> dict[str, Any]:
+    everyone = {'id': str(GUILD_ID), 'name': '@everyone', 'permissions': '1071698660929', 'position': 0,
+                'color': 0, 'hoist': False, 'managed': False, 'mentionable': False, 'flags': 0}
+    roles = [everyone] + [
+        {**everyone, 'id': str(role_id), 'name': f'role-{i}', 'position': i + 1}
+        for i, role_id in enumerate(ROLE_IDS)
+    ]
+    return {
+        'id': str(GUILD_ID),
+        'name': 'RU Computer Science',
+        'owner_id': '240059262297047041',
+        'member_count': member_count,
+        'roles': roles,
+        'channels': [{'id': str(CHANNEL_ID), 'type': 0, 'name': 'general', 'position': 0,
+                      'permission_overwrites': []}],
+        'members': members,
+        'presences': [],
+        'voice_states': [],
+        'threads': [],
+        'emojis': [],
+        'stickers': [],
+        'features': [],
+    }
+
+
+def _message(message_id: int, member: dict[str, Any]) -> dict[str, Any]:
+    author = member['user']
+    partial_member = {key: value for key, value in member.items() if key != 'user'}
+    return {
+        'id': str(message_id),
+        'type': 0,
+        'channel_id': str(CHANNEL_ID),
+        'guild_id': str(GUILD_ID),
+        'author': author,
+        'member': partial_member,
+        'content': 'สวัสดีครับ ' * 4,
+        'timestamp': _TIMESTAMP,
+        'edited_timestamp': None,
+        'tts': False,
+        'mention_everyone': False,
+        'mentions': [],
+        'mention_roles': [],
+        'attachments': [],
+        'embeds': [],
+        'pinned': False,
+    }
+
+
+def _presence(user_id: int) -> dict[str, Any]:
+    return {
+        'user': {'id': str(user_id)},
+        'guild_id': str(GUILD_ID),
+        'status': 'online',
+        'client_status': {'desktop': 'online'},
+        'activities': [{'type': 0, 'name': 'Visual Studio Code', 'created_at': 0}],
+    }
+
+
+def replay(config: GatewayConfig, *, members: int = 10_000, messages: int = 5_000, seed: int = 0) -> dict[str, Any]:
+    """Feeds synthetic gateway payloads into a fresh connection state and measures what stays in memory.
+
+    The guild is delivered fully populated, as if it had been chunked, only
+    when the profile chunks at startup. After that every member sends a presence
+    update (if presences are enabled), 1% of the members join, and ``messages``
+    messages are sent by random members. Nothing connects to Discord.
+    """
+    rng = random.Random(seed)
+    member_payloads = [_member(GUILD_ID + 1 + i, rng) for i in range(members)]
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        client = discord.Client(**config.client_options())
+        state = client._connection
+        intents = config.intents
+
+        state.parse_guild_create(_guild(member_payloads if config.chunk_guilds_at_startup else [], members))
+
+        if intents.presences:
+            for payload in member_payloads:
+                state.parse_presence_update(_presence(int(payload['user']['id'])))
+
+        if intents.members:
+            for i in range(members // 100):
+                state.parse_guild_member_add({**_member(GUILD_ID + members + 1 + i, rng), 'guild_id': str(GUILD_ID)})
+
+        if intents.guild_messages:
+            for i in range(messages):
+                state.parse_message_create(_message(CHANNEL_ID + 1 + i, rng.choice(member_payloads)))
+
+        # only what the state still references should count
+        del member_payloads
+        gc.collect()
+        used = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+
+    guild = client.get_guild(GUILD_ID)
+    return {
+        'profile': config.profile,
+        'members': members,
+        'messages': messages,
+        'cached_members': len(guild.members) if guild else 0,
+        'cached_messages': len(client.cached_messages),
+        'bytes': used,
+        'bytes_per_10k_members': used * 10_000 // members,
+    }
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import os
+import time
+import random
+import tempfile
+from typing import Any, Callable
+
+from utils.useful import LineCountIndex
+
+__all__ = (
+    'make_tree',
+    'run',
+)
+
+
+def make_tree(root: str, *, files: int, per_directory: int = 50, seed: int = 0) -> int:
+    """Writes ``files`` Python files of random length under ``root`` and returns their total lines.
+
+    Every directory also gets a ``__pycache__`` and a hidden directory, which
+    the index has to skip, and a file that isn't Python.
+    """
+    rng = random.Random(seed)
+    total = 0
+    for directory_number in range(0, files, per_directory):
+        directory = os.path.join(root, *(f'package{part}' for part in str(directory_number // per_directory)))
+        for skipped in ('__pycache__', '.hidden'):
+            os.makedirs(os.path.join(directory, skipped), exist_ok=True)
+            with open(os.path.join(directory, skipped, 'skipped.py'), 'w') as fp:
+                fp.write('x = 1\n' * 100)
+        with open(os.path.join(directory, 'README.md'), 'w') as fp:
+            fp.write('not counted\n' * 10)
+
+        for file_number in range(directory_number, min(directory_number + per_directory, files)):
+            lines = rng.randint(1, 600)
+            with open(os.path.join(directory, f'module{file_number}.py'), 'w') as fp:
+                fp.write(''.join(f'value_{i} = {i}  # a line of code\n' for i in range(lines)))
+            total += lines
+    return total
+
+
+def _readlines(root: str) -> int:
+    # a full walk reading every file with readlines(), what count_python used to attempt
+    total = 0
+    for directory, directories, names in os.walk(root):
+        directories[:] = [name for name in directories if not name.startswith('.') and name != '__pycache__']
+        for name in names:
+            if name.endswith('.py'):
+                with open(os.path.join(directory, name), encoding='utf-8') as fp:
+                    total += len(fp.readlines())
+    return total
+
+
+def _timed(function: Callable[[], int]) -> tuple[int, float]:
+    started_at = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started_at
+
+
+def run(*, files: int = 5000, changed: float = 0.01, seed: int = 0) -> list[dict[str, Any]]:
+    """Counts the lines of a synthetic tree of ``files`` Python files in several ways.
+
+    ``readlines`` reads every file on every call. ``cold`` is the first
+    :meth:`LineCountIndex.refresh`, ``warm`` one with nothing changed and
+    ``changed`` one after a ``changed`` fraction of the files grew by a line.
+    """
+    with tempfile.TemporaryDirectory() as root:
+        expected = make_tree(root, files=files, seed=seed)
+        index = LineCountIndex(root)
+        results = []
+
+        def record(mode: str, function: Callable[[], int], expected: int) -> None:
+            total, elapsed = _timed(function)
+            results.append({'mode': mode, 'files': files, 'lines': total, 'correct': total == expected, 'elapsed': elapsed})
+
+        record('readlines', lambda: _readlines(root), expected)
+        record('cold', index.refresh, expected)
+        record('warm', index.refresh, expected)
+
+        rng = random.Random(seed)
+        paths = sorted(index._files)
+        touched = rng.sample(paths, max(1, int(len(paths) * changed)))
+        for path in touched:
+            with open(path, 'a') as fp:
+                fp.write('appended = True\n')
+        record('changed', index.refresh, expected + len(touched))
+        return results
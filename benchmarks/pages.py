@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import time
+import bisect
+import asyncio
+import statistics
+from typing import Any, Callable, Optional
+
+import discord
+
+from utils.paginator import FieldPageSource, KeysetPages, KeysetPageSource, RUCS_Pages, SimplePages, TextPageSource
+from utils.stats import CommandStats
+from utils.view_manager import ViewManager
+
+__all__ = (
+    'run',
+)
+
+
+class _Permissions:
+    embed_links = True
+
+
+class _Channel:
+    def permissions_for(self, member: Any) -> _Permissions:
+        return _Permissions()
+
+
+class _Bot:
+    def __init__(self) -> None:
+        self.command_stats = CommandStats()
+        self.view_manager = ViewManager()
+        self.owner_id = 0
+
+
+class _Context:
+    """Just enough of :class:`commands.Context` to start a paginator without Discord."""
+
+    def __init__(self) -> None:
+        self.bot = _Bot()
+        self.author = discord.Object(id=0)
+        self.channel = _Channel()
+        self.me = None
+
+    async def send(self, **kwargs: Any) -> None:
+        return None
+
+
+class _Response:
+    def is_done(self) -> bool:
+        return False
+
+    async def edit_message(self, **kwargs: Any) -> None:
+        pass
+
+
+class _Interaction:
+    def __init__(self) -> None:
+        self.response = _Response()
+
+
+def _keyset(entries: list[str], fetch_latency: float) -> KeysetPageSource:
+    # entries are sorted, so an entry is its own key
+    async def fetch(after: Optional[str], limit: int) -> list[str]:
+        # a query to a local database
+        await asyncio.sleep(fetch_latency)
+        start = 0 if after is None else bisect.bisect_right(entries, after)
+        return entries[start:start + limit]
+
+    async def fetch_before(before: Optional[str], limit: int) -> list[str]:
+        await asyncio.sleep(fetch_latency)
+        end = len(entries) if before is None else bisect.bisect_left(entries, before)
+        return entries[max(0, end - limit):end][::-1]
+
+    async def count() -> int:
+        return len(entries)
+
+    return KeysetPageSource(fetch, key=lambda entry: entry, count=count, fetch_before=fetch_before)
+
+
+def _sources(pages: int, fetch_latency: float) -> dict[str, Callable[[_Context], RUCS_Pages]]:
+    entries = [f'entry number {i:06} with a bit of text after it' for i in range(pages * 12)]
+    fields = [(f'field {i}', f'value of field {i} ' * 4) for i in range(pages * 12)]
+    text = '\n'.join(f'{i:>6} | some output line from a long running program' for i in range(pages * 30))
+    return {
+        'SimplePages': lambda ctx: SimplePages(entries, ctx=ctx, per_page=12),
+        'FieldPageSource': lambda ctx: RUCS_Pages(FieldPageSource(fields, per_page=12), ctx=ctx),
+        'TextPageSource': lambda ctx: RUCS_Pages(TextPageSource(text), ctx=ctx, check_embeds=False),
+        'KeysetPageSource': lambda ctx: KeysetPages(_keyset(entries, fetch_latency), ctx=ctx),
+    }
+
+
+def _orders(max_pages: int) -> dict[str, list[int]]:
+    # forward through every page and back again
+    sweep = list(range(1, max_pages)) + list(range(max_pages - 2, -1, -1))
+    # reading along but going back a page now and then: 1, 0, 1, 2, 1, 2, 3, ...
+    rereading = []
+    for page_number in range(1, max_pages):
+        rereading += [page_number, page_number - 1, page_number]
+    return {'sweep': sweep, 'reread': rereading}
+
+
+async def _flip(menu: RUCS_Pages, pattern: str, think: float) -> dict[str, Any]:
+    renders = 0
+    render_time = 0.0
+    format_page = menu.source.format_page
+
+    async def counted(*args: Any) -> Any:
+        nonlocal renders, render_time
+        renders += 1
+        started_at = time.perf_counter()
+        try:
+            return await format_page(*args)
+        finally:
+            render_time += time.perf_counter() - started_at
+
+    menu.source.format_page = counted  # type: ignore
+    await menu.start()
+    if isinstance(menu.source, KeysetPageSource):
+        await menu.source.fetch_max_pages()
+
+    order = _orders(menu.source.get_max_pages())[pattern]
+    interaction = _Interaction()
+    presses = []
+    cpu_started_at = time.process_time()
+    for page_number in order:
+        # the user looks at the page for a moment, which is when prefetching happens
+        await asyncio.sleep(think)
+        started_at = time.perf_counter()
+        await menu.show_page(interaction, page_number)
+        presses.append(time.perf_counter() - started_at)
+
+    # let the last prefetch finish, it's part of the cost
+    if menu._prefetch_task is not None:
+        await asyncio.gather(menu._prefetch_task, return_exceptions=True)
+    cpu = time.process_time() - cpu_started_at
+    menu.stop()
+
+    presses.sort()
+    return {
+        'presses': len(presses),
+        'renders': renders,
+        'render_total': render_time,
+        'cpu_per_press': cpu / len(presses),
+        'press_p50': statistics.median(presses),
+        'press_p95': presses[int(len(presses) * 0.95)],
+    }
+
+
+async def run(
+        *,
+        pages: int = 500,
+        cache_size: int = 16,
+        think: float = 0.001,
+        fetch_latency: float = 0.0005,
+) -> list[dict[str, Any]]:
+    """Flips through ``pages`` pages with and without the page cache, in two patterns.
+
+    ``sweep`` goes forward through every page and back again, ``reread`` goes
+    back one page after every step forward. A press is the time spent inside
+    :meth:`RUCS_Pages.show_page`, the edit itself goes to a fake interaction.
+    ``renders`` and ``render_total`` count every ``format_page`` call, the
+    prefetched ones included, and ``cpu_per_press`` is the process CPU time of
+    the whole run, prefetch tasks and the wait for the last one included,
+    divided by the presses. :class:`KeysetPageSource` waits ``fetch_latency``
+    seconds per query, the only source that is prefetched.
+    """
+    results = []
+    for name, make in _sources(pages, fetch_latency).items():
+        for size in (0, cache_size):
+            for pattern in ('sweep', 'reread'):
+                menu = make(_Context())
+                menu.cache_size = size
+                result = await _flip(menu, pattern, think)
+                result.update(source=name, cache_size=size, pattern=pattern, pages=menu.source.get_max_pages())
+                results.append(result)
+    return results
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import time
+import random
+import asyncio
+import statistics
+from collections import deque
+from typing import Any, Optional
+
+from utils.roles import RoleAssignmentQueue
+
+__all__ = (
+    'FakeRoleHTTP',
+    'run',
+)
+
+GUILD_ID = 900000000000000000
+ROLE_IDS = (994917404859711528, 994917240711413831, 994917733030436954)
+# given by a moderator in the middle of the burst, it has to survive the role queue
+MOD_ROLE_ID = 994917000000000000
+
+
+class _Object:
+    __slots__ = ('id',)
+
+    def __init__(self, id: int) -> None:
+        self.id: int = id
+
+
+class _Member:
+    """Just enough of :class:`discord.Member` for :meth:`RoleAssignmentQueue.toggle`.
+
+    The roles are read from the fake HTTP client, like the member cache catching
+    up through the gateway once a request went through.
+    """
+
+    __slots__ = ('id', 'guild', 'http')
+
+    def __init__(self, id: int, guild: _Object, http: FakeRoleHTTP) -> None:
+        self.id: int = id
+        self.guild: _Object = guild
+        self.http: FakeRoleHTTP = http
+
+    @property
+    def roles(self) -> list[_Object]:
+        return [self.guild] + [_Object(role_id) for role_id in self.http.roles.get(self.id, ())]
+
+
+class FakeRoleHTTP:
+    """Stands in for :class:`discord.http.HTTPClient` with a per guild rate limit.
+
+    Requests over ``limit`` per ``per`` seconds count as one 429 and are retried
+    after the bucket frees up, the way discord.py's client handles them.
+    """
+
+    def __init__(self, *, limit: int, per: float, latency: float = 0.05) -> None:
+        self.limit: int = limit
+        self.per: float = per
+        self.latency: float = latency
+        self.requests: int = 0
+        self.rate_limited: int = 0
+        self.roles: dict[int, set[int]] = {}
+        self.applied_at: dict[int, float] = {}
+        self._sent: deque[float] = deque()
+
+    async def _request(self) -> None:
+        limited = False
+        while True:
+            now = time.monotonic()
+            while self._sent and now - self._sent[0] >= self.per:
+                self._sent.popleft()
+            if len(self._sent) < self.limit:
+                self._sent.append(now)
+                self.requests += 1
+                await asyncio.sleep(self.latency)
+                return
+            if not limited:
+                limited = True
+                self.rate_limited += 1
+            await asyncio.sleep(self.per - (now - self._sent[0]))
+
+    async def add_role(self, guild_id: int, user_id: int, role_id: int, *, reason: Optional[str] = None) -> None:
+        await self._request()
+        self.roles.setdefault(user_id, set()).add(role_id)
+        self.applied_at[user_id] = time.monotonic()
+
+    async def remove_role(self, guild_id: int, user_id: int, role_id: int, *, reason: Optional[str] = None) -> None:
+        await self._request()
+        self.roles.setdefault(user_id, set()).discard(role_id)
+        self.applied_at[user_id] = time.monotonic()
+
+    async def edit_member(self, guild_id: int, user_id: int, *, reason: Optional[str] = None, **fields: Any) -> None:
+        await self._request()
+        self.roles[user_id] = set(fields['roles'])
+        self.applied_at[user_id] = time.monotonic()
+
+
+def _clicks(members: int, clicks: int, burst: float, rng: random.Random) -> list[tuple[float, int, int]]:
+    # (offset, member, role), a few members click the same button again to undo it
+    schedule = []
+    for member_id in range(1, members + 1):
+        for _ in range(rng.randint(1, clicks)):
+            schedule.append((rng.uniform(0, burst), member_id, rng.choice(ROLE_IDS)))
+    schedule.sort()
+    return schedule
+
+
+async def _replay(schedule: list[tuple[float, int, int]], click) -> float:
+    start = time.monotonic()
+    for offset, member_id, role_id in schedule:
+        delay = start + offset - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        click(member_id, role_id)
+    return start
+
+
+def _moderated(schedule: list[tuple[float, int, int]]) -> set[int]:
+    return {member_id for _, member_id, _ in schedule if member_id % 4 == 0}
+
+
+async def _moderate(http: FakeRoleHTTP, members: set[int], delay: float) -> None:
+    # a moderator hands out a role while the clicks come in, through another
+    # client, so it doesn't count against the bot's rate limit
+    await asyncio.sleep(delay)
+    for member_id in members:
+        http.roles.setdefault(member_id, set()).add(MOD_ROLE_ID)
+
+
+def _expected(schedule: list[tuple[float, int, int]]) -> dict[int, set[int]]:
+    roles: dict[int, set[int]] = {}
+    for _, member_id, role_id in schedule:
+        roles.setdefault(member_id, set()).symmetric_difference_update({role_id})
+    for member_id in _moderated(schedule):
+        roles[member_id].add(MOD_ROLE_ID)
+    return roles
+
+
+def _summary(name: str, http: FakeRoleHTTP, schedule: list[tuple[float, int, int]], start: float, elapsed: float) -> dict[str, Any]:
+    expected = _expected(schedule)
+    last_click = {member_id: start + offset for offset, member_id, _ in schedule}
+    waits = [max(http.applied_at[m] - last_click[m], 0.0) for m in last_click if m in http.applied_at]
+    waits.sort()
+    return {
+        'mode': name,
+        'clicks': len(schedule),
+        'requests': http.requests,
+        'rate_limited': http.rate_limited,
+        'correct': sum(http.roles.get(m, set()) == roles for m, roles in expected.items()),
+        'members': len(expected),
+        'wait_p50': statistics.median(waits) if waits else 0.0,
+        'wait_max': waits[-1] if waits else 0.0,
+        'elapsed': elapsed,
+    }
+
+
+async def run(
+        *,
+        members: int = 200,
+        clicks: int = 3,
+        burst: float = 2.0,
+        limit: int = 50,
+        per: float = 1.0,
+        debounce: float = 0.2,
+        seed: int = 0,
+) -> list[dict[str, Any]]:
+    """Replays a burst of role button clicks against :class:`FakeRoleHTTP`, with and without the queue.
+
+    ``direct`` sends one add or remove request per click the moment it
+    arrives, which is what the view used to do. ``queued`` goes through
+    :class:`RoleAssignmentQueue` paced at ``limit`` per ``per`` seconds.
+    Halfway through a moderator adds a role to every fourth member, which
+    both modes have to keep. The default limits are compressed so the run takes
+    seconds, not minutes.
+    """
+    schedule = _clicks(members, clicks, burst, random.Random(seed))
+    guild = _Object(GUILD_ID)
+    results = []
+
+    # one request per click, as they come in
+    http = FakeRoleHTTP(limit=limit, per=per)
+    has: dict[int, set[int]] = {}
+    tasks: set[asyncio.Task[None]] = set()
+
+    def direct(member_id: int, role_id: int) -> None:
+        roles = has.setdefault(member_id, set())
+        if role_id in roles:
+            roles.discard(role_id)
+            coro = http.remove_role(GUILD_ID, member_id, role_id)
+        else:
+            roles.add(role_id)
+            coro = http.add_role(GUILD_ID, member_id, role_id)
+        tasks.add(asyncio.create_task(coro))
+
+    began = time.monotonic()
+    moderator = asyncio.create_task(_moderate(http, _moderated(schedule), burst / 2))
+    start = await _replay(schedule, direct)
+    await asyncio.gather(moderator, *tasks)
+    results.append(_summary('direct', http, schedule, start, time.monotonic() - began))
+
+    # coalesced and paced
+    http = FakeRoleHTTP(limit=limit, per=per)
+    queue = RoleAssignmentQueue(http, debounce=debounce, max_delay=debounce * 5, rate=limit, per=per)
+    fake_members: dict[int, _Member] = {}
+
+    def queued(member_id: int, role_id: int) -> None:
+        member = fake_members.get(member_id)
+        if member is None:
+            member = fake_members[member_id] = _Member(member_id, guild, http)
+        queue.toggle(member, role_id)
+
+    queue.start()
+    try:
+        began = time.monotonic()
+        moderator = asyncio.create_task(_moderate(http, _moderated(schedule), burst / 2))
+        start = await _replay(schedule, queued)
+        await moderator
+        await queue.join()
+        elapsed = time.monotonic() - began
+    finally:
+        await queue.stop()
+
+    # members that toggled back to nothing are never edited, which is still correct
+    for member_id in fake_members:
+        http.roles.setdefault(member_id, set())
+    results.append(_summary('queued', http, schedule, start, elapsed))
+    return results
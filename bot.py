@@ -1,16 +1,31 @@
 from __future__ import annotations
 
 import os
+import time
+import asyncio
 import contextlib
 import asyncpg
 import aiohttp
 import discord
 import logging
 from discord.ext import commands
+from discord.ext.commands.view import StringView
 from datetime import datetime
+from typing import Iterable, Optional, Union
 from dotenv import load_dotenv
 
-from utils.views import RURolePersistentView
+from utils.config import GatewayConfig
+from utils.context import Context
+from utils.db import PoolConfig, PoolMonitor
+from utils.prefix import PrefixManager
+from utils.role_panels import RolePanelRegistry
+from utils.roles import RoleAssignmentQueue
+from utils.sampler import ProcessSampler
+from utils.shards import ShardMetrics
+from utils.stats import CommandStats, LoopLagMonitor, MetricsExporter
+from utils.startup import StartupTimings, warm_imports
+from utils.tree import RUCommandTree
+from utils.view_manager import ViewManager
 
 load_dotenv()
 
@@ -18,39 +33,52 @@ initial_extensions = [
     'cogs.admin',
     'cogs.events',
     'cogs.errors',
-    'cogs.jishaku',
     # 'tags', # wait for update
     'cogs.misc',
     'cogs.computer_science',
 ]
 
+# non-critical extensions, loaded in the background once the bot is ready
+lazy_extensions = [
+    'cogs.jishaku',
+]
+
+# heavy third-party packages the lazy extensions import, imported in a thread first
+lazy_dependencies = [
+    'jishaku',
+]
+
 _log = logging.getLogger('RU_COMSCI_BOT')
 
 # jishaku
 os.environ['JISHAKU_NO_UNDERSCORE'] = 'True'
 os.environ['JISHAKU_HIDE'] = 'True'
 
-# intents
-intents = discord.Intents.all()
-
 # allowed_mentions
 allowed_mentions = discord.AllowedMentions(roles=True, users=True, everyone=False)
 
 def _prefix_callable(bot: RU_COMSCI_bot, msg: discord.Message):
-    user_id = bot.user.id
-    return [f'<@!{user_id}> ', f'<@{user_id}> ', '!', '.', '?']
+    return bot.prefixes.get(msg.guild).prefixes
 
 class RU_COMSCI_bot(commands.Bot):
     pool: asyncpg.Pool
+    pool_config: PoolConfig
+    pool_monitor: PoolMonitor
+    metrics_exporter: Optional[MetricsExporter]
+    tree: RUCommandTree
     bot_app_info: discord.AppInfo
 
-    def __init__(self) -> None:
+    def __init__(self, gateway_config: Optional[GatewayConfig] = None) -> None:
+        # intents and cache policy
+        self.gateway_config: GatewayConfig = gateway_config or GatewayConfig.from_env()
+
         super().__init__(
             command_prefix=_prefix_callable,
             help_command=None,
             case_insensitive=True,
             allowed_mentions=allowed_mentions,
-            intents=intents,
+            **self.gateway_config.client_options(),
+            tree_cls=RUCommandTree,
             application_id=994900112637706260,
         )
 
@@ -72,6 +100,52 @@ class RU_COMSCI_bot(commands.Bot):
 
         # cache
         self.initial_extensions = initial_extensions
+        self.lazy_extensions = lazy_extensions
+        self.lazy_dependencies = lazy_dependencies
+
+        # startup breakdown
+        self.startup_timings = StartupTimings()
+
+        # command prefixes, compiled after login
+        self.prefixes = PrefixManager()
+
+        # live paginators and prompts, bounded per user and in total
+        self.view_manager = ViewManager.from_env()
+
+        # role button panels, loaded after login
+        self.role_panels = RolePanelRegistry()
+
+        # role panel clicks, coalesced per member and paced per guild
+        self.role_queue = RoleAssignmentQueue.from_env(self.http)
+
+        # per shard connection history and event rates
+        self.shard_metrics = ShardMetrics()
+
+        # command latency and event loop lag
+        self.command_stats = CommandStats()
+        self.loop_lag_monitor = LoopLagMonitor(self.command_stats.loop_lag)
+
+        # process metrics, with the loop lag the monitor above measures
+        self.sampler = ProcessSampler(loop_lag=self.command_stats.loop_lag)
+        self.metrics_exporter = None
+
+        # application command sync
+        self._after_ready_task: Optional[asyncio.Task[None]] = None
+
+    @classmethod
+    def from_config(cls, gateway_config: Optional[GatewayConfig] = None) -> RU_COMSCI_bot:
+        """ Creates the bot, on a single connection unless the gateway config is sharded. """
+
+        gateway_config = gateway_config or GatewayConfig.from_env()
+        if gateway_config.sharded:
+            return RU_COMSCI_sharded_bot(gateway_config)
+        return RU_COMSCI_bot(gateway_config)
+
+    @property
+    def latencies(self) -> list[tuple[int, float]]:
+        """ The single connection's latency, shaped like :attr:`AutoShardedClient.latencies`. """
+
+        return [(0, self.latency)]
 
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
 
@@ -83,6 +157,47 @@ class RU_COMSCI_bot(commands.Bot):
 
         return False
 
+    async def get_context(self, origin: Union[discord.Message, discord.Interaction], /, *, cls=Context) -> Context:
+        if isinstance(origin, discord.Message) and self.prefixes.match(origin) is None:
+            # not a command, skip resolving prefixes and parsing the message
+            return cls(prefix=None, view=StringView(origin.content), bot=self, message=origin)
+        return await super().get_context(origin, cls=cls)
+
+    def render_metrics(self) -> str:
+        """ Renders command stats, pool and process metrics as Prometheus text. """
+
+        extra = []
+        pool = self.pool_monitor.summary()
+        extra.append(('rucs_pool_size', 'Open database connections.', pool['size']))
+        extra.append(('rucs_pool_idle', 'Idle database connections.', pool['idle']))
+        extra.append(('rucs_pool_wait_p95_seconds', 'p95 pool acquire wait.', pool['wait_p95']))
+        extra.append(('rucs_pool_acquire_timeouts', 'Pool acquire timeouts.', pool['acquire_timeouts']))
+
+        snapshot = self.sampler.latest
+        if snapshot is not None:
+            extra.append(('rucs_process_cpu_percent', 'Process CPU usage.', snapshot.cpu_percent))
+            extra.append(('rucs_process_memory_bytes', 'Process USS, or RSS if unavailable.', snapshot.memory))
+            extra.append(('rucs_process_threads', 'Process thread count.', snapshot.threads))
+
+        extra.append(('rucs_views_active', 'Paginators and prompts waiting for input.', len(self.view_manager)))
+        extra.append(('rucs_view_evictions', 'Views timed out early to stay within the limits.', self.view_manager.evictions))
+
+        extra.append(('rucs_role_edits_pending', 'Members waiting for a role edit.', len(self.role_queue)))
+        extra.append(('rucs_role_edits_sent', 'Role edits sent.', self.role_queue.edits))
+        extra.append(('rucs_role_edit_failures', 'Role edits that failed.', self.role_queue.failures))
+
+        return self.command_stats.prometheus(extra) + self.shard_metrics.prometheus(self.latencies)
+
+    async def _after_ready(self) -> None:
+        await self.load_cogs(self.lazy_extensions, dependencies=self.lazy_dependencies)
+        _log.info('Startup breakdown:\n%s', self.startup_timings.format())
+
+        # lazy extensions may add application commands, so sync after them
+        try:
+            await self.tree.sync_if_changed()
+        except discord.HTTPException:
+            _log.error('Failed to sync the application command tree.', exc_info=True)
+
     async def set_bot_activity(self) -> None:
         """ Sets the bot activity. """
 
@@ -97,7 +212,10 @@ class RU_COMSCI_bot(commands.Bot):
 
         await self.set_bot_activity()
 
-        await self.tree.sync()
+        # READY fires again on every reconnect, this only needs to happen once
+        if self._after_ready_task is None:
+            self.startup_timings.mark_ready()
+            self._after_ready_task = asyncio.create_task(self._after_ready())
 
         print(
             f"\n\nLogged in as: {self.user}"
@@ -106,28 +224,86 @@ class RU_COMSCI_bot(commands.Bot):
             f"\nUsers: {sum(g.member_count for g in self.guilds)}"
         )
 
-    async def load_cogs(self) -> None:
-        """ Loads all cogs. """
-        for ext in initial_extensions:
+    async def load_cogs(self, extensions: list[str], *, dependencies: Iterable[str] = ()) -> None:
+        """ Loads the given cogs, importing their third-party dependencies concurrently first. """
+
+        # never the extensions themselves, load_extension would execute them a second time
+        for name, seconds in (await warm_imports(dependencies)).items():
+            self.startup_timings.steps[f'import {name}'] = seconds
+
+        # setup() touches the bot, so the real loads stay on the event loop in order
+        for ext in extensions:
             try:
-                await self.load_extension(ext)
+                with self.startup_timings.measure(f'load {ext}'):
+                    await self.load_extension(ext)
             except Exception as e:
                 _log.error(f'Failed to load extension {ext}.', exc_info=True)
 
     async def setup_hook(self) -> None:
         if self.session is None:
             self.session = aiohttp.ClientSession()
-        self.bot_app_info = await self.application_info()
+        with self.startup_timings.measure('application_info'):
+            self.bot_app_info = await self.application_info()
         self.owner_id = self.bot_app_info.owner.id
-        await self.load_cogs()
 
-        # add view role
-        self.add_view(RURolePersistentView())
+        with self.startup_timings.measure('prefixes'):
+            await self.prefixes.setup(self.user, self.pool)
+
+        with self.startup_timings.measure('role_panels'):
+            await self.role_panels.setup(self.pool)
+
+        self.pool_monitor = PoolMonitor(self.pool, interval=self.pool_config.health_check_interval)
+        self.pool_monitor.start()
+        self.sampler.start()
+        self.loop_lag_monitor.start()
+        self.role_queue.start()
+
+        self.metrics_exporter = MetricsExporter.from_env(self.render_metrics)
+        if self.metrics_exporter is not None:
+            await self.metrics_exporter.start()
+
+        with self.startup_timings.measure('cogs'):
+            await self.load_cogs(self.initial_extensions)
+
+        # role panels
+        with self.startup_timings.measure('views'):
+            for view in self.role_panels.views():
+                self.add_view(view)
+
+        _log.info('setup_hook finished %.1f ms after start', (time.perf_counter() - self.startup_timings.created_at) * 1000)
 
     async def close(self) -> None:
+        # role edits still waiting to go out need the HTTP client
+        await self.role_queue.stop()
         await super().close()
-        await self.pool.close()
-        await self.session.close()
+
+        # setup_hook may have failed part way, or never run, so none of these can be assumed
+        pool_monitor: Optional[PoolMonitor] = getattr(self, 'pool_monitor', None)
+        if pool_monitor is not None:
+            pool_monitor.stop()
+        self.sampler.stop()
+        self.loop_lag_monitor.stop()
+
+        if self.metrics_exporter is not None:
+            try:
+                await self.metrics_exporter.stop()
+            except Exception:
+                _log.exception('Could not stop the metrics exporter.')
+
+        pool: Optional[asyncpg.Pool] = getattr(self, 'pool', None)
+        if pool is not None:
+            try:
+                await pool.close()
+            except Exception:
+                _log.exception('Could not close the PostgreSQL pool.')
+        if self.session is not None:
+            await self.session.close()
 
     async def start(self) -> None:
         return await super().start(os.getenv('DISCORD_TOKEN'), reconnect=True)
+
+
+class RU_COMSCI_sharded_bot(RU_COMSCI_bot, commands.AutoShardedBot):
+    """ :class:`RU_COMSCI_bot` on :class:`commands.AutoShardedBot`, for ``BOT_SHARDED`` or ``SHARD_COUNT``. """
+
+    latencies = commands.AutoShardedBot.latencies
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import math
 import discord
 from discord import app_commands, Interaction
 from discord.ext import commands
-from typing import List, Literal, TYPE_CHECKING
+from datetime import datetime, timezone
+from typing import List, Literal, Optional, TYPE_CHECKING
 
-from utils.views import RURolePersistentView
+from utils.paginator import RUCS_Pages, StreamingTextPageSource
+from utils.role_panels import RolePanel, dangerous_permissions
 
 if TYPE_CHECKING:
     from bot import RU_COMSCI_bot
@@ -30,12 +33,13 @@ class Admin(commands.Cog):
 
         await interaction.response.defer(ephemeral=True)
 
+        panel = self.bot.role_panels.default
         embed = discord.Embed(
-            description='สวัสดีครับเพื่อน ๆ RU CS ทุกท่าน',
+            description=panel.description,
             colour=0xCCCCFF
         )
 
-        await interaction.channel.send(embed=embed, view=RURolePersistentView())
+        await interaction.channel.send(embed=embed, view=panel.view())
         await interaction.followup.send('.', ephemeral=True)
 
     @app_commands.command()
@@ -71,6 +75,396 @@ class Admin(commands.Cog):
         )
         await interaction.followup.send(embed=embed)
 
+    # ---------- Prefix ---------- #
+
+    prefix = app_commands.Group(
+        name='prefix',
+        description='Manage the command prefixes of this server',
+        guild_only=True,
+        default_permissions=discord.Permissions(manage_guild=True)
+    )
+
+    @prefix.command(name='list')
+    async def prefix_list(self, interaction: Interaction) -> None:
+        """Shows the command prefixes of this server."""
+
+        matcher = self.bot.prefixes.get(interaction.guild)
+        prefixes = '\n'.join(f'`{p}`' for p in matcher.custom)
+        embed = discord.Embed(
+            description=f"{self.bot.user.mention}\n{prefixes}",
+            color=self.bot.theme
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @prefix.command(name='add')
+    @app_commands.describe(prefix='The prefix to add')
+    async def prefix_add(self, interaction: Interaction, prefix: str) -> None:
+        """Adds a command prefix to this server."""
+
+        current = self.bot.prefixes.get(interaction.guild).custom
+        if prefix in current:
+            raise app_commands.AppCommandError(f'`{prefix}` is already a prefix')
+
+        try:
+            await self.bot.prefixes.set(self.bot.pool, interaction.guild_id, (*current, prefix))
+        except ValueError as e:
+            raise app_commands.AppCommandError(str(e))
+
+        embed = discord.Embed(description=f"Prefix added : `{prefix}`", color=0x8be28b)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @prefix.command(name='remove')
+    @app_commands.describe(prefix='The prefix to remove')
+    async def prefix_remove(self, interaction: Interaction, prefix: str) -> None:
+        """Removes a command prefix from this server."""
+
+        current = self.bot.prefixes.get(interaction.guild).custom
+        if prefix not in current:
+            raise app_commands.AppCommandError(f'`{prefix}` is not a prefix')
+
+        try:
+            await self.bot.prefixes.set(self.bot.pool, interaction.guild_id, (p for p in current if p != prefix))
+        except ValueError as e:
+            raise app_commands.AppCommandError(str(e))
+
+        embed = discord.Embed(description=f"Prefix removed : `{prefix}`", color=0x8be28b)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @prefix_remove.autocomplete('prefix')
+    async def prefix_autocomplete(self, interaction: Interaction, current: str) -> List[app_commands.Choice[str]]:
+        """Autocomplete for the prefixes of this server."""
+
+        prefixes = self.bot.prefixes.get(interaction.guild).custom
+        return [app_commands.Choice(name=p, value=p) for p in prefixes if current in p][:25]
+
+    @prefix.command(name='reset')
+    async def prefix_reset(self, interaction: Interaction) -> None:
+        """Resets the command prefixes of this server to the defaults."""
+
+        await self.bot.prefixes.reset(self.bot.pool, interaction.guild_id)
+        embed = discord.Embed(description="Prefixes reset to the defaults", color=0x8be28b)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    # ---------- Role panels ---------- #
+
+    rolepanel = app_commands.Group(
+        name='rolepanel',
+        description='Manage the role button panels of this server',
+        guild_only=True,
+        default_permissions=discord.Permissions(manage_roles=True)
+    )
+
+    def _panel(self, interaction: Interaction, name: str) -> RolePanel:
+        panel = self.bot.role_panels.find(interaction.guild_id, name)
+        if panel is None:
+            raise app_commands.AppCommandError(f'There is no panel named `{name}`')
+        return panel
+
+    async def _refresh_panel(self, panel: RolePanel) -> None:
+        """Re-registers the panel's view and updates the posted message, if any."""
+
+        if panel.buttons:
+            self.bot.add_view(panel.view())
+
+        if panel.message_id is None:
+            return
+        channel = self.bot.get_channel(panel.channel_id)
+        if channel is None:
+            return
+        try:
+            await channel.get_partial_message(panel.message_id).edit(view=panel.view() if panel.buttons else None)
+        except discord.NotFound:
+            pass
+
+    @rolepanel.command(name='create')
+    @app_commands.describe(name='Name of the panel', description='Text shown above the buttons')
+    async def rolepanel_create(self, interaction: Interaction, name: str, description: Optional[str] = None) -> None:
+        """Creates an empty role panel."""
+
+        try:
+            await self.bot.role_panels.create(self.bot.pool, interaction.guild_id, name, description)
+        except ValueError as e:
+            raise app_commands.AppCommandError(str(e))
+
+        embed = discord.Embed(description=f"Panel created : `{name}`", color=0x8be28b)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @rolepanel.command(name='add')
+    @app_commands.describe(panel='Name of the panel', role='The role the button toggles', label='Button label',
+                           emoji='Button emoji')
+    async def rolepanel_add(
+            self,
+            interaction: Interaction,
+            panel: str,
+            role: discord.Role,
+            label: Optional[app_commands.Range[str, 1, 80]] = None,
+            emoji: Optional[str] = None) -> None:
+        """Adds a role button to a panel."""
+
+        role_panel = self._panel(interaction, panel)
+        if role.is_default() or role.managed:
+            raise app_commands.AppCommandError(f'{role.mention} can not be given out')
+        if role >= interaction.guild.me.top_role:
+            raise app_commands.AppCommandError(f'{role.mention} is above my highest role')
+        if role >= interaction.user.top_role and interaction.user.id != interaction.guild.owner_id:
+            raise app_commands.AppCommandError(f'{role.mention} is not below your highest role')
+        permissions = dangerous_permissions(role)
+        if permissions:
+            names = ', '.join(f'`{name}`' for name in permissions)
+            raise app_commands.AppCommandError(f'{role.mention} has moderation permissions ({names}), anyone could take it from a panel')
+
+        try:
+            await self.bot.role_panels.add_button(self.bot.pool, role_panel, role.id, label or role.name, emoji)
+        except ValueError as e:
+            raise app_commands.AppCommandError(str(e))
+
+        await interaction.response.defer(ephemeral=True)
+        await self._refresh_panel(role_panel)
+        embed = discord.Embed(description=f"{role.mention} added to `{role_panel.name}`", color=0x8be28b)
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
+    @rolepanel.command(name='remove')
+    @app_commands.describe(panel='Name of the panel', role='The role to remove the button of')
+    async def rolepanel_remove(self, interaction: Interaction, panel: str, role: discord.Role) -> None:
+        """Removes a role button from a panel."""
+
+        role_panel = self._panel(interaction, panel)
+        try:
+            await self.bot.role_panels.remove_button(self.bot.pool, role_panel, role.id)
+        except ValueError as e:
+            raise app_commands.AppCommandError(str(e))
+
+        await interaction.response.defer(ephemeral=True)
+        await self._refresh_panel(role_panel)
+        embed = discord.Embed(description=f"{role.mention} removed from `{role_panel.name}`", color=0x8be28b)
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
+    @rolepanel.command(name='post')
+    @app_commands.describe(panel='Name of the panel')
+    async def rolepanel_post(self, interaction: Interaction, panel: str) -> None:
+        """Posts a panel in this channel. The previous post stops being updated."""
+
+        role_panel = self._panel(interaction, panel)
+        if not role_panel.buttons:
+            raise app_commands.AppCommandError(f'`{role_panel.name}` has no buttons yet')
+
+        await interaction.response.defer(ephemeral=True)
+        embed = discord.Embed(description=role_panel.description, colour=0xCCCCFF)
+        message = await interaction.channel.send(embed=embed, view=role_panel.view())
+        await self.bot.role_panels.posted(self.bot.pool, role_panel, message)
+        await interaction.followup.send(f'Posted `{role_panel.name}`', ephemeral=True)
+
+    @rolepanel.command(name='delete')
+    @app_commands.describe(panel='Name of the panel')
+    async def rolepanel_delete(self, interaction: Interaction, panel: str) -> None:
+        """Deletes a panel and its buttons."""
+
+        role_panel = self._panel(interaction, panel)
+        await interaction.response.defer(ephemeral=True)
+        await self.bot.role_panels.delete(self.bot.pool, role_panel)
+        role_panel.buttons = []
+        await self._refresh_panel(role_panel)
+        embed = discord.Embed(description=f"Panel deleted : `{role_panel.name}`", color=0x8be28b)
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
+    @rolepanel.command(name='list')
+    async def rolepanel_list(self, interaction: Interaction) -> None:
+        """Shows the role panels of this server."""
+
+        panels = self.bot.role_panels.guild_panels(interaction.guild_id)
+        embed = discord.Embed(title='Role panels', color=self.bot.theme)
+        for panel in panels[:25]:
+            roles = ' '.join(f'<@&{button.role_id}>' for button in panel.buttons) or 'No buttons'
+            embed.add_field(name=panel.name, value=roles, inline=False)
+        if not panels:
+            embed.description = 'No role panels yet, create one with `/rolepanel create`'
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @rolepanel_add.autocomplete('panel')
+    @rolepanel_remove.autocomplete('panel')
+    @rolepanel_post.autocomplete('panel')
+    @rolepanel_delete.autocomplete('panel')
+    async def rolepanel_autocomplete(self, interaction: Interaction, current: str) -> List[app_commands.Choice[str]]:
+        """Autocomplete for the role panels of this server."""
+
+        panels = self.bot.role_panels.guild_panels(interaction.guild_id)
+        return [app_commands.Choice(name=p.name, value=p.name) for p in panels if current in p.name][:25]
+
+    @app_commands.command()
+    @owner_only()
+    async def pool(self, interaction: Interaction) -> None:
+        """Shows database pool utilisation and wait times."""
+
+        stats = self.bot.pool_monitor.summary()
+        probe_latency = stats['probe_latency']
+        embed = discord.Embed(title='PostgreSQL pool', color=self.bot.theme)
+        embed.add_field(
+            name='Connections',
+            value=f"Size: `{stats['size']}` (min `{stats['min_size']}`, max `{stats['max_size']}`)\n"
+                  f"Idle: `{stats['idle']}`\n"
+                  f"Utilisation: avg `{stats['utilisation_avg']:.0%}`, max `{stats['utilisation_max']:.0%}`",
+            inline=False
+        )
+        embed.add_field(
+            name='Acquire wait',
+            value=f"Acquires: `{stats['acquires']}` (timeouts `{stats['acquire_timeouts']}`)\n"
+                  f"p50: `{stats['wait_p50'] * 1000:.2f} ms`\n"
+                  f"p95: `{stats['wait_p95'] * 1000:.2f} ms`\n"
+                  f"max: `{stats['wait_max'] * 1000:.2f} ms`",
+            inline=False
+        )
+        health = f"Healthy: `{stats['healthy']}` (failures `{stats['probe_failures']}`)"
+        if probe_latency is not None:
+            health = f"{health}\nProbe latency: `{probe_latency * 1000:.2f} ms`"
+            health = f"{health}\nProbe acquire wait max: `{stats['probe_wait_max'] * 1000:.2f} ms`"
+        embed.add_field(name='Health', value=health, inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command()
+    @app_commands.describe(limit='How many commands to show', reset='Clear the collected stats afterwards')
+    @owner_only()
+    async def stats(self, interaction: Interaction, limit: app_commands.Range[int, 1, 25] = 10, reset: bool = False) -> None:
+        """Shows command latency percentiles, error counts and event loop lag."""
+
+        command_stats = self.bot.command_stats
+        embed = discord.Embed(title='Command stats', color=self.bot.theme)
+
+        lines = []
+        for name, histogram in command_stats.top(limit):
+            errors = command_stats.errors.get(name, 0)
+            lines.append(
+                f"`{name}` ×{histogram.count}" + (f" (errors `{errors}`)" if errors else '') + '\n'
+                f"p50 `{histogram.quantile(0.5) * 1000:.1f} ms` "
+                f"p95 `{histogram.quantile(0.95) * 1000:.1f} ms` "
+                f"p99 `{histogram.quantile(0.99) * 1000:.1f} ms`"
+            )
+        embed.description = '\n'.join(lines) or 'No commands recorded yet.'
+
+        lag = command_stats.loop_lag
+        embed.add_field(
+            name='Event loop lag',
+            value=f"p50: `{lag.quantile(0.5) * 1000:.2f} ms`\n"
+                  f"p99: `{lag.quantile(0.99) * 1000:.2f} ms`\n"
+                  f"max: `{lag.max * 1000:.2f} ms`",
+            inline=False
+        )
+        embed.set_footer(text='Ordered by total time spent · since')
+        embed.timestamp = datetime.fromtimestamp(command_stats.started_at, tz=timezone.utc)
+
+        if reset:
+            command_stats.reset()
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command()
+    @owner_only()
+    async def shards(self, interaction: Interaction) -> None:
+        """Shows latency, reconnects and event rates per shard."""
+
+        latencies = dict(self.bot.latencies)
+        metrics = self.bot.shard_metrics
+        lines = [f"{'id':>3} {'up':<3} {'ping':>7} {'conn':>5} {'disc':>5} {'res':>5} {'msg/m':>7} {'int/m':>7}"]
+        for shard_id in sorted(set(latencies) | set(metrics.shards)):
+            stats = metrics.get(shard_id)
+            latency = latencies.get(shard_id, float('nan'))
+            ping = f'{latency * 1000:.0f}ms' if math.isfinite(latency) else '-'
+            lines.append(
+                f"{shard_id:>3} {'yes' if stats.connected else 'no':<3} {ping:>7} {stats.connects:>5} "
+                f"{stats.disconnects:>5} {stats.resumes:>5} {stats.messages.per_minute():>7.1f} "
+                f"{stats.interactions.per_minute():>7.1f}"
+            )
+
+        table = '\n'.join(lines)
+        embed = discord.Embed(
+            title=f'Shards ({len(latencies)} of {self.bot.shard_count or 1} in this process)',
+            description=f'```\n{table[:4000]}\n```',
+            color=self.bot.theme
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command()
+    @app_commands.describe(
+        guild='Guild ID to sync instead of the global commands, or "here"',
+        force='Sync even if the command tree has not changed',
+        copy_global='Copy the global commands into the guild first'
+    )
+    @owner_only()
+    async def sync(
+            self,
+            interaction: Interaction,
+            guild: Optional[str] = None,
+            force: bool = False,
+            copy_global: bool = False) -> None:
+        """Syncs the application commands if they changed since the last sync."""
+
+        await interaction.response.defer(ephemeral=True)
+
+        target: Optional[discord.abc.Snowflake] = None
+        if guild == 'here':
+            target = interaction.guild
+        elif guild is not None:
+            if not guild.isdigit():
+                raise app_commands.AppCommandError('Guild must be an ID or "here"')
+            target = discord.Object(id=int(guild))
+
+        if copy_global:
+            if target is None:
+                raise app_commands.AppCommandError('copy_global needs a guild')
+            self.bot.tree.copy_global_to(guild=target)
+
+        synced = await self.bot.tree.sync_if_changed(guild=target, force=force)
+        scope = 'global' if target is None else f'guild `{target.id}`'
+        if synced is None:
+            description = f"Sync : {scope} is already up to date"
+        else:
+            description = f"Sync : `{len(synced)}` commands to {scope}"
+        embed = discord.Embed(description=description, color=0x8be28b)
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
+    @app_commands.command()
+    @owner_only()
+    async def startup(self, interaction: Interaction) -> None:
+        """Shows how long each startup step took."""
+
+        timings = self.bot.startup_timings.format() or 'Nothing recorded yet.'
+        embed = discord.Embed(title='Startup', description=f'```\n{timings[:4000]}\n```', color=self.bot.theme)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command()
+    @owner_only()
+    async def views(self, interaction: Interaction) -> None:
+        """Shows the paginators and prompts that are waiting for input."""
+
+        manager = self.bot.view_manager
+        oldest = manager.oldest()
+        lines = [
+            f'{"Active":<16}: {len(manager)}/{manager.total} (per user {manager.per_user})',
+            f'{"Evicted":<16}: {manager.evictions}',
+            f'{"Memory":<16}: {manager.memory() / 1024:.1f} KiB',
+            f'{"Oldest":<16}: {"-" if oldest is None else f"{oldest:.0f} s"}',
+        ]
+        lines.extend(f'{name:<16}: {count}' for name, count in manager.counts().most_common())
+        text = '\n'.join(lines)
+        embed = discord.Embed(title='Views', description=f'```\n{text}\n```', color=self.bot.theme)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command()
+    @owner_only()
+    async def logs(self, interaction: Interaction) -> None:
+        """Pages through the bot's log file."""
+
+        try:
+            # written by launcher.setup_logging, up to 32 MiB
+            fp = open('RUCS_BOT.log', 'rb')
+        except FileNotFoundError:
+            raise app_commands.AppCommandError('There is no log file, the bot was not started by the launcher')
+        except OSError as e:
+            raise app_commands.AppCommandError(f'Could not open the log file: {e}')
+
+        ctx = await self.bot.get_context(interaction)
+        pages = RUCS_Pages(StreamingTextPageSource(fp, prefix='```log'), ctx=ctx, check_embeds=False)
+        # the log may hold tokens, IDs and message contents, only the owner should see it
+        await pages.start(ephemeral=True)
+
     # ---------- Extension ---------- #
 
     @app_commands.command()
@@ -137,7 +531,7 @@ class Admin(commands.Cog):
             return [
                 app_commands.Choice(name='Only owner can use this command', value='Owner only can use this command')]
 
-        cogs = [ext.lower() for ext in self.bot.initial_extensions]
+        cogs = [ext.lower() for ext in self.bot.initial_extensions + self.bot.lazy_extensions]
         return [app_commands.Choice(name=cog.split('.')[1], value=cog) for cog in cogs]
 
 
@@ -1,13 +1,15 @@
 from __future__ import annotations
 
 import discord
+from discord import app_commands
 from discord.ext import commands
-from typing import Literal, Union, TYPE_CHECKING
+from typing import Literal, Optional, Union, TYPE_CHECKING
 from datetime import time, datetime
 
-from jishaku.codeblocks import codeblock_converter
-
+from utils import baseconv
+from utils.calculator import Calculator, CalculationError
 from utils.errors import RUBotError
+from utils.paginator import RUCS_Pages, TextPageSource
 
 if TYPE_CHECKING:
     from bot import RU_COMSCI_bot
@@ -18,34 +20,73 @@ class ComputerScience(commands.Cog):
 
     def __init__(self, bot: RU_COMSCI_bot) -> None:
         self.bot: RU_COMSCI_bot = bot
+        self.calculator: Calculator = Calculator()
+
+    async def cog_load(self) -> None:
+        self.calculator.warm_up()
+
+    async def cog_unload(self) -> None:
+        self.calculator.close()
+
+    async def _convert(self, ctx: commands.Context, base: int, mode: Optional[str], texts: str) -> None:
+        if not texts:
+            raise RUBotError('กรุณาระบุข้อความที่ต้องการแปลง')
+
+        try:
+            if mode == 'decode':
+                result = baseconv.decode(texts, base)
+            else:
+                result = baseconv.encode(texts, base)
+        except baseconv.BaseConversionError as e:
+            raise RUBotError(str(e))
 
-    # todo design
-    # add choice ['decode', 'encode'] or not ?
-
-    # @commands.hybrid_command(aliases=['bin'])
-    # async def binary(self, ctx: commands.Context, *, texts: str) -> None:
-    #     """ แปลงข้อความเป็นเลขฐาน 2 """
-    #     ...
-    #
-    # @commands.hybrid_command(aliases=['hex'])
-    # async def hexadecimal(self, ctx: commands.Context, *, texts: str)-> None:
-    #     """ แปลงข้อความเป็นเลขฐาน 16 """
-    #     ...
-    #
-    # @commands.hybrid_command(aliases=['oct'])
-    # async def octal(self, ctx: commands.Context, *, texts: str)-> None:
-    #     """ แปลงข้อความเป็นเลขฐาน 8 """
-    #     ...
-    #
-    # @commands.hybrid_command(aliases=['dec'])
-    # async def decimal(self, ctx: commands.Context, *, texts: str) -> None:
-    #     """ แปลงข้อความเป็นเลขฐาน 10 """
-    #     ...
+        if not result.strip():
+            raise RUBotError('ไม่มีผลลัพธ์')
+
+        pages = RUCS_Pages(TextPageSource(result), ctx=ctx, check_embeds=False)
+        await pages.start()
+
+    @commands.hybrid_command(aliases=['bin'])
+    @app_commands.describe(mode='แปลงเป็นเลขฐาน (encode) หรือแปลงกลับเป็นข้อความ (decode)', texts='ข้อความ')
+    async def binary(
+            self, ctx: commands.Context, mode: Optional[Literal['encode', 'decode']] = None, *, texts: str
+    ) -> None:
+        """ แปลงข้อความเป็นเลขฐาน 2 """
+        await self._convert(ctx, 2, mode, texts)
+
+    @commands.hybrid_command(aliases=['hex'])
+    @app_commands.describe(mode='แปลงเป็นเลขฐาน (encode) หรือแปลงกลับเป็นข้อความ (decode)', texts='ข้อความ')
+    async def hexadecimal(
+            self, ctx: commands.Context, mode: Optional[Literal['encode', 'decode']] = None, *, texts: str
+    ) -> None:
+        """ แปลงข้อความเป็นเลขฐาน 16 """
+        await self._convert(ctx, 16, mode, texts)
+
+    @commands.hybrid_command(aliases=['oct'])
+    @app_commands.describe(mode='แปลงเป็นเลขฐาน (encode) หรือแปลงกลับเป็นข้อความ (decode)', texts='ข้อความ')
+    async def octal(
+            self, ctx: commands.Context, mode: Optional[Literal['encode', 'decode']] = None, *, texts: str
+    ) -> None:
+        """ แปลงข้อความเป็นเลขฐาน 8 """
+        await self._convert(ctx, 8, mode, texts)
+
+    @commands.hybrid_command(aliases=['dec'])
+    @app_commands.describe(mode='แปลงเป็นเลขฐาน (encode) หรือแปลงกลับเป็นข้อความ (decode)', texts='ข้อความ')
+    async def decimal(
+            self, ctx: commands.Context, mode: Optional[Literal['encode', 'decode']] = None, *, texts: str
+    ) -> None:
+        """ แปลงข้อความเป็นเลขฐาน 10 """
+        await self._convert(ctx, 10, mode, texts)
 
     @commands.hybrid_command(aliases=['py'])
     async def python(self, ctx: commands.Context, *, code: str) -> None:
         """ jishaku py"""
         jsk = self.bot.get_command("jishaku py")
+        if jsk is None:
+            raise RUBotError('คำสั่งนี้ยังไม่พร้อมใช้งาน กรุณาลองใหม่อีกครั้ง')
+
+        # jishaku is a lazy extension, so by now it is already imported
+        from jishaku.codeblocks import codeblock_converter
         await jsk(ctx, argument=codeblock_converter(code))
 
     @commands.hybrid_command(aliases=['cal'])
@@ -56,8 +97,8 @@ class ComputerScience(commands.Cog):
             raise RUBotError('กรุณาระบุข้อความที่ต้องการแปลง')
 
         try:
-            result = eval(equation)
-        except Exception as e:
+            result = await self.calculator.evaluate(equation)
+        except CalculationError as e:
             raise RUBotError(f'ไม่สามารถคำนวนได้: {e}')
 
         embed = discord.Embed(
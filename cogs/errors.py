@@ -31,6 +31,8 @@ class ErrorHandler(commands.Cog):
     async def on_app_command_error(self, interaction: Interaction, error: AppCommandError):
         """ Handles errors for all application commands associated with this CommandTree."""
 
+        self.bot.tree.record(interaction, interaction.command, failed=True)
+
         traceback.print_exception(type(error), error, error.__traceback__)
 
         error_unknown = "An unknown error occurred, sorry"
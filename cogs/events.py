@@ -1,13 +1,14 @@
 from __future__ import annotations
 
+import time
 import discord
-from discord import Interaction
+from discord import Interaction, app_commands
 from discord.ext import commands, tasks
 from typing import Union, TYPE_CHECKING
-from datetime import time, datetime
 
 if TYPE_CHECKING:
     from bot import RU_COMSCI_bot
+    from utils.context import Context
 
 
 class Event(commands.Cog):
@@ -16,6 +17,78 @@ class Event(commands.Cog):
     def __init__(self, bot: RU_COMSCI_bot) -> None:
         self.bot: RU_COMSCI_bot = bot
 
+    # ---------- Shard stats ---------- #
+
+    # without sharding only these fire, the single connection is shard 0
+
+    @commands.Cog.listener()
+    async def on_connect(self) -> None:
+        if not isinstance(self.bot, discord.AutoShardedClient):
+            self.bot.shard_metrics.connected(0)
+
+    @commands.Cog.listener()
+    async def on_disconnect(self) -> None:
+        if not isinstance(self.bot, discord.AutoShardedClient):
+            self.bot.shard_metrics.disconnected(0)
+
+    @commands.Cog.listener()
+    async def on_resumed(self) -> None:
+        if not isinstance(self.bot, discord.AutoShardedClient):
+            self.bot.shard_metrics.resumed(0)
+
+    @commands.Cog.listener()
+    async def on_shard_connect(self, shard_id: int) -> None:
+        self.bot.shard_metrics.connected(shard_id)
+
+    @commands.Cog.listener()
+    async def on_shard_disconnect(self, shard_id: int) -> None:
+        self.bot.shard_metrics.disconnected(shard_id)
+
+    @commands.Cog.listener()
+    async def on_shard_resumed(self, shard_id: int) -> None:
+        self.bot.shard_metrics.resumed(shard_id)
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message) -> None:
+        self.bot.shard_metrics.get(message.guild and message.guild.shard_id).messages.hit()
+
+    @commands.Cog.listener()
+    async def on_interaction(self, interaction: Interaction) -> None:
+        self.bot.shard_metrics.get(interaction.guild and interaction.guild.shard_id).interactions.hit()
+
+    # ---------- Command stats ---------- #
+
+    def _record(self, ctx: Context, *, failed: bool) -> None:
+        started_at = getattr(ctx, 'started_at', None)
+        if ctx.command is None or started_at is None:
+            return
+        self.bot.command_stats.record(ctx.command.qualified_name, time.perf_counter() - started_at, failed=failed)
+
+    @commands.Cog.listener()
+    async def on_command(self, ctx: Context) -> None:
+        if ctx.interaction is not None:
+            # hybrid command invoked as a slash command, start from the tree dispatch
+            ctx.started_at = ctx.interaction.extras.get('started_at', time.perf_counter())
+            ctx.interaction.extras['recorded'] = True
+        else:
+            ctx.started_at = time.perf_counter()
+
+    @commands.Cog.listener()
+    async def on_command_completion(self, ctx: Context) -> None:
+        self._record(ctx, failed=False)
+
+    @commands.Cog.listener()
+    async def on_command_error(self, ctx: Context, error: Exception) -> None:
+        self._record(ctx, failed=True)
+
+    @commands.Cog.listener()
+    async def on_app_command_completion(
+            self,
+            interaction: Interaction,
+            command: Union[app_commands.Command, app_commands.ContextMenu],
+    ) -> None:
+        self.bot.tree.record(interaction, command)
+
 
 async def setup(bot: RU_COMSCI_bot) -> None:
     await bot.add_cog(Event(bot))
@@ -6,11 +6,6 @@ from jishaku.features.root_command import natural_size
 from jishaku.cog import STANDARD_FEATURES, OPTIONAL_FEATURES
 from jishaku.features.baseclass import Feature
 
-try:
-    import psutil
-except ImportError:
-    psutil = None
-
 from bot import RU_COMSCI_bot
 
 
@@ -32,36 +27,17 @@ class Jishaku(*OPTIONAL_FEATURES, *STANDARD_FEATURES):
             f"cog was loaded <t:{self.start_time.timestamp():.0f}:R>.",
             ""
         ]
-        # detect if [procinfo] feature is installed
-        if psutil:
-            try:
-                proc = psutil.Process()
-
-                with proc.oneshot():
-                    try:
-                        mem = proc.memory_full_info()
-                        summary.append(f"Using {natural_size(mem.rss)} physical memory and "
-                                       f"{natural_size(mem.vms)} virtual memory, "
-                                       f"{natural_size(mem.uss)} of which unique to this process.")
-                    except psutil.AccessDenied:
-                        pass
-
-                    try:
-                        name = proc.name()
-                        pid = proc.pid
-                        thread_count = proc.num_threads()
-
-                        summary.append(f"Running on PID {pid} (`{name}`) with {thread_count} thread(s).")
-                    except psutil.AccessDenied:
-                        pass
-
-                    summary.append("")  # blank line
-            except psutil.AccessDenied:
-                summary.append(
-                    "psutil is installed, but this process does not have high enough access rights "
-                    "to query process information."
-                )
-                summary.append("")  # blank line
+        # process info comes from the background sampler instead of querying psutil here
+        snapshot = self.bot.sampler.latest
+        if snapshot is not None:
+            memory = (f"Using {natural_size(snapshot.rss)} physical memory and "
+                      f"{natural_size(snapshot.vms)} virtual memory")
+            if snapshot.uss is not None:
+                memory = f"{memory}, {natural_size(snapshot.uss)} of which unique to this process"
+            summary.append(f"{memory}.")
+            summary.append(f"Running on PID {self.bot.sampler.pid} (`{self.bot.sampler.name}`) "
+                           f"with {snapshot.threads} thread(s).")
+            summary.append("")  # blank line
 
         cache_summary = f"{len(self.bot.guilds)} guild(s) and {len(self.bot.users)} user(s)"
 
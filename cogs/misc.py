@@ -1,53 +1,129 @@
 from __future__ import annotations
 
+import os
+import math
+import asyncio
 import discord
 import platform
-import pygit2
 import itertools
 import datetime
-import psutil
 
 from discord import Interaction, app_commands
 from discord.utils import format_dt, utcnow
 from discord.ext import commands
-from utils.useful import count_python
+from utils.lazy import lazy_import
+from utils.sampler import sparkline
+from utils.useful import LineCountIndex
 
-from typing import TYPE_CHECKING
+from typing import Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
+    import pygit2
     from bot import RU_COMSCI_bot
+else:
+    pygit2 = lazy_import('pygit2')
 
 
 def format_commit(commit) -> str:
     short, _, _ = commit.message.partition('\n')
     short = short[0:40] + '...' if len(short) > 40 else short
-    short_sha2 = commit.hex[0:6]
+    sha = str(commit.id)
+    short_sha2 = sha[0:6]
     commit_tz = datetime.timezone(datetime.timedelta(minutes=commit.commit_time_offset))
     commit_time = datetime.datetime.fromtimestamp(commit.commit_time).astimezone(commit_tz)
     offset = format_dt(commit_time, style='R')
-    return f'[`{short_sha2}`](https://github.com/stacia-study/RU-computer-science-Discord-bot/commits/{commit.hex}) {short} ({offset})'
+    return f'[`{short_sha2}`](https://github.com/stacia-study/RU-computer-science-Discord-bot/commits/{sha}) {short} ({offset})'
 
 
-def get_latest_commits(limit: int = 5) -> str:
-    repo = pygit2.Repository('./.git')
+def format_latency(seconds: float) -> str:
+    # a shard that hasn't heartbeated yet reports nan or inf
+    return f'{round(seconds * 1000)} ms' if math.isfinite(seconds) else '-'
+
+
+def get_latest_commits(limit: int = 5, *, repo: Optional[pygit2.Repository] = None) -> str:
+    repo = repo or pygit2.Repository('./.git')
     commits = list(itertools.islice(repo.walk(repo.head.target, pygit2.GIT_SORT_TOPOLOGICAL), limit))
     return '\n'.join(format_commit(c) for c in commits)
 
 
+class CommitFeed:
+    """The latest commits, formatted once per HEAD.
+
+    The repository is opened once. Whether HEAD may have moved is checked by
+    comparing the modification times of ``HEAD``, the branch it points at and
+    ``packed-refs``, so a cache hit costs a few ``stat`` calls. Any walk runs in a thread.
+    """
+
+    def __init__(self, path: str = './.git', *, limit: int = 5) -> None:
+        self.path: str = path
+        self.limit: int = limit
+        self._repo: Optional[pygit2.Repository] = None
+        self._stamp: Optional[tuple[Optional[int], ...]] = None
+        self._head: Optional[str] = None
+        self._lines: Optional[str] = None
+        self._lock = asyncio.Lock()
+
+    def _mtime(self, *parts: str) -> Optional[int]:
+        try:
+            return os.stat(os.path.join(self.path, *parts)).st_mtime_ns
+        except OSError:
+            return None
+
+    def _ref_stamp(self) -> tuple[Optional[int], ...]:
+        try:
+            with open(os.path.join(self.path, 'HEAD'), encoding='utf-8') as fp:
+                head = fp.read().strip()
+        except OSError:
+            head = ''
+
+        ref = head[5:].strip() if head.startswith('ref:') else None
+        ref_mtime = self._mtime(*ref.split('/')) if ref else None
+        return self._mtime('HEAD'), ref_mtime, self._mtime('packed-refs')
+
+    def _refresh(self) -> tuple[str, str]:
+        if self._repo is None:
+            self._repo = pygit2.Repository(self.path)
+
+        head = str(self._repo.head.target)
+        if head == self._head and self._lines is not None:
+            return head, self._lines
+        return head, get_latest_commits(self.limit, repo=self._repo)
+
+    async def get(self) -> str:
+        stamp = self._ref_stamp()
+        if stamp == self._stamp and self._lines is not None:
+            return self._lines
+
+        async with self._lock:
+            if stamp != self._stamp or self._lines is None:
+                self._head, self._lines = await asyncio.to_thread(self._refresh)
+                self._stamp = stamp
+        return self._lines
+
+
 class Misc(commands.Cog):
     """Miscellaneous commands"""
 
     def __init__(self, bot: RU_COMSCI_bot) -> None:
         self.bot: RU_COMSCI_bot = bot
-
-    process = psutil.Process()
+        self.commit_feed: CommitFeed = CommitFeed()
+        self.line_count: LineCountIndex = LineCountIndex('.')
 
     @app_commands.command()
     async def ping(self, interaction: Interaction) -> None:
         """ดูปิงของบอท / Show Bot latency."""
-        latency = self.bot.latency * 1000
+        current = interaction.guild.shard_id if interaction.guild else 0
         embed = discord.Embed(color=self.bot.theme)
-        embed.add_field(name=f"Latency", value=f"```nim\n{round(latency)} ms```")
+        latencies = self.bot.latencies
+        if len(latencies) == 1:
+            embed.add_field(name=f"Latency", value=f"```nim\n{format_latency(latencies[0][1])}```")
+        else:
+            # discord allows 25 fields, keep the shard this server is on
+            shown = sorted(latencies, key=lambda item: (item[0] != current, item[0]))[:24]
+            for shard_id, latency in sorted(shown):
+                name = f"Shard {shard_id}" + (" (this server)" if shard_id == current else "")
+                embed.add_field(name=name, value=f"```nim\n{format_latency(latency)}```")
+            embed.add_field(name=f"Average", value=f"```nim\n{format_latency(self.bot.latency)}```")
         embed.set_footer(text=f'{self.bot.user.name} | v{self.bot._version}', icon_url=self.bot.user.avatar)
         await interaction.response.send_message(embed=embed)
 
@@ -56,15 +132,23 @@ class Misc(commands.Cog):
         """ข้อมูลเกี่ยวกับบอท / Shows basic information"""
 
         bot_version = self.bot._version
-        memory_usage = self.process.memory_full_info().uss / 1024 / 1024
+        line_count = await self.line_count.count()
+        snapshot = self.bot.sampler.latest
+        if snapshot is not None:
+            cpu_trend = sparkline(self.bot.sampler.series('cpu_percent'))
+            memory_trend = sparkline([s.memory for s in self.bot.sampler.samples])
+            cpu_usage = f"`{snapshot.cpu_percent:.1f}%` {cpu_trend}"
+            memory_usage = f"`{snapshot.memory / 1024 / 1024:.2f} MB` {memory_trend}"
+        else:
+            cpu_usage = memory_usage = '`-`'
 
         embed = discord.Embed(color=self.bot.theme, timestamp=discord.utils.utcnow())
         embed.set_author(name=f"About Me", icon_url=self.bot.user.avatar)
-        embed.add_field(name='Latest updates:', value=get_latest_commits(5), inline=False)
+        embed.add_field(name='Latest updates:', value=await self.commit_feed.get(), inline=False)
 
         embed.add_field(
             name='Bot info:',
-            value=f"<a:cursor:896576387002032159> Line count: `{count_python('.')}`\n" \
+            value=f"<a:cursor:896576387002032159> Line count: `{line_count}`\n" \
                   f"<:botTag:230105988211015680> Version: `{bot_version}`\n" \
                   f"<:Python:881421088763047946> Python: `{platform.python_version()}`\n" \
                   f"<:dpy:596577034537402378> Discord.py: `{discord.__version__}`",
@@ -72,7 +156,7 @@ class Misc(commands.Cog):
         )
         embed.add_field(name='\u200b', value='\u200b', inline=True)
         embed.add_field(name='Process:',
-                        value=f"OS: `{platform.system()}`\nCPU Usage: `{psutil.cpu_percent()}%`\nMemory Usage: `{memory_usage:.2f} MB`",
+                        value=f"OS: `{platform.system()}`\nCPU Usage: {cpu_usage}\nMemory Usage: {memory_usage}",
                         inline=True)
         embed.add_field(name='Uptime:', value=f"{self.bot.launch_time}", inline=True)
         embed.add_field(name='\u200b', value='\u200b', inline=True)
@@ -1,20 +1,60 @@
 from __future__ import annotations
 
+import io
+import asyncio
+import csv
+import gzip
+import json
 import discord
 import asyncpg
+import logging
 import datetime
+import tempfile
+import itertools
 from discord import app_commands
 from discord.ext import commands
 
-from typing import Optional, TypedDict, TYPE_CHECKING
+from typing import IO, Any, AsyncIterable, AsyncIterator, Iterable, Iterator, Optional, TypedDict, TYPE_CHECKING, Union
 from typing_extensions import Annotated
 
+from utils.cache import LRUCache
 from utils.context import Context, GuildContext
-from utils.paginator import SimplePages
+from utils.fuzzy import TrigramIndex
+from utils.paginator import KeysetPages, KeysetPageSource, SimplePages
+from utils.queries import registry as queries
+from utils.tag_queries import (
+    TAG_GET,
+    TAG_SIMILAR,
+    TAG_SEARCH,
+    TAG_GUILD_NAMES,
+    TAG_EXISTS,
+    TAG_INSERT,
+    TAG_EDIT,
+    TAG_DELETE,
+    TAG_DELETE_OWNED,
+    TAG_SELECT_ID,
+    TAG_SELECT_ID_OWNED,
+    TAG_RENAME,
+    TAG_LIST_FIRST,
+    TAG_LIST_AFTER,
+    TAG_LIST_LAST,
+    TAG_LIST_BEFORE,
+    TAG_LIST_AT,
+    TAG_LIST_COUNT,
+    TAG_LIST_OWNED_FIRST,
+    TAG_LIST_OWNED_AFTER,
+    TAG_LIST_OWNED_LAST,
+    TAG_LIST_OWNED_BEFORE,
+    TAG_LIST_OWNED_AT,
+    TAG_LIST_OWNED_COUNT,
+    TAG_INFO,
+)
 
 if TYPE_CHECKING:
     from bot import RU_COMSCI_bot
 
+_log = logging.getLogger(__name__)
+
 class TagEntry(TypedDict):
     id: int
     name: str
@@ -49,6 +89,61 @@ class TagPages(SimplePages):
         super().__init__(converted, per_page=per_page, ctx=ctx)
 
 
+class TagListPageSource(KeysetPageSource):
+    """Lazily pages through a guild's tags, or a member's tags, ordered by name."""
+
+    def __init__(self, pool: asyncpg.Pool, guild_id: int, owner_id: Optional[int] = None, *, per_page: int = 12):
+        self.pool: asyncpg.Pool = pool
+        self.guild_id: int = guild_id
+        self.owner_id: Optional[int] = owner_id
+        super().__init__(
+            self._fetch,
+            key=lambda entry: (entry.name, entry.id),
+            count=self._count,
+            fetch_before=self._fetch_before,
+            seek=self._seek,
+            per_page=per_page,
+        )
+
+    async def _fetch(self, after: Optional[tuple[str, int]], limit: int) -> list[TagPageEntry]:
+        if self.owner_id is None:
+            if after is None:
+                rows = await queries.fetch(self.pool, TAG_LIST_FIRST, self.guild_id, limit)
+            else:
+                rows = await queries.fetch(self.pool, TAG_LIST_AFTER, self.guild_id, *after, limit)
+        else:
+            if after is None:
+                rows = await queries.fetch(self.pool, TAG_LIST_OWNED_FIRST, self.guild_id, self.owner_id, limit)
+            else:
+                rows = await queries.fetch(self.pool, TAG_LIST_OWNED_AFTER, self.guild_id, self.owner_id, *after, limit)
+        return [TagPageEntry(row) for row in rows]
+
+    async def _fetch_before(self, before: Optional[tuple[str, int]], limit: int) -> list[TagPageEntry]:
+        if self.owner_id is None:
+            if before is None:
+                rows = await queries.fetch(self.pool, TAG_LIST_LAST, self.guild_id, limit)
+            else:
+                rows = await queries.fetch(self.pool, TAG_LIST_BEFORE, self.guild_id, *before, limit)
+        else:
+            if before is None:
+                rows = await queries.fetch(self.pool, TAG_LIST_OWNED_LAST, self.guild_id, self.owner_id, limit)
+            else:
+                rows = await queries.fetch(self.pool, TAG_LIST_OWNED_BEFORE, self.guild_id, self.owner_id, *before, limit)
+        return [TagPageEntry(row) for row in rows]
+
+    async def _seek(self, offset: int, limit: int) -> list[TagPageEntry]:
+        if self.owner_id is None:
+            rows = await queries.fetch(self.pool, TAG_LIST_AT, self.guild_id, offset, limit)
+        else:
+            rows = await queries.fetch(self.pool, TAG_LIST_OWNED_AT, self.guild_id, self.owner_id, offset, limit)
+        return [TagPageEntry(row) for row in rows]
+
+    async def _count(self) -> int:
+        if self.owner_id is None:
+            return await queries.fetchval(self.pool, TAG_LIST_COUNT, self.guild_id)
+        return await queries.fetchval(self.pool, TAG_LIST_OWNED_COUNT, self.guild_id, self.owner_id)
+
+
 class TagName(commands.clean_content):
     def __init__(self, *, lower: bool = False):
         self.lower: bool = lower
@@ -74,12 +169,134 @@ class TagName(commands.clean_content):
         return converted if not self.lower else lower
 
 
+class TagImportReader:
+    """Reads ``(name, content, owner_id, guild_id)`` records from a CSV or JSONL dump.
+
+    Rows are parsed one at a time from ``fp`` so a dump never has to fit in memory.
+    Rows with a missing or invalid name or content are counted in ``skipped``.
+    Iterating parses on the calling thread, :meth:`records` in a worker thread.
+    """
+
+    def __init__(
+            self,
+            fp: IO[bytes],
+            *,
+            filename: str,
+            guild_id: int,
+            owner_id: int,
+            reserved: Iterable[str] = (),
+    ) -> None:
+        self.filename: str = filename.lower()
+        self.guild_id: int = guild_id
+        self.owner_id: int = owner_id
+        self.reserved: frozenset[str] = frozenset(reserved)
+        self.read: int = 0
+        self.skipped: int = 0
+
+        if self.filename.endswith('.gz'):
+            fp = gzip.GzipFile(fileobj=fp, mode='rb')  # type: ignore
+            self.filename = self.filename[:-3]
+        self.fp: IO[bytes] = fp
+
+    @property
+    def format(self) -> str:
+        return 'jsonl' if self.filename.endswith(('.jsonl', '.json', '.ndjson')) else 'csv'
+
+    def _rows(self, text: IO[str]) -> Iterator[Optional[dict[str, Any]]]:
+        if self.format == 'csv':
+            yield from csv.DictReader(text)
+            return
+
+        for line in text:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield None
+            else:
+                yield row if isinstance(row, dict) else None
+
+    def _convert(self, row: Optional[dict[str, Any]]) -> Optional[tuple[str, str, int, int]]:
+        if row is None:
+            return None
+
+        name = str(row.get('name') or '').strip()
+        content = str(row.get('content') or '')
+        if not name or len(name) > 100 or not content or len(content) > 2000:
+            return None
+
+        if name.lower().partition(' ')[0] in self.reserved:
+            return None
+
+        try:
+            owner_id = int(row.get('owner_id') or self.owner_id)
+        except (TypeError, ValueError):
+            owner_id = self.owner_id
+
+        return name, content, owner_id, self.guild_id
+
+    def __iter__(self) -> Iterator[tuple[str, str, int, int]]:
+        text = io.TextIOWrapper(self.fp, encoding='utf-8-sig', newline='')
+        try:
+            for row in self._rows(text):
+                self.read += 1
+                record = self._convert(row)
+                if record is None:
+                    self.skipped += 1
+                    continue
+                yield record
+        finally:
+            text.detach()
+
+    async def records(self, *, batch_size: int = 1000) -> AsyncIterator[tuple[str, str, int, int]]:
+        """Yields the records, parsing ``batch_size`` of them at a time in a thread off the event loop."""
+        records = iter(self)
+        while True:
+            batch = await asyncio.to_thread(list, itertools.islice(records, batch_size))
+            if not batch:
+                return
+            for record in batch:
+                yield record
+
+
 class TagCommands(commands.Cog, name='Tags'):
     """ Tag Commands """
 
     def __init__(self, bot: RU_COMSCI_bot) -> None:
         self.bot: RU_COMSCI_bot = bot
         self._reserved_tags_being_made: dict[int, set[str]] = {}
+        # (guild_id, lowercased name) -> tag row
+        self._tag_cache: LRUCache[tuple[Optional[int], str], TagEntry] = LRUCache(1024, ttl=600.0)
+        # guild_id -> trigram index of tag names, mapped to tag IDs, built on first use
+        # so a process only holds the guilds it serves
+        self._tag_indexes: dict[int, TrigramIndex] = {}
+        self._tag_index_loads: dict[int, asyncio.Task[TrigramIndex]] = {}
+
+    async def get_tag_index(self, guild_id: int) -> TrigramIndex:
+        try:
+            return self._tag_indexes[guild_id]
+        except KeyError:
+            pass
+
+        # concurrent callers share one query
+        load = self._tag_index_loads.get(guild_id)
+        if load is None:
+            load = self._tag_index_loads[guild_id] = asyncio.create_task(self._load_tag_index(guild_id))
+        try:
+            return await asyncio.shield(load)
+        finally:
+            if load.done():
+                self._tag_index_loads.pop(guild_id, None)
+
+    async def _load_tag_index(self, guild_id: int) -> TrigramIndex:
+        rows = await queries.fetch(self.bot.pool, TAG_GUILD_NAMES, guild_id)
+        index = self._tag_indexes[guild_id] = TrigramIndex((row['name'], row['id']) for row in rows)
+        return index
+
+    def loaded_tag_index(self, guild_id: Optional[int]) -> Optional[TrigramIndex]:
+        """The guild's index if it was built already, writes only need to keep that one up to date."""
+        return self._tag_indexes.get(guild_id)
 
     def is_tag_being_made(self, guild_id: int, name: str) -> bool:
         try:
@@ -89,6 +306,9 @@ class TagCommands(commands.Cog, name='Tags'):
         else:
             return name.lower() in being_made
 
+    def invalidate_tag(self, guild_id: Optional[int], name: str) -> None:
+        self._tag_cache.invalidate((guild_id, name.lower()))
+
     async def get_tag(
             self,
             guild_id: Optional[int],
@@ -96,49 +316,97 @@ class TagCommands(commands.Cog, name='Tags'):
             *,
             connection: Optional[asyncpg.Pool | asyncpg.Connection] = None,
     ) -> TagEntry:
-        def disambiguate(rows, query) -> str:
-            if rows is None or len(rows) == 0:
+        def disambiguate(names: list[str]) -> str:
+            if not names:
                 raise RuntimeError('ไม่พบแท็ก')
 
-            names = '\n'.join(r['name'] for r in rows)
+            names = '\n'.join(names)
             raise RuntimeError(f'ไม่พบแท็ก คุณหมายถึง...\n`{names}`')
 
+        key = (guild_id, name.lower())
+        cached = self._tag_cache.get(key)
+        if cached is not None:
+            return cached
+
+        # the index only sees this process's writes, so Postgres decides whether the tag exists
         con = connection or self.bot.pool
+        index = self.loaded_tag_index(guild_id)
 
-        query = """SELECT name, content FROM rucs_tags WHERE guild_id=$1 AND LOWER(name)=$2;"""
-        row = await con.fetchrow(query, guild_id, name)
+        row = await queries.fetchrow(con, TAG_GET, guild_id, name)
         if row is None:
-            query = """SELECT     name
-                       FROM       rucs_tags
-                       WHERE      guild_id=$1 AND name % $2
-                       ORDER BY   similarity(name, $2) DESC
-                       LIMIT 3;
-                    """
-            return disambiguate(await con.fetch(query, guild_id, name), name)
-        else:
-            return row
+            if index is not None:
+                # deleted somewhere else
+                index.remove(name)
+                suggestions = [n for n, _, _ in index.search(name, limit=3)]
+                if suggestions:
+                    return disambiguate(suggestions)
+
+            return disambiguate([r['name'] for r in await queries.fetch(con, TAG_SIMILAR, guild_id, name)])
+
+        if index is not None and row['name'] not in index:
+            # created somewhere else
+            index.add(row['name'], row['id'])
+        self._tag_cache.set(key, row)
+        return row
 
     async def create_tag(self, ctx: GuildContext, name: str, content: str) -> None:
 
-        is_already = await ctx.db.fetchrow(f'SELECT name from rucs_tags where LOWER(name) = $1 and guild_id = $2', name,
-                                           ctx.guild.id)
-        if is_already:
+        # the unique index on (guild_id, LOWER(name)) decides who wins a race
+        try:
+            tag_id = await queries.fetchval(ctx.db, TAG_INSERT, name, content, ctx.author.id, ctx.guild.id)
+        except asyncpg.PostgresError:
+            _log.exception('Could not create tag %r in guild %s', name, ctx.guild.id)
+            return await ctx.send('ไม่สามารถสร้างแท็ก.')
+
+        if tag_id is None:
             return await ctx.send(f'แท็ก `{name}` มีอยู่แล้ว.')
 
-        query = """INSERT INTO rucs_tags(name, content, owner_id, guild_id) VALUES ($1, $2, $3, $4);"""
+        self.invalidate_tag(ctx.guild.id, name)
+        index = self.loaded_tag_index(ctx.guild.id)
+        if index is not None:
+            index.add(name, tag_id)
+        await ctx.send(f'สร้างแท็ก `{name}` สำเร็จแล้ว.')
 
-        async with ctx.acquire():
-            tr = ctx.db.transaction()  # type: ignore
-            await tr.start()
-            try:
-                await ctx.db.execute(query, name, content, ctx.author.id, ctx.guild.id)
-            except Exception as e:
-                print(e)
-                await tr.rollback()
-                await ctx.send('ไม่สามารถสร้างแท็ก.')
-            else:
-                await tr.commit()
-                await ctx.send(f'สร้างแท็ก `{name}` สำเร็จแล้ว.')
+    async def bulk_create_tags(
+            self,
+            connection: asyncpg.Connection,
+            records: Union[Iterable[tuple[Any, ...]], AsyncIterable[tuple[Any, ...]]],
+    ) -> list[asyncpg.Record]:
+        """Creates many tags at once with ``COPY``.
+
+        ``records`` are ``(name, content, owner_id, guild_id)`` tuples and may be an
+        async iterable, so they never have to be held in memory all at once.
+        Names that already exist are skipped. Returns the created ``(id, guild_id, name)`` rows.
+        """
+        async with connection.transaction():
+            await connection.execute(
+                """CREATE TEMPORARY TABLE rucs_tags_import (
+                       name TEXT NOT NULL,
+                       content TEXT NOT NULL,
+                       owner_id BIGINT NOT NULL,
+                       guild_id BIGINT NOT NULL
+                   ) ON COMMIT DROP;
+                """
+            )
+            await connection.copy_records_to_table(
+                'rucs_tags_import',
+                records=records,
+                columns=('name', 'content', 'owner_id', 'guild_id'),
+            )
+            created = await connection.fetch(
+                """INSERT INTO rucs_tags (name, content, owner_id, guild_id)
+                   SELECT name, content, owner_id, guild_id FROM rucs_tags_import
+                   ON CONFLICT (guild_id, LOWER(name)) DO NOTHING
+                   RETURNING id, guild_id, name;
+                """
+            )
+
+        for row in created:
+            self.invalidate_tag(row['guild_id'], row['name'])
+            index = self.loaded_tag_index(row['guild_id'])
+            if index is not None:
+                index.add(row['name'], row['id'])
+        return created
 
     @commands.hybrid_group(fallback='get')
     @app_commands.describe(name='แท็ก')
@@ -178,12 +446,12 @@ class TagCommands(commands.Cog, name='Tags'):
             content: Annotated[str, commands.clean_content],
     ) -> None:
         """ แก้ไขแท็ก """
-        query = "UPDATE rucs_tags SET content=$1 WHERE LOWER(name)=$2 AND guild_id=$3 AND owner_id=$4;"
-        status = await ctx.db.execute(query, content, name, ctx.guild.id, ctx.author.id)
+        updated = await queries.fetchval(ctx.db, TAG_EDIT, content, name, ctx.guild.id, ctx.author.id)
 
-        if status[-1] == '0':
+        if updated is None:
             await ctx.send('ไม่สามารถแก้ไขแท็กนั้นได้ คุณแน่ใจหรือว่ามันมีอยู่และคุณเป็นเจ้าของมัน?')
         else:
+            self.invalidate_tag(ctx.guild.id, name)
             await ctx.send('แก้ไขแท็กเรียบร้อยแล้ว.')
 
     @tag.command(aliases=['delete'])
@@ -194,21 +462,20 @@ class TagCommands(commands.Cog, name='Tags'):
         """ ลบแท็ก """
 
         bypass_owner_check = ctx.author.id == self.bot.owner_id or ctx.author.guild_permissions.manage_messages
-        clause = 'LOWER(name)=$1 AND guild_id=$2'
 
         if bypass_owner_check:
-            args = [name, ctx.guild.id]
+            deleted = await queries.fetchrow(ctx.db, TAG_DELETE, name, ctx.guild.id)
         else:
-            args = [name, ctx.guild.id, ctx.author.id]
-            clause = f'{clause} AND owner_id=$3'
-
-        query = f'DELETE FROM rucs_tags WHERE {clause} RETURNING name;'
-        deleted = await ctx.db.fetchrow(query, *args)
+            deleted = await queries.fetchrow(ctx.db, TAG_DELETE_OWNED, name, ctx.guild.id, ctx.author.id)
 
         if deleted is None:
             await ctx.send('ไม่สามารถลบแท็ก ไม่มีอยู่จริงหรือคุณไม่ได้รับอนุญาตให้ทำเช่นนั้น')
             return
 
+        self.invalidate_tag(ctx.guild.id, deleted[0])
+        index = self.loaded_tag_index(ctx.guild.id)
+        if index is not None:
+            index.remove(deleted[0])
         await ctx.send(f'แท็ก `{deleted[0]}` ถูกลบเรียบร้อยแล้ว')
 
     @tag.command()
@@ -222,29 +489,31 @@ class TagCommands(commands.Cog, name='Tags'):
             return await ctx.send('ไม่สามารถเปลี่ยนชื่อแท็กให้เหมือนกันได้')
 
         bypass_owner_check = ctx.author.id == self.bot.owner_id or ctx.author.guild_permissions.manage_messages
-        clause = 'LOWER(name)=$1 AND guild_id=$2'
 
         if bypass_owner_check:
-            args = [old_name, ctx.guild.id]
+            selected = await queries.fetchrow(ctx.db, TAG_SELECT_ID, old_name.lower(), ctx.guild.id)
         else:
-            args = [old_name, ctx.guild.id, ctx.author.id]
-            clause = f'{clause} AND owner_id=$3'
+            selected = await queries.fetchrow(ctx.db, TAG_SELECT_ID_OWNED, old_name.lower(), ctx.guild.id, ctx.author.id)
 
-        query = f'SELECT id FROM rucs_tags WHERE {clause};'
-        selected = await ctx.db.fetchrow(query, *args)
         if selected is None:
             return await ctx.send('ไม่สามารถเปลี่ยนชื่อแท็กได้ แท็กไม่มีอยู่จริงหรือคุณไม่ได้รับอนุญาต')
 
         # check if tag exists
-        query = f'SELECT name FROM rucs_tags WHERE name = $1;'
-        exists = await ctx.db.fetchrow(query, new_name.lower())
+        exists = await queries.fetchrow(ctx.db, TAG_EXISTS, ctx.guild.id, new_name.lower())
         if exists is not None:
-            if exists['name'].lower() == new_name.lower():
-                return await ctx.send(f'แท็ก `{new_name}` มีอยู่แล้ว กรุณาเลือกชื่อใหม่')
+            return await ctx.send(f'แท็ก `{new_name}` มีอยู่แล้ว กรุณาเลือกชื่อใหม่')
 
-        args.append(new_name)
-        query = f'UPDATE rucs_tags SET name=${len(args)} WHERE {clause};'
-        await ctx.db.execute(query, *args)
+        try:
+            await queries.fetch(ctx.db, TAG_RENAME, selected['id'], new_name)
+        except asyncpg.UniqueViolationError:
+            # someone else took the name in the meantime
+            return await ctx.send(f'แท็ก `{new_name}` มีอยู่แล้ว กรุณาเลือกชื่อใหม่')
+        self.invalidate_tag(ctx.guild.id, old_name)
+        self.invalidate_tag(ctx.guild.id, new_name)
+        index = self.loaded_tag_index(ctx.guild.id)
+        if index is not None:
+            index.remove(old_name)
+            index.add(new_name, selected['id'])
         await ctx.send(f'แท็ก `{old_name}` ถูกเปลี่ยนชื่อเป็น `{new_name}` เรียบร้อยแล้ว')
 
     @tag.command(name='list')
@@ -254,19 +523,12 @@ class TagCommands(commands.Cog, name='Tags'):
     async def _list(self, ctx: GuildContext, member: Optional[discord.Member] = None) -> None:
         """ ดูแท็กทั่งหมด หรือ ดูแท็กของผู้ใช้ที่ระบุ """
 
-        clause = 'guild_id=$1'
-        args = [ctx.guild.id]
-        if member is not None:
-            clause = f'{clause} AND owner_id=$2'
-            args = [ctx.guild.id, member.id]
-
-        query = f"SELECT name, id FROM rucs_tags WHERE {clause} ORDER BY name;"
-
-        rows = await ctx.db.fetch(query, *args)
+        source = TagListPageSource(self.bot.pool, ctx.guild.id, member.id if member is not None else None)
         await ctx.release()
+        await source.prepare()
 
-        if rows:
-            p = TagPages(entries=rows, ctx=ctx)
+        if source.has_entries:
+            p = KeysetPages(source, ctx=ctx)
             p.embed.color = self.bot.theme
             if member is not None:
                 p.embed.set_author(name=member.display_name, icon_url=member.display_avatar.url)
@@ -283,14 +545,12 @@ class TagCommands(commands.Cog, name='Tags'):
         if len(query) < 3:
             return await ctx.send('ข้อความค้นหาต้องมีอย่าง 3 อักขระ')
 
-        sql = """SELECT name, id
-                 FROM rucs_tags
-                 WHERE guild_id=$1 AND name % $2
-                 ORDER BY similarity(name, $2) DESC
-                 LIMIT 100;
-              """
-
-        results = await ctx.db.fetch(sql, ctx.guild.id, query)
+        results = await queries.fetch(ctx.db, TAG_SEARCH, ctx.guild.id, query)
+        index = self.loaded_tag_index(ctx.guild.id)
+        if index is not None:
+            for row in results:
+                if row['name'] not in index:
+                    index.add(row['name'], row['id'])
 
         if results:
             p = TagPages(entries=results, per_page=20, ctx=ctx)
@@ -307,9 +567,7 @@ class TagCommands(commands.Cog, name='Tags'):
     async def info(self, ctx: GuildContext, *, name: Annotated[str, TagName(lower=True)]) -> None:
         """ ดูข้อมูลแท็ก """
 
-        query = """SELECT * FROM rucs_tags WHERE LOWER(name)=$1 AND guild_id=$2"""
-
-        record = await ctx.db.fetchrow(query, name, ctx.guild.id)
+        record = await queries.fetchrow(ctx.db, TAG_INFO, name, ctx.guild.id)
         if record is None:
             return await ctx.send('ไม่พบแท็กนี้')
 
@@ -327,6 +585,100 @@ class TagCommands(commands.Cog, name='Tags'):
         embed.add_field(name='เจ้าของ', value=f'<@{owner_id}>')
         await ctx.send(embed=embed)
 
+    @tag.autocomplete('name')
+    @edit.autocomplete('name')
+    @remove.autocomplete('name')
+    @info.autocomplete('name')
+    async def tag_name_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+        """Autocomplete for tag names."""
+        if interaction.guild_id is None:
+            return []
+
+        index = await self.get_tag_index(interaction.guild_id)
+        return [app_commands.Choice(name=name, value=name) for name in index.complete(current, limit=25)]
+
+    @tag.command(name='import', hidden=True, with_app_command=False)
+    @commands.is_owner()
+    @commands.guild_only()
+    async def _import(self, ctx: GuildContext) -> None:
+        """ นำเข้าแท็กจากไฟล์ .csv หรือ .jsonl """
+        if not ctx.message.attachments:
+            return await ctx.send('กรุณาแนบไฟล์ .csv หรือ .jsonl')
+
+        attachment = ctx.message.attachments[0]
+        root: commands.GroupMixin = self.tag  # type: ignore
+
+        with tempfile.TemporaryFile() as fp:
+            async with self.bot.session.get(attachment.url) as resp:
+                if resp.status != 200:
+                    return await ctx.send('ไม่สามารถดาวน์โหลดไฟล์ได้')
+
+                async for chunk in resp.content.iter_chunked(64 * 1024):
+                    await asyncio.to_thread(fp.write, chunk)
+
+            await asyncio.to_thread(fp.seek, 0)
+            reader = TagImportReader(
+                fp,
+                filename=attachment.filename,
+                guild_id=ctx.guild.id,
+                owner_id=ctx.author.id,
+                reserved=root.all_commands,
+            )
+
+            async with ctx.acquire():
+                try:
+                    created = await self.bulk_create_tags(ctx.db, reader.records())  # type: ignore
+                except (asyncpg.PostgresError, csv.Error, UnicodeDecodeError, OSError) as e:
+                    _log.exception('Could not import tags from %s', attachment.filename)
+                    return await ctx.send(f'ไม่สามารถนำเข้าแท็กได้: {e}')
+
+        duplicates = reader.read - reader.skipped - len(created)
+        await ctx.send(
+            f'นำเข้าแท็ก `{len(created)}` แท็กเรียบร้อยแล้ว '
+            f'(ข้อมูลไม่ถูกต้อง `{reader.skipped}`, มีอยู่แล้ว `{duplicates}`)'
+        )
+
+    @tag.command(name='export', hidden=True, with_app_command=False)
+    @commands.is_owner()
+    @commands.guild_only()
+    async def _export(self, ctx: GuildContext) -> None:
+        """ ส่งออกแท็กทั้งหมดของเซิร์ฟเวอร์เป็นไฟล์ .csv """
+        query = """SELECT name, content, owner_id, created_at
+                   FROM rucs_tags
+                   WHERE guild_id=$1
+                   ORDER BY name
+                """
+
+        with tempfile.TemporaryFile() as fp:
+            async with ctx.acquire():
+                status = await ctx.db.copy_from_query(query, ctx.guild.id, output=fp, format='csv', header=True)
+
+            if status == 'COPY 0':
+                return await ctx.send('ไม่พบแท็กใดๆ')
+
+            await ctx.safe_send_file(fp, filename=f'tags-{ctx.guild.id}.csv')
+
+    @tag.command(name='cache', hidden=True, with_app_command=False)
+    @commands.is_owner()
+    async def _cache(self, ctx: Context, clear: bool = False) -> None:
+        """ ดูสถิติแคชของแท็ก """
+        cache = self._tag_cache
+        stats = cache.stats
+        await ctx.entry_to_code([
+            ('Size', f'{len(cache)}/{cache.max_size}'),
+            ('TTL', f'{cache.ttl:.0f}s' if cache.ttl is not None else 'None'),
+            ('Hits', str(stats.hits)),
+            ('Misses', str(stats.misses)),
+            ('Hit ratio', f'{stats.hit_ratio:.2%}'),
+            ('Evictions', str(stats.evictions)),
+            ('Expirations', str(stats.expirations)),
+        ])
+
+        if clear:
+            cache.clear()
+            stats.reset()
+            await ctx.send('ล้างแคชแท็กเรียบร้อยแล้ว')
+
 
 async def setup(bot: RU_COMSCI_bot) -> None:
     await bot.add_cog(TagCommands(bot))
@@ -1,10 +1,23 @@
+import os
+import sys
+import json
+import time
 import asyncio
 import asyncpg
 import logging
+import argparse
+import datetime
+import statistics
 import contextlib
+import subprocess
+from typing import Callable, Optional
 from logging.handlers import RotatingFileHandler
 
 from bot import RU_COMSCI_bot
+from utils.config import PROFILES, GatewayConfig
+from utils.db import PoolConfig, create_pool
+from utils.migrations import Migrations
+from utils.startup import measure_imports
 
 try:
     import uvloop  # type: ignore
@@ -59,27 +72,316 @@ def main():
 
 async def run_bot():
     log = logging.getLogger()
-    # localhost = {
-    #     "user": "postgres",
-    #     "password": "password",
-    #     "database": "postgres",
-    #     "host": "localhost",
-    #     "port": "5432",
-    # }
-    # kwargs = {
-    #     'command_timeout': 60,
-    #     'max_size': 20,
-    #     'min_size': 20,
-    # }
-    # try:
-    #     pool = await asyncpg.create_pool(**localhost, **kwargs)
-    # except Exception as e:
-    #     log.exception('could not set up PostgreSQL. Exiting.')
-    bot = RU_COMSCI_bot()
-    # bot.pool = pool
+    config = PoolConfig.from_env()
+    try:
+        pool = await create_pool(config)
+    except Exception:
+        log.exception('could not set up PostgreSQL. Exiting.')
+        return
+
+    bot = RU_COMSCI_bot.from_config()
+    bot.pool = pool
+    bot.pool_config = config
     await bot.start()
 
 
+async def run_migrations(command: str, target: Optional[int]) -> int:
+    config = PoolConfig.from_env()
+    if not config.dsn:
+        print('POSTGRES_DSN is not set.', file=sys.stderr)
+        return 1
+
+    migrations = Migrations()
+    con = await asyncpg.connect(config.dsn)
+    try:
+        current = await migrations.current_version(con)
+        if command == 'current':
+            print(f'current: V{current}, latest: V{migrations.latest}')
+            return 0
+
+        if command == 'init' and current != 0:
+            print(f'database is already initialised (V{current}), use "db upgrade" instead.', file=sys.stderr)
+            return 1
+
+        applied = await migrations.upgrade(con, target=target)
+    finally:
+        await con.close()
+
+    if not applied:
+        print(f'nothing to do, database is at V{current}.')
+    for migration in applied:
+        print(f'applied V{migration.version}: {migration.description}')
+    return 0
+
+
+def _git_head() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_startup_bench(runs: int, output: str, top: int) -> int:
+    """Measures cold imports and extension loading without connecting to Discord.
+
+    Imports are timed with ``-X importtime`` in fresh interpreters, extensions
+    are loaded in this process. Every run is appended to ``output`` as a JSON
+    line so the numbers can be compared across commits.
+    """
+    root = os.path.dirname(os.path.abspath(__file__))
+    samples = [measure_imports('bot', cwd=root) for _ in range(runs)]
+    import_ms = statistics.median(sample['bot'][1] for sample in samples) / 1000
+    heaviest = sorted(samples[-1].items(), key=lambda item: item[1][1], reverse=True)
+    # only top level packages, their submodules are already counted in them
+    heaviest = [(name, cumulative / 1000) for name, (_, cumulative) in heaviest if '.' not in name][:top]
+
+    loads: dict[str, list[float]] = {}
+    for _ in range(runs):
+        bot = RU_COMSCI_bot()
+        for ext in bot.initial_extensions:
+            start = time.perf_counter()
+            try:
+                await bot.load_extension(ext)
+            except Exception:
+                logging.getLogger().exception('failed to load %s', ext)
+                continue
+            loads.setdefault(ext, []).append((time.perf_counter() - start) * 1000)
+
+        for ext in list(bot.extensions):
+            await bot.unload_extension(ext)
+
+    load_ms = {ext: statistics.median(values) for ext, values in loads.items()}
+    entry = {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'commit': _git_head(),
+        'python': sys.version.split()[0],
+        'runs': runs,
+        'import_ms': round(import_ms, 1),
+        'load_ms': {ext: round(ms, 1) for ext, ms in load_ms.items()},
+        'heaviest_imports_ms': {name: round(ms, 1) for name, ms in heaviest},
+    }
+
+    previous = None
+    with contextlib.suppress(OSError, ValueError, IndexError):
+        with open(output, encoding='utf-8') as fp:
+            previous = json.loads(fp.readlines()[-1])
+
+    with open(output, 'a', encoding='utf-8') as fp:
+        fp.write(json.dumps(entry) + '\n')
+
+    total = import_ms + sum(load_ms.values())
+    print(f'import bot: {import_ms:8.1f} ms')
+    for ext, ms in load_ms.items():
+        print(f'load {ext}: {ms:8.1f} ms')
+    print(f'total: {total:8.1f} ms')
+    if previous is not None:
+        before = previous['import_ms'] + sum(previous['load_ms'].values())
+        print(f'previous ({previous.get("commit")}): {before:8.1f} ms ({total - before:+.1f} ms)')
+
+    print('\nheaviest imports:')
+    for name, ms in heaviest:
+        print(f'  {name:<30} {ms:8.1f} ms')
+    return 0
+
+
+def run_cache_bench(profiles: list[str], members: int, messages: int) -> int:
+    """Replays synthetic gateway payloads under each cache profile and prints what stays in memory."""
+    from benchmarks.gateway import replay
+
+    print(f'{"profile":<8} {"members":>8} {"messages":>9} {"MiB":>8} {"MiB / 10k members":>18}')
+    for profile in profiles:
+        result = replay(GatewayConfig.from_profile(profile), members=members, messages=messages)
+        print(f'{profile:<8} {result["cached_members"]:>8} {result["cached_messages"]:>9} '
+              f'{result["bytes"] / 2 ** 20:>8.2f} {result["bytes_per_10k_members"] / 2 ** 20:>18.2f}')
+    return 0
+
+
+async def run_role_bench(members: int, clicks: int, burst: float, limit: int, per: float, debounce: float) -> int:
+    """Replays a burst of role button clicks against a fake HTTP client, with and without the role queue."""
+    from benchmarks.roles import run
+
+    results = await run(members=members, clicks=clicks, burst=burst, limit=limit, per=per, debounce=debounce)
+    print(f'{"mode":<7} {"clicks":>7} {"requests":>9} {"429s":>6} {"correct":>9} '
+          f'{"wait p50":>9} {"wait max":>9} {"elapsed":>8}')
+    for result in results:
+        print(f'{result["mode"]:<7} {result["clicks"]:>7} {result["requests"]:>9} {result["rate_limited"]:>6} '
+              f'{result["correct"]:>4}/{result["members"]:<4} {result["wait_p50"]:>8.2f}s {result["wait_max"]:>8.2f}s '
+              f'{result["elapsed"]:>7.2f}s')
+    return 0 if results[-1]['correct'] == results[-1]['members'] else 1
+
+
+async def run_pages_bench(pages: int, cache_size: int) -> int:
+    """Flips through a long paginator with and without the rendered page cache."""
+    from benchmarks.pages import run
+
+    results = await run(pages=pages, cache_size=cache_size)
+    print(f'{"source":<16} {"cache":>5} {"pattern":>7} {"pages":>6} {"presses":>8} {"renders":>8} '
+          f'{"render ms":>9} {"cpu/press us":>12} {"p50 us":>8} {"p95 us":>8}')
+    for result in results:
+        print(f'{result["source"]:<16} {result["cache_size"]:>5} {result["pattern"]:>7} {result["pages"]:>6} '
+              f'{result["presses"]:>8} {result["renders"]:>8} {result["render_total"] * 1e3:>9.1f} '
+              f'{result["cpu_per_press"] * 1e6:>12.1f} {result["press_p50"] * 1e6:>8.1f} {result["press_p95"] * 1e6:>8.1f}')
+    return 0
+
+
+async def run_queries_bench(tags: int, iterations: int) -> int:
+    """Times tag lookups with ad-hoc, cached and prepared statements against POSTGRES_DSN."""
+    from benchmarks.db import prepared_vs_adhoc
+
+    config = PoolConfig.from_env()
+    if not config.dsn:
+        print('POSTGRES_DSN is not set.', file=sys.stderr)
+        return 1
+
+    results = await prepared_vs_adhoc(config.dsn, tags=tags, iterations=iterations)
+    print(f'{"mode":<9} {"queries":>8} {"p50 us":>8} {"p95 us":>8} {"queries/s":>10}')
+    for result in results:
+        print(f'{result["mode"]:<9} {result["iterations"]:>8} {result["p50"] * 1e6:>8.1f} '
+              f'{result["p95"] * 1e6:>8.1f} {result["per_second"]:>10.0f}')
+    return 0
+
+
+async def run_tags_bench(contenders: int, rounds: int, tags: int) -> int:
+    """Races concurrent creates of one tag and times bulk creation against POSTGRES_DSN."""
+    from benchmarks.db import bulk_create, create_race
+
+    config = PoolConfig.from_env()
+    if not config.dsn:
+        print('POSTGRES_DSN is not set.', file=sys.stderr)
+        return 1
+
+    race = await create_race(config.dsn, contenders=contenders, rounds=rounds)
+    print(f'{race["contenders"]} members creating the same tag, {race["rounds"]} rounds:')
+    print(f'  created {race["created"]}, already exists {race["duplicates"]}, errors {race["errors"]}, '
+          f'rows {race["rows"]}, owned by the winner {race["owners_match"]}')
+
+    print(f'\n{"mode":<11} {"tags":>7} {"created":>8} {"seconds":>8} {"tags/s":>9}')
+    for result in await bulk_create(config.dsn, tags=tags):
+        print(f'{result["mode"]:<11} {result["tags"]:>7} {result["created"]:>8} {result["elapsed"]:>8.2f} '
+              f'{result["tags"] / result["elapsed"]:>9.0f}')
+
+    ok = race['created'] == race['rounds'] == race['rows'] == race['owners_match'] and not race['errors']
+    return 0 if ok else 1
+
+
+async def run_calc_bench(expressions: int, concurrency: int) -> int:
+    """Measures event loop lag while hostile calculator expressions are evaluated."""
+    from benchmarks.calc import run
+
+    results = await run(expressions=expressions, concurrency=concurrency)
+    print(f'{"mode":<11} {"exprs":>6} {"rejected":>9} {"seconds":>8} {"samples":>8} '
+          f'{"lag p50 ms":>11} {"lag p99 ms":>11} {"lag max ms":>11}')
+    for result in results:
+        print(f'{result["mode"]:<11} {result["expressions"]:>6} {result["rejected"]:>9} {result["elapsed"]:>8.2f} '
+              f'{result["lag_samples"]:>8} {result["lag_p50"] * 1e3:>11.2f} {result["lag_p99"] * 1e3:>11.2f} '
+              f'{result["lag_max"] * 1e3:>11.2f}')
+    return 0
+
+
+def run_baseconv_bench(chars: int) -> int:
+    """Measures base conversion throughput in characters per second, Thai included."""
+    from benchmarks.baseconv import run
+
+    results = run(chars=chars)
+    print(f'{"text":<6} {"base":>4} {"chars":>7} {"bytes":>7} {"encode c/s":>11} {"decode c/s":>11} '
+          f'{"naive c/s":>11} {"round trip":>10}')
+    for result in results:
+        print(f'{result["text"]:<6} {result["base"]:>4} {result["chars"]:>7} {result["bytes"]:>7} '
+              f'{result["encode"]:>11,.0f} {result["decode"]:>11,.0f} {result["naive_encode"]:>11,.0f} '
+              f'{"ok" if result["round_trip"] else "FAILED":>10}')
+    return 0 if all(result['round_trip'] for result in results) else 1
+
+
+def run_lines_bench(files: int, changed: float) -> int:
+    """Counts the lines of a large synthetic tree with and without the line count index."""
+    from benchmarks.line_count import run
+
+    results = run(files=files, changed=changed)
+    print(f'{"mode":<10} {"files":>6} {"lines":>9} {"ms":>9} {"correct":>8}')
+    for result in results:
+        print(f'{result["mode"]:<10} {result["files"]:>6} {result["lines"]:>9} {result["elapsed"] * 1e3:>9.1f} '
+              f'{"yes" if result["correct"] else "NO":>8}')
+    return 0 if all(result['correct'] for result in results) else 1
+
+
+# bench subcommand -> runner, each returns the exit code
+BENCHMARKS: dict[str, Callable[[argparse.Namespace], int]] = {
+    'startup': lambda args: asyncio.run(run_startup_bench(args.runs, args.output, args.top)),
+    'cache': lambda args: run_cache_bench(args.profile or list(PROFILES), args.members, args.messages),
+    'roles': lambda args: asyncio.run(
+        run_role_bench(args.members, args.clicks, args.burst, args.limit, args.per, args.debounce)
+    ),
+    'pages': lambda args: asyncio.run(run_pages_bench(args.pages, args.cache_size)),
+    'queries': lambda args: asyncio.run(run_queries_bench(args.tags, args.iterations)),
+    'calc': lambda args: asyncio.run(run_calc_bench(args.expressions, args.concurrency)),
+    'baseconv': lambda args: run_baseconv_bench(args.chars),
+    'lines': lambda args: run_lines_bench(args.files, args.changed),
+    'tags': lambda args: asyncio.run(run_tags_bench(args.contenders, args.rounds, args.tags)),
+}
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='RU computer science Discord bot')
+    subparsers = parser.add_subparsers(dest='group')
+
+    db = subparsers.add_parser('db', help='manage the database schema')
+    db_commands = db.add_subparsers(dest='command', required=True)
+    db_commands.add_parser('init', help='create the schema from scratch')
+    upgrade = db_commands.add_parser('upgrade', help='apply pending migrations')
+    upgrade.add_argument('--target', type=int, default=None, help='stop at this version')
+    db_commands.add_parser('current', help='show the current schema version')
+
+    bench = subparsers.add_parser('bench', help='benchmarks that run without connecting to Discord')
+    bench_commands = bench.add_subparsers(dest='command', required=True)
+    startup = bench_commands.add_parser('startup', help='measure imports and extension loading')
+    startup.add_argument('--runs', type=int, default=3, help='take the median of this many runs')
+    startup.add_argument('--output', default='startup_bench.jsonl', help='append the results to this file')
+    startup.add_argument('--top', type=int, default=15, help='how many of the heaviest imports to show')
+    cache = bench_commands.add_parser('cache', help='measure state memory under each cache profile')
+    cache.add_argument('--members', type=int, default=10_000, help='members in the synthetic guild')
+    cache.add_argument('--messages', type=int, default=5_000, help='messages to replay')
+    cache.add_argument('--profile', choices=PROFILES, action='append', help='only run these profiles')
+    roles = bench_commands.add_parser('roles', help='load test the role queue against a fake HTTP client')
+    roles.add_argument('--members', type=int, default=200, help='members clicking the role buttons')
+    roles.add_argument('--clicks', type=int, default=3, help='up to this many clicks per member')
+    roles.add_argument('--burst', type=float, default=2.0, help='spread the clicks over this many seconds')
+    roles.add_argument('--limit', type=int, default=50, help='requests the fake rate limit allows per window')
+    roles.add_argument('--per', type=float, default=1.0, help='rate limit window in seconds')
+    roles.add_argument('--debounce', type=float, default=0.2, help='role queue debounce in seconds')
+    pages = bench_commands.add_parser('pages', help='flip through a long paginator with and without the page cache')
+    pages.add_argument('--pages', type=int, default=500, help='pages in each source')
+    pages.add_argument('--cache-size', type=int, default=16, help='rendered pages to keep')
+
+    queries = bench_commands.add_parser('queries', help='time ad-hoc vs prepared tag lookups against POSTGRES_DSN')
+    queries.add_argument('--tags', type=int, default=1000, help='tags to look up, added and removed again')
+    queries.add_argument('--iterations', type=int, default=5000, help='lookups per mode')
+
+    calc = bench_commands.add_parser('calc', help='measure event loop lag while hostile expressions are evaluated')
+    calc.add_argument('--expressions', type=int, default=3000, help='expressions to evaluate in each mode')
+    calc.add_argument('--concurrency', type=int, default=4, help='expressions in flight at once')
+
+    baseconv = bench_commands.add_parser('baseconv', help='measure base conversion throughput, Thai included')
+    baseconv.add_argument('--chars', type=int, default=100_000, help='characters of each text to convert')
+
+    lines = bench_commands.add_parser('lines', help='count the lines of a large synthetic tree with the line count index')
+    lines.add_argument('--files', type=int, default=5000, help='Python files in the tree')
+    lines.add_argument('--changed', type=float, default=0.01, help='fraction of files changed before the last refresh')
+
+    tags = bench_commands.add_parser('tags', help='race concurrent tag creates and time bulk creation against POSTGRES_DSN')
+    tags.add_argument('--contenders', type=int, default=50, help='members creating the same tag at once')
+    tags.add_argument('--rounds', type=int, default=10, help='how many times to race')
+    tags.add_argument('--tags', type=int, default=10000, help='tags to create one by one and in bulk')
+
+    return parser.parse_args(argv)
+
+
 if __name__ == '__main__':
+    args = parse_args(sys.argv[1:])
+    if args.group == 'db':
+        sys.exit(asyncio.run(run_migrations(args.command, getattr(args, 'target', None))))
+    if args.group == 'bench':
+        sys.exit(BENCHMARKS[args.command](args))
+
     with contextlib.suppress(KeyboardInterrupt):
         main()
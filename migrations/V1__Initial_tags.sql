@@ -0,0 +1,23 @@
+-- Revises: V0
+-- Creation Date: 2026-10-18
+-- Reason: Initial tags schema
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE TABLE IF NOT EXISTS rucs_tags (
+    id SERIAL PRIMARY KEY,
+    name TEXT NOT NULL,
+    content TEXT NOT NULL,
+    owner_id BIGINT NOT NULL,
+    guild_id BIGINT NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT (now() at time zone 'utc')
+);
+
+-- exact lookups: WHERE guild_id=$1 AND LOWER(name)=$2
+CREATE UNIQUE INDEX IF NOT EXISTS rucs_tags_uniq_idx ON rucs_tags (guild_id, LOWER(name));
+
+-- fuzzy search: name % $1 ORDER BY similarity(name, $1)
+CREATE INDEX IF NOT EXISTS rucs_tags_name_trgm_idx ON rucs_tags USING GIN (name gin_trgm_ops);
+
+-- tag list @member
+CREATE INDEX IF NOT EXISTS rucs_tags_guild_id_owner_id_idx ON rucs_tags (guild_id, owner_id);
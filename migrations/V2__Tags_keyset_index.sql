@@ -0,0 +1,6 @@
+-- Revises: V1
+-- Creation Date: 2026-10-18
+-- Reason: Keyset pagination for tag list
+
+-- tag list: WHERE guild_id=$1 AND (name, id) > ($2, $3) ORDER BY name, id
+CREATE INDEX IF NOT EXISTS rucs_tags_guild_id_name_id_idx ON rucs_tags (guild_id, name, id);
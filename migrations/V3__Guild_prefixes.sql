@@ -0,0 +1,8 @@
+-- Revises: V2
+-- Creation Date: 2026-10-18
+-- Reason: Per-guild command prefixes
+
+CREATE TABLE IF NOT EXISTS rucs_prefixes (
+    guild_id BIGINT PRIMARY KEY,
+    prefixes TEXT[] NOT NULL
+);
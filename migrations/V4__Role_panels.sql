@@ -0,0 +1,23 @@
+-- Revises: V3
+-- Creation Date: 2026-10-18
+-- Reason: Role button panels configured per guild
+
+CREATE TABLE IF NOT EXISTS rucs_role_panels (
+    id SERIAL PRIMARY KEY,
+    guild_id BIGINT NOT NULL,
+    name TEXT NOT NULL,
+    description TEXT,
+    channel_id BIGINT,
+    message_id BIGINT,
+    UNIQUE (guild_id, name)
+);
+
+CREATE TABLE IF NOT EXISTS rucs_role_buttons (
+    custom_id TEXT PRIMARY KEY,
+    panel_id INTEGER NOT NULL REFERENCES rucs_role_panels (id) ON DELETE CASCADE,
+    role_id BIGINT NOT NULL,
+    label TEXT NOT NULL,
+    emoji TEXT,
+    position INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (panel_id, role_id)
+);
@@ -0,0 +1,173 @@
+"""Fakes and data generators shared by the tests."""
+from __future__ import annotations
+
+import os
+import random
+import asyncio
+from typing import Any, Optional
+
+import asyncpg
+
+from utils.fuzzy import TrigramIndex
+
+
+class FakeObject:
+    __slots__ = ('id',)
+
+    def __init__(self, id: int) -> None:
+        self.id: int = id
+
+
+class FakeRoleHTTP:
+    """Stands in for :class:`discord.http.HTTPClient`, keeping every member's roles."""
+
+    def __init__(self) -> None:
+        self.requests: int = 0
+        self.roles: dict[int, set[int]] = {}
+
+    async def edit_member(self, guild_id: int, user_id: int, *, reason: Optional[str] = None, **fields: Any) -> None:
+        self.requests += 1
+        self.roles[user_id] = set(fields['roles'])
+
+
+class FakeMember:
+    """Just enough of :class:`discord.Member` for :class:`RoleAssignmentQueue`.
+
+    The roles are read from the fake HTTP client, like the member cache
+    catching up through the gateway.
+    """
+
+    __slots__ = ('id', 'guild', 'http')
+
+    def __init__(self, id: int, guild: FakeObject, http: FakeRoleHTTP) -> None:
+        self.id: int = id
+        self.guild: FakeObject = guild
+        self.http: FakeRoleHTTP = http
+
+    @property
+    def roles(self) -> list[FakeObject]:
+        return [self.guild] + [FakeObject(role_id) for role_id in self.http.roles.get(self.id, ())]
+
+
+def make_tree(root: str, *, files: int, per_directory: int = 10, seed: int = 0) -> int:
+    """Writes ``files`` Python files of random length under ``root`` and returns their total lines.
+
+    Every directory also gets a ``__pycache__``, a hidden directory and a
+    file that isn't Python, none of which count.
+    """
+    rng = random.Random(seed)
+    total = 0
+    for directory_number in range(0, files, per_directory):
+        directory = os.path.join(root, f'package{directory_number // per_directory}')
+        for skipped in ('__pycache__', '.hidden'):
+            os.makedirs(os.path.join(directory, skipped), exist_ok=True)
+            with open(os.path.join(directory, skipped, 'skipped.py'), 'w') as fp:
+                fp.write('x = 1\n' * 100)
+        with open(os.path.join(directory, 'README.md'), 'w') as fp:
+            fp.write('not counted\n' * 10)
+
+        for file_number in range(directory_number, min(directory_number + per_directory, files)):
+            lines = rng.randint(1, 50)
+            with open(os.path.join(directory, f'module{file_number}.py'), 'w') as fp:
+                fp.write(''.join(f'value_{i} = {i}\n' for i in range(lines)))
+            total += lines
+    return total
+
+
+class _Transaction:
+    async def __aenter__(self) -> None:
+        pass
+
+    async def __aexit__(self, *args: Any) -> None:
+        pass
+
+
+class FakeTagConnection:
+    """Stands in for an asyncpg connection to ``rucs_tags``, unique on ``(guild_id, LOWER(name))``.
+
+    Every statement yields to the event loop before it touches the table, so
+    concurrent callers interleave like separate connections would.
+    ``unique_violation`` makes single inserts raise like an ``INSERT`` without
+    ``ON CONFLICT`` would.
+    """
+
+    def __init__(self, *, unique_violation: bool = False) -> None:
+        self.unique_violation: bool = unique_violation
+        # (guild_id, lowercased name) -> (id, name, content, owner_id)
+        self.tags: dict[tuple[int, str], tuple[int, str, str, int]] = {}
+        self._import: list[tuple[str, str, int, int]] = []
+        self._next_id: int = 1
+
+    def _insert(self, name: str, content: str, owner_id: int, guild_id: int) -> Optional[int]:
+        key = (guild_id, name.lower())
+        if key in self.tags:
+            return None
+        tag_id, self._next_id = self._next_id, self._next_id + 1
+        self.tags[key] = (tag_id, name, content, owner_id)
+        return tag_id
+
+    def transaction(self) -> _Transaction:
+        return _Transaction()
+
+    async def execute(self, sql: str, *args: Any) -> str:
+        await asyncio.sleep(0)
+        if 'CREATE TEMPORARY TABLE rucs_tags_import' in sql:
+            self._import = []
+            return 'CREATE TABLE'
+        raise AssertionError(f'unexpected SQL: {sql}')
+
+    async def fetchval(self, sql: str, *args: Any) -> Any:
+        await asyncio.sleep(0)
+        if sql.startswith('INSERT INTO rucs_tags(name, content, owner_id, guild_id)'):
+            if self.unique_violation and (args[3], args[0].lower()) in self.tags:
+                raise asyncpg.UniqueViolationError('duplicate key value violates unique constraint')
+            return self._insert(*args)
+        raise AssertionError(f'unexpected SQL: {sql}')
+
+    async def fetchrow(self, sql: str, *args: Any) -> Optional[dict[str, Any]]:
+        await asyncio.sleep(0)
+        if sql.startswith('SELECT id, name, content FROM rucs_tags WHERE guild_id=$1 AND LOWER(name)=$2'):
+            try:
+                tag_id, name, content, _ = self.tags[(args[0], args[1].lower())]
+            except KeyError:
+                return None
+            return {'id': tag_id, 'name': name, 'content': content}
+        raise AssertionError(f'unexpected SQL: {sql}')
+
+    async def fetch(self, sql: str, *args: Any) -> list[dict[str, Any]]:
+        await asyncio.sleep(0)
+        if sql.startswith('SELECT id, name FROM rucs_tags WHERE guild_id=$1'):
+            return [{'id': tag[0], 'name': tag[1]} for (guild_id, _), tag in self.tags.items() if guild_id == args[0]]
+        if 'name % $2' in sql:
+            # pg_trgm's similarity, which TrigramIndex matches
+            index = TrigramIndex((tag[1], tag[0]) for (guild_id, _), tag in self.tags.items() if guild_id == args[0])
+            return [{'name': name} for name, _, _ in index.search(args[1], limit=3)]
+        if 'FROM rucs_tags_import' in sql:
+            created = []
+            for name, content, owner_id, guild_id in self._import:
+                tag_id = self._insert(name, content, owner_id, guild_id)
+                if tag_id is not None:
+                    created.append({'id': tag_id, 'guild_id': guild_id, 'name': name})
+            return created
+        raise AssertionError(f'unexpected SQL: {sql}')
+
+    async def copy_records_to_table(self, table: str, *, records: Any, columns: Any) -> str:
+        assert table == 'rucs_tags_import'
+        if hasattr(records, '__aiter__'):
+            self._import.extend([record async for record in records])
+        else:
+            self._import.extend(records)
+        return f'COPY {len(self._import)}'
+
+
+class FakeTagContext:
+    """Just enough of :class:`GuildContext` for :meth:`TagCommands.create_tag`."""
+
+    def __init__(self, db: FakeTagConnection, author_id: int, guild_id: int) -> None:
+        self.db: FakeTagConnection = db
+        self.author = FakeObject(author_id)
+        self.guild = FakeObject(guild_id)
+        self.sent: list[str] = []
+
+    async def send(self, content: str) -> None:
+        self.sent.append(content)
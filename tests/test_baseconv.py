@@ -0,0 +1,40 @@
+import pytest
+
+from utils.baseconv import BASES, BaseConversionError, decode, encode
+
+TEXTS = {
+    'ascii': 'The quick brown fox jumps over the lazy dog. 0123456789\n',
+    # three UTF-8 bytes per character
+    'thai': 'สวัสดีครับเพื่อน ๆ นักศึกษาวิทยาการคอมพิวเตอร์ มหาวิทยาลัยรามคำแหง\n',
+    'mixed': 'RU CS ยินดีต้อนรับ, tag list @member แสดงแท็กทั้งหมด 42\n',
+}
+
+
+@pytest.mark.parametrize('base', BASES)
+@pytest.mark.parametrize('name', list(TEXTS))
+def test_round_trip(name, base):
+    text = TEXTS[name] * 20
+    assert decode(encode(text, base), base) == text
+
+
+def test_thai_is_encoded_as_utf8():
+    assert encode('ก', 16) == 'e0 b8 81'
+    assert decode('0xe0 0xb8 0x81', 16) == 'ก'
+
+
+def test_contiguous_binary():
+    assert decode('0100100001101001', 2) == 'Hi'
+    with pytest.raises(BaseConversionError):
+        decode('010010000110100', 2)
+
+
+def test_unpadded_tokens():
+    # one token up to a byte long is that byte
+    assert decode('1', 2) == '\x01'
+    assert decode('0b100100', 2) == '$'
+    assert decode('a', 16) == '\n'
+    assert decode('1001000 1101001', 2) == 'Hi'
+    assert decode('110 151', 8) == 'Hi'
+    with pytest.raises(BaseConversionError):
+        # tokens are bytes, a 10 digit one isn't
+        decode('0100100001 1101001', 2)
@@ -0,0 +1,43 @@
+import asyncio
+
+import discord
+import pytest
+
+from bot import RU_COMSCI_bot
+from utils.config import GatewayConfig
+
+
+@pytest.mark.parametrize('sharded', [False, True])
+def test_close_when_setup_hook_did_not_run(sharded):
+    async def run() -> RU_COMSCI_bot:
+        config = GatewayConfig.from_profile('lean')
+        config.sharded = sharded
+        bot = RU_COMSCI_bot.from_config(config)
+        # binds the bot to the running loop, what login() does before setup_hook
+        await bot._async_setup_hook()
+        # setup_hook failed early, there is no pool monitor, pool or session
+        await bot.close()
+        return bot
+
+    assert asyncio.run(run()).is_closed()
+
+
+def test_not_sharded_by_default(monkeypatch):
+    for name in ('BOT_SHARDED', 'SHARD_COUNT', 'SHARD_IDS'):
+        monkeypatch.delenv(name, raising=False)
+
+    bot = RU_COMSCI_bot.from_config()
+    assert not isinstance(bot, discord.AutoShardedClient)
+    assert bot.shard_count is None
+    assert [shard_id for shard_id, _ in bot.latencies] == [0]
+
+
+def test_sharded_when_configured(monkeypatch):
+    monkeypatch.delenv('BOT_SHARDED', raising=False)
+    monkeypatch.setenv('SHARD_COUNT', '4')
+    monkeypatch.setenv('SHARD_IDS', '2,3')
+
+    bot = RU_COMSCI_bot.from_config()
+    assert isinstance(bot, discord.AutoShardedClient)
+    assert bot.shard_count == 4
+    assert bot.shard_ids == [2, 3]
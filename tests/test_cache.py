@@ -0,0 +1,87 @@
+from types import SimpleNamespace
+
+import pytest
+
+import utils.cache
+from utils.cache import LRUCache
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now: float = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> _Clock:
+    clock = _Clock()
+    monkeypatch.setattr(utils.cache, 'time', SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+def test_entries_expire_after_the_ttl(clock: _Clock):
+    cache = LRUCache(8, ttl=60.0)
+    cache.set('a', 1)
+    clock.now += 60.0
+    assert cache.get('a') == 1
+
+    clock.now += 0.1
+    assert cache.get('a') is None
+    assert 'a' not in cache
+    assert len(cache) == 0
+    assert cache.stats.expirations == 1
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+
+def test_setting_again_restarts_the_ttl(clock: _Clock):
+    cache = LRUCache(8, ttl=60.0)
+    cache.set('a', 1)
+    clock.now += 50.0
+    cache.set('a', 2)
+    clock.now += 50.0
+    assert cache.get('a') == 2
+
+
+def test_without_a_ttl_nothing_expires(clock: _Clock):
+    cache = LRUCache(8)
+    cache.set('a', 1)
+    clock.now += 10 ** 9
+    assert cache.get('a') == 1
+
+
+def test_the_least_recently_used_entry_is_evicted():
+    cache = LRUCache(3)
+    for key in 'abc':
+        cache.set(key, key)
+
+    # a read makes 'a' the most recently used, so 'b' goes first
+    assert cache.get('a') == 'a'
+    cache.set('d', 'd')
+    assert 'b' not in cache
+    assert ['a', 'c', 'd'] == [key for key in 'abcd' if key in cache]
+
+    # so does overwriting
+    cache.set('c', 'C')
+    cache.set('e', 'e')
+    assert [key for key in 'abcde' if key in cache] == ['c', 'd', 'e']
+    assert cache.stats.evictions == 2
+    assert len(cache) == 3
+
+
+def test_invalidate():
+    cache = LRUCache(8)
+    for guild_id in (1, 2):
+        for name in ('a', 'b'):
+            cache.set((guild_id, name), name)
+
+    assert cache.invalidate((1, 'a')) is True
+    assert cache.invalidate((1, 'a')) is False
+    assert cache.invalidate_where(lambda key: key[0] == 2) == 2
+    assert len(cache) == 1
+
+
+def test_max_size_must_be_positive():
+    with pytest.raises(ValueError):
+        LRUCache(0)
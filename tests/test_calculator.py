@@ -0,0 +1,48 @@
+import time
+
+import pytest
+
+from utils.calculator import CalculationError, evaluate
+
+# what people send to a public calculator, each slow or unbounded without the caps
+HOSTILE = (
+    '9**9**9',
+    '2**3322 - 1',
+    '(2**3000) * (3**1800)',
+    '1 << 3300',
+    'factorial(450)',
+    'factorial(100000)',
+    '-' * 200 + '1',
+    '(' * 90 + '1' + ')' * 90,
+    '10**308 * 10.0',
+    'round(1, -9999999)',
+    'round(1, -99999999)',
+    'round(2.5, 99999999)',
+    '__import__("os").system("true")',
+)
+
+
+@pytest.mark.parametrize('expression', HOSTILE)
+def test_hostile_expressions_are_bounded(expression):
+    started_at = time.perf_counter()
+    try:
+        evaluate(expression)
+    except CalculationError:
+        pass
+    assert time.perf_counter() - started_at < 0.05
+
+
+def test_huge_power_is_rejected_before_it_runs():
+    with pytest.raises(CalculationError):
+        evaluate('9**9**9')
+
+
+def test_names_are_not_reachable():
+    with pytest.raises(CalculationError):
+        evaluate('__import__("os").system("true")')
+
+
+def test_round_digits_are_capped():
+    assert evaluate('round(2.567, 2)') == '2.57'
+    with pytest.raises(CalculationError):
+        evaluate('round(1, -9999999)')
@@ -0,0 +1,83 @@
+import asyncio
+import discord
+from discord.ext import commands
+
+from cogs.events import Event
+from utils.shards import ShardMetrics
+from utils.stats import CommandStats, LatencyHistogram
+
+
+async def _invoke(fail: bool = False) -> CommandStats:
+    bot = commands.Bot(command_prefix='!', intents=discord.Intents.none())
+    # binds the bot to the running loop, what login() would do
+    await bot._async_setup_hook()
+    bot.command_stats = CommandStats()
+    bot.shard_metrics = ShardMetrics()
+    await bot.add_cog(Event(bot))
+
+    @bot.command()
+    async def ping(ctx: commands.Context) -> None:
+        await asyncio.sleep(0.01)
+        if fail:
+            raise RuntimeError('boom')
+
+    state = bot._connection
+    # as if logged in
+    state.user = discord.ClientUser(state=state, data={'id': '4', 'username': 'bot', 'discriminator': '0', 'avatar': None})
+    data = {
+        'id': '2',
+        'channel_id': '1',
+        'author': {'id': '3', 'username': 'student', 'discriminator': '0', 'avatar': None},
+        'content': '!ping',
+        'timestamp': '2022-07-08T00:00:00.000000+00:00',
+        'edited_timestamp': None,
+        'tts': False,
+        'mention_everyone': False,
+        'mentions': [],
+        'mention_roles': [],
+        'attachments': [],
+        'embeds': [],
+        'pinned': False,
+        'type': 0,
+    }
+    message = discord.Message(state=state, channel=discord.PartialMessageable(state=state, id=1), data=data)
+    await bot.process_commands(message)
+    # listeners run as tasks
+    for _ in range(5):
+        await asyncio.sleep(0)
+    return bot.command_stats
+
+
+def test_command_latency_is_recorded():
+    stats = asyncio.run(_invoke())
+    histogram = stats.latencies['ping']
+    assert histogram.count == 1
+    assert histogram.total >= 0.01
+    assert not stats.errors
+
+
+def test_failed_command_is_recorded():
+    stats = asyncio.run(_invoke(fail=True))
+    assert stats.latencies['ping'].count == 1
+    assert stats.errors['ping'] == 1
+
+
+def test_sampler_reads_loop_lag_from_the_monitor_histogram():
+    from utils.sampler import ProcessSampler
+
+    histogram = LatencyHistogram()
+    sampler = ProcessSampler(loop_lag=histogram)
+    assert sampler._lag() == 0.0
+
+    for seconds in (0.01, 0.03):
+        histogram.observe(seconds)
+    assert abs(sampler._lag() - 0.02) < 1e-9
+
+    histogram.observe(0.1)
+    assert abs(sampler._lag() - 0.1) < 1e-9
+    assert sampler._lag() == 0.0
+
+    # a reset in between starts counting from zero again
+    histogram.clear()
+    histogram.observe(0.005)
+    assert abs(sampler._lag() - 0.005) < 1e-9
@@ -0,0 +1,40 @@
+import os
+import asyncio
+
+import pytest
+
+from utils.db import PoolConfig, PoolMonitor, create_pool
+
+DSN = os.getenv('POSTGRES_DSN')
+
+pytestmark = pytest.mark.skipif(not DSN, reason='needs POSTGRES_DSN')
+
+
+def test_application_name_survives_release():
+    async def run() -> list[str]:
+        pool = await create_pool(PoolConfig(DSN, min_size=1, max_size=1, application_name='rucs test'))
+        try:
+            # the pool runs RESET ALL on every release
+            return [await pool.fetchval('SHOW application_name;') for _ in range(3)]
+        finally:
+            await pool.close()
+
+    assert asyncio.run(run()) == ['rucs test'] * 3
+
+
+def test_monitor_counts_direct_pool_use_but_not_probes():
+    async def run() -> PoolMonitor:
+        pool = await create_pool(PoolConfig(DSN, min_size=1, max_size=2))
+        try:
+            monitor = PoolMonitor(pool)
+            await pool.fetchval('SELECT 1;')
+            async with pool.acquire():
+                pass
+            await monitor.probe()
+            return monitor
+        finally:
+            await pool.close()
+
+    monitor = asyncio.run(run())
+    assert monitor.acquires == 2
+    assert len(monitor.probe_waits) == 1
@@ -0,0 +1,67 @@
+from utils.fuzzy import TrigramIndex, trigrams
+
+NAMES = ('python', 'Python Tips', 'pythonic', 'java', 'javascript', 'ภาษาไทย')
+
+
+def _index() -> TrigramIndex:
+    return TrigramIndex((name, value) for value, name in enumerate(NAMES))
+
+
+def test_trigrams_match_pg_trgm():
+    # SELECT show_trgm('Cat dog')
+    assert trigrams('Cat dog') == {'  c', ' ca', 'cat', 'at ', '  d', ' do', 'dog', 'og '}
+    assert trigrams('!!') == frozenset()
+
+
+def test_search_ranks_by_similarity():
+    results = _index().search('python')
+    assert [name for name, _, _ in results] == ['python', 'pythonic', 'Python Tips']
+    assert results[0][1:] == (0, 1.0)
+    assert all(a[2] >= b[2] for a, b in zip(results, results[1:]))
+    assert _index().search('python', limit=1) == results[:1]
+
+
+def test_search_threshold():
+    index = _index()
+    assert [name for name, _, _ in index.search('javascrip')] == ['javascript', 'java']
+    assert [name for name, _, _ in index.search('javascrip', threshold=0.5)] == ['javascript']
+    assert index.search('zzz') == []
+
+
+def test_add_is_case_insensitive_and_replaces():
+    index = _index()
+    assert 'PYTHON' in index
+    index.add('PYTHON', 99)
+    assert len(index) == len(NAMES)
+    assert index.search('python', limit=1)[0][:2] == ('PYTHON', 99)
+
+
+def test_remove_drops_the_name_and_its_trigrams():
+    index = _index()
+    assert index.remove('Java') is True
+    assert index.remove('java') is False
+    assert 'java' not in index
+    assert [name for name, _, _ in index.search('java', threshold=0.1)] == ['javascript']
+
+    for name in NAMES:
+        index.remove(name)
+    assert len(index) == 0
+    assert index._postings == {}
+
+
+def test_rename():
+    index = _index()
+    # what the tag cog does on rename
+    index.remove('javascript')
+    index.add('typescript', 4)
+    assert 'javascript' not in index
+    assert index.search('typescript', limit=1)[0] == ('typescript', 4, 1.0)
+    assert 'javascript' not in [name for name, _, _ in index.search('javascript', threshold=0.0)]
+
+
+def test_complete_puts_prefix_matches_first():
+    index = _index()
+    assert index.complete('py', limit=3) == ['python', 'Python Tips', 'pythonic']
+    assert index.complete('java') == ['java', 'javascript']
+    assert index.complete('') == sorted(NAMES, key=str.lower)
+    assert index.complete('ภาษา') == ['ภาษาไทย']
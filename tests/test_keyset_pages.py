@@ -0,0 +1,100 @@
+import asyncio
+import bisect
+from typing import Optional
+
+from utils.paginator import KeysetPageSource
+
+ENTRIES = list(range(0, 1000, 2))  # 500 entries, 42 pages of 12
+
+
+class _Source(KeysetPageSource):
+    def __init__(self, *, reverse: bool = True, seek: bool = True) -> None:
+        self.calls: list[tuple[str, int]] = []
+        super().__init__(
+            self._fetch,
+            key=lambda entry: entry,
+            count=self._count,
+            fetch_before=self._fetch_before if reverse else None,
+            seek=self._seek if seek else None,
+        )
+
+    async def _fetch(self, after: Optional[int], limit: int) -> list[int]:
+        start = 0 if after is None else bisect.bisect_right(ENTRIES, after)
+        rows = ENTRIES[start:start + limit]
+        self.calls.append(('fetch', len(rows)))
+        return rows
+
+    async def _fetch_before(self, before: Optional[int], limit: int) -> list[int]:
+        end = len(ENTRIES) if before is None else bisect.bisect_left(ENTRIES, before)
+        rows = ENTRIES[max(0, end - limit):end][::-1]
+        self.calls.append(('before', len(rows)))
+        return rows
+
+    async def _seek(self, offset: int, limit: int) -> list[int]:
+        rows = ENTRIES[offset:offset + limit]
+        self.calls.append(('seek', len(rows)))
+        return rows
+
+    async def _count(self) -> int:
+        return len(ENTRIES)
+
+
+def _page(number: int) -> list[int]:
+    return ENTRIES[number * 12:(number + 1) * 12]
+
+
+def test_last_page_fetches_only_the_last_page():
+    async def run() -> _Source:
+        source = _Source()
+        await source.prepare()
+        max_pages = await source.fetch_max_pages()
+        assert max_pages == 42
+        assert await source.get_page(41) == _page(41)
+        assert await source.get_page(40) == _page(40)
+        return source
+
+    source = asyncio.run(run())
+    assert source.calls == [('fetch', 13), ('before', 8), ('before', 12)]
+    assert sorted(source.pages) == [0, 40, 41]
+
+
+def test_numbered_jump_seeks():
+    async def run() -> _Source:
+        source = _Source()
+        await source.prepare()
+        assert await source.get_page(30) == _page(30)
+        assert await source.get_page(31) == _page(31)
+        return source
+
+    source = asyncio.run(run())
+    assert source.calls == [('fetch', 13), ('seek', 13), ('fetch', 13)]
+    assert source.total is None
+
+
+def test_seeking_past_the_end():
+    async def run() -> _Source:
+        source = _Source()
+        try:
+            await source.get_page(100)
+        except IndexError:
+            pass
+        else:
+            raise AssertionError('expected IndexError')
+        assert await source.get_page(41) == _page(41)
+        return source
+
+    source = asyncio.run(run())
+    assert source.total == 500
+    assert source.get_max_pages() == 42
+
+
+def test_without_seek_fetches_up_to_the_page():
+    async def run() -> _Source:
+        source = _Source(reverse=False, seek=False)
+        await source.prepare()
+        assert await source.get_page(5) == _page(5)
+        return source
+
+    source = asyncio.run(run())
+    assert source.calls == [('fetch', 13), ('fetch', 61)]
+    assert sorted(source.pages) == [0, 1, 2, 3, 4, 5]
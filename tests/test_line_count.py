@@ -0,0 +1,35 @@
+import os
+
+from fixtures import make_tree
+from utils.useful import LineCountIndex, count_lines
+
+
+def test_counts_like_readlines(tmp_path):
+    path = tmp_path / 'module.py'
+    for content in ('', 'a', 'a\n', 'a\nb', 'a\n\nb\n'):
+        path.write_text(content)
+        with open(path) as fp:
+            assert count_lines(str(path)) == len(fp.readlines())
+
+
+def test_skips_hidden_and_cache_directories(tmp_path):
+    expected = make_tree(str(tmp_path), files=120, per_directory=10)
+    index = LineCountIndex(str(tmp_path))
+    assert index.refresh() == expected
+    assert len(index) == 120
+
+
+def test_refresh_picks_up_changes(tmp_path):
+    expected = make_tree(str(tmp_path), files=20, per_directory=10)
+    index = LineCountIndex(str(tmp_path))
+    index.refresh()
+
+    paths = sorted(index._files)
+    with open(paths[0], 'a') as fp:
+        fp.write('one = 1\ntwo = 2\n')
+    with open(paths[1]) as fp:
+        removed = len(fp.readlines())
+    os.remove(paths[1])
+
+    assert index.refresh() == expected + 2 - removed
+    assert len(index) == 19
@@ -0,0 +1,26 @@
+import asyncio
+
+from utils.queries import QueryRegistry
+
+
+class _Connection:
+    """A plain connection, without the prepared statements of a PreparedConnection."""
+
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, tuple]] = []
+
+    async def prepare(self, sql: str):
+        raise AssertionError('prepare() skips the statement cache')
+
+    async def fetchval(self, sql: str, *args):
+        self.calls.append((sql, args))
+        return 1
+
+
+def test_plain_connections_use_the_statement_cache():
+    registry = QueryRegistry()
+    query = registry.add('one', 'SELECT $1::int;')
+    con = _Connection()
+
+    assert asyncio.run(registry.fetchval(con, query, 1)) == 1
+    assert con.calls == [('SELECT $1::int;', (1,))]
@@ -0,0 +1,95 @@
+import time
+import asyncio
+
+from fixtures import FakeMember, FakeObject, FakeRoleHTTP
+from utils.roles import RoleAssignmentQueue
+
+GUILD_ID = 900000000000000000
+ROLE_IDS = (994917404859711528, 994917240711413831, 994917733030436954)
+MOD_ROLE_ID = 994917000000000000
+
+
+async def _toggle(clicks: list[int], moderator: bool = False) -> tuple[FakeRoleHTTP, RoleAssignmentQueue]:
+    http = FakeRoleHTTP()
+    queue = RoleAssignmentQueue(http, debounce=0.01, max_delay=0.05, rate=50, per=1.0)
+    member = FakeMember(1, FakeObject(GUILD_ID), http)
+    queue.start()
+    try:
+        for role_id in clicks:
+            queue.toggle(member, role_id)
+        if moderator:
+            # another client changes a role before the queue sends anything
+            http.roles.setdefault(member.id, set()).add(MOD_ROLE_ID)
+        await queue.join()
+    finally:
+        await queue.stop()
+    return http, queue
+
+
+def test_roles_changed_elsewhere_are_kept():
+    http, queue = asyncio.run(_toggle([ROLE_IDS[0], ROLE_IDS[1]], moderator=True))
+    assert http.roles[1] == {ROLE_IDS[0], ROLE_IDS[1], MOD_ROLE_ID}
+    assert http.requests == 1
+    assert queue.edits == 1
+
+
+def test_many_roles_are_one_edit():
+    http, queue = asyncio.run(_toggle([*ROLE_IDS, ROLE_IDS[0], ROLE_IDS[0]]))
+    assert http.roles[1] == set(ROLE_IDS)
+    assert http.requests == 1
+
+
+def test_toggling_back_sends_nothing():
+    http, queue = asyncio.run(_toggle([ROLE_IDS[0], ROLE_IDS[0]]))
+    assert http.requests == 0
+    assert queue.skipped == 1
+
+
+def test_removing_a_cached_role():
+    async def run() -> FakeRoleHTTP:
+        http = FakeRoleHTTP()
+        http.roles[1] = {ROLE_IDS[0], MOD_ROLE_ID}
+        queue = RoleAssignmentQueue(http, debounce=0.01, max_delay=0.05, rate=50, per=1.0)
+        queue.start()
+        try:
+            assert queue.toggle(FakeMember(1, FakeObject(GUILD_ID), http), ROLE_IDS[0]) is False
+            await queue.join()
+        finally:
+            await queue.stop()
+        return http
+
+    assert asyncio.run(run()).roles[1] == {MOD_ROLE_ID}
+
+
+def test_a_busy_guild_does_not_hold_up_others():
+    async def run() -> float:
+        http = FakeRoleHTTP()
+        queue = RoleAssignmentQueue(http, debounce=0.0, max_delay=0.0, rate=1, per=10.0)
+        busy, quiet = FakeObject(GUILD_ID), FakeObject(GUILD_ID + 1)
+        queue.start()
+        try:
+            # the busy guild's bucket only has room for the first of these
+            for member_id in range(1, 4):
+                queue.toggle(FakeMember(member_id, busy, http), ROLE_IDS[0])
+            await asyncio.sleep(0.05)
+            started_at = time.monotonic()
+            queue.toggle(FakeMember(10, quiet, http), ROLE_IDS[0])
+            while 10 not in http.roles:
+                await asyncio.sleep(0.01)
+            return time.monotonic() - started_at
+        finally:
+            await queue.stop(timeout=0)
+
+    assert asyncio.run(run()) < 1.0
+
+
+def test_stop_flushes_pending_edits():
+    async def run() -> FakeRoleHTTP:
+        http = FakeRoleHTTP()
+        queue = RoleAssignmentQueue(http, debounce=60.0, max_delay=60.0, rate=50, per=1.0)
+        queue.start()
+        queue.toggle(FakeMember(1, FakeObject(GUILD_ID), http), ROLE_IDS[0])
+        await queue.stop()
+        return http
+
+    assert asyncio.run(run()).roles[1] == {ROLE_IDS[0]}
@@ -0,0 +1,140 @@
+import asyncio
+from types import SimpleNamespace
+
+from cogs.tags import TagCommands
+from fixtures import FakeTagConnection, FakeTagContext
+
+GUILD_ID = 336642139381301249
+
+
+def _cog(con: FakeTagConnection) -> TagCommands:
+    return TagCommands(SimpleNamespace(pool=con))  # type: ignore
+
+
+def test_concurrent_create_has_one_winner():
+    async def run() -> tuple[FakeTagConnection, list[FakeTagContext]]:
+        con = FakeTagConnection()
+        cog = _cog(con)
+        contexts = [FakeTagContext(con, author_id, GUILD_ID) for author_id in range(1, 51)]
+        # differently cased, the unique index is on LOWER(name)
+        await asyncio.gather(*(cog.create_tag(ctx, 'Race' if ctx.author.id % 2 else 'race', 'x') for ctx in contexts))
+        return con, contexts
+
+    con, contexts = asyncio.run(run())
+    winners = [ctx for ctx in contexts if ctx.sent[0].startswith('สร้างแท็ก')]
+    assert len(winners) == 1
+    assert sum(ctx.sent[0].endswith('มีอยู่แล้ว.') for ctx in contexts) == 49
+    assert len(con.tags) == 1
+    assert con.tags[(GUILD_ID, 'race')][3] == winners[0].author.id
+
+
+def test_create_reports_a_database_error():
+    async def run() -> FakeTagContext:
+        con = FakeTagConnection(unique_violation=True)
+        cog = _cog(con)
+        await cog.create_tag(FakeTagContext(con, 1, GUILD_ID), 'tag', 'x')
+        ctx = FakeTagContext(con, 2, GUILD_ID)
+        await cog.create_tag(ctx, 'TAG', 'y')
+        return ctx
+
+    assert asyncio.run(run()).sent == ['ไม่สามารถสร้างแท็ก.']
+
+
+def test_bulk_create_skips_existing_names():
+    async def run() -> tuple[list, list]:
+        con = FakeTagConnection()
+        cog = _cog(con)
+        records = [(f'tag {i}', 'content', 0, GUILD_ID) for i in range(100)]
+
+        async def aiter_records():
+            for record in records:
+                yield record
+
+        first = await cog.bulk_create_tags(con, records[:60])
+        second = await cog.bulk_create_tags(con, aiter_records())
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert len(first) == 60
+    assert [row['name'] for row in second] == [f'tag {i}' for i in range(60, 100)]
+
+
+def test_import_parses_off_the_event_loop():
+    import io
+    import gzip
+    import threading
+
+    from cogs.tags import TagImportReader
+
+    lines = [b'{"name": "tag %d", "content": "content"}\n' % i for i in range(2500)] + [b'not json\n']
+    fp = io.BytesIO(gzip.compress(b''.join(lines)))
+    reader = TagImportReader(fp, filename='tags.jsonl.gz', guild_id=GUILD_ID, owner_id=1)
+    loop_thread = threading.get_ident()
+    parsed_on: set[int] = set()
+
+    original = reader._convert
+
+    def convert(row):
+        parsed_on.add(threading.get_ident())
+        return original(row)
+
+    reader._convert = convert  # type: ignore
+
+    async def run() -> list:
+        return [record async for record in reader.records(batch_size=1000)]
+
+    records = asyncio.run(run())
+    assert len(records) == 2500
+    assert reader.skipped == 1
+    assert loop_thread not in parsed_on
+
+
+def test_get_tag_trusts_postgres_over_a_stale_index():
+    async def run() -> tuple[TagCommands, dict]:
+        con = FakeTagConnection()
+        cog = _cog(con)
+        await cog.get_tag_index(GUILD_ID)
+        # created by another process after the index was built
+        con._insert('Python', 'content', 1, GUILD_ID)
+        return cog, await cog.get_tag(GUILD_ID, 'python')
+
+    cog, row = asyncio.run(run())
+    assert row['name'] == 'Python'
+    assert 'python' in cog.loaded_tag_index(GUILD_ID)
+
+
+def test_get_tag_suggests_from_the_index_and_drops_deleted_names():
+    async def run() -> tuple[TagCommands, str]:
+        con = FakeTagConnection()
+        cog = _cog(con)
+        con._insert('python', 'content', 1, GUILD_ID)
+        con._insert('python tips', 'content', 1, GUILD_ID)
+        await cog.get_tag_index(GUILD_ID)
+        # deleted by another process
+        del con.tags[(GUILD_ID, 'python')]
+        try:
+            await cog.get_tag(GUILD_ID, 'python')
+        except RuntimeError as e:
+            return cog, str(e)
+        raise AssertionError('the deleted tag was found')
+
+    cog, error = asyncio.run(run())
+    assert error.endswith('`python tips`')
+    assert 'python' not in cog.loaded_tag_index(GUILD_ID)
+
+
+def test_get_tag_without_an_index_asks_postgres_for_suggestions():
+    async def run() -> tuple[TagCommands, str]:
+        con = FakeTagConnection()
+        cog = _cog(con)
+        con._insert('python tips', 'content', 1, GUILD_ID)
+        try:
+            await cog.get_tag(GUILD_ID, 'python')
+        except RuntimeError as e:
+            return cog, str(e)
+        raise AssertionError('a missing tag was found')
+
+    cog, error = asyncio.run(run())
+    assert error.endswith('`python tips`')
+    # a lookup doesn't build the index
+    assert cog.loaded_tag_index(GUILD_ID) is None
@@ -0,0 +1,24 @@
+import os
+import asyncio
+
+import pytest
+
+from benchmarks.db import bulk_create, create_race
+
+DSN = os.getenv('POSTGRES_DSN')
+
+pytestmark = pytest.mark.skipif(not DSN, reason='needs POSTGRES_DSN with the migrations applied')
+
+
+def test_concurrent_create_has_one_winner():
+    result = asyncio.run(create_race(DSN, contenders=50, rounds=5))
+    assert result['errors'] == 0
+    assert result['created'] == result['rows'] == result['owners_match'] == 5
+    assert result['duplicates'] == 49 * 5
+
+
+def test_bulk_create_skips_existing_names():
+    results = {result['mode']: result for result in asyncio.run(bulk_create(DSN, tags=500))}
+    assert results['insert']['created'] == 500
+    assert results['copy']['created'] == 500
+    assert results['copy again']['created'] == 0
@@ -0,0 +1,47 @@
+import io
+import asyncio
+
+from utils.paginator import StreamingTextPageSource
+
+TEXT = ''.join(f'line {i} ' + 'x' * (i % 50) + '\n' for i in range(5000))
+
+
+async def _pages(source: StreamingTextPageSource) -> list[str]:
+    pages = []
+    try:
+        await source.prepare()
+        while True:
+            try:
+                pages.append(await source.get_page(len(pages)))
+            except IndexError:
+                return pages
+    finally:
+        source.close()
+
+
+def test_small_output_stays_in_memory():
+    source = StreamingTextPageSource(io.BytesIO(TEXT.encode()))
+    pages = asyncio.run(_pages(source))
+    assert ''.join(pages) == TEXT
+    assert source._spool is None
+    assert source.get_max_pages() == len(pages)
+
+
+def test_large_output_spools_to_disk():
+    async def run() -> tuple[str, str, list[str]]:
+        source = StreamingTextPageSource(io.BytesIO(TEXT.encode()), spool_size=16 * 1024)
+        try:
+            pages = []
+            while not source._indexed:
+                pages.append(await source.get_page(len(pages)))
+                # going back in between must not move where the next page is written
+                await source.get_page(0)
+            assert source._spool is not None and source._memory is None
+            first, last = await source.get_page(0), await source.get_page(len(pages) - 1)
+            return first, last, pages
+        finally:
+            source.close()
+
+    first, last, pages = asyncio.run(run())
+    assert ''.join(pages) == TEXT
+    assert first == pages[0] and last == pages[-1]
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import re
+
+__all__ = (
+    'BASES',
+    'BaseConversionError',
+    'encode',
+    'decode',
+)
+
+BASES = (2, 8, 10, 16)
+
+# byte -> fixed width digits, e.g. 0x41 -> '01000001' for base 2
+_ENCODE_TABLES: dict[int, tuple[str, ...]] = {
+    2: tuple(f'{i:08b}' for i in range(256)),
+    8: tuple(f'{i:03o}' for i in range(256)),
+    10: tuple(str(i) for i in range(256)),
+    16: tuple(f'{i:02x}' for i in range(256)),
+}
+
+
+def _decode_table(base: int) -> dict[str, int]:
+    table = {}
+    for i in range(256):
+        # accept both padded and unpadded digits
+        for token in (_ENCODE_TABLES[base][i], format(i, {2: 'b', 8: 'o', 10: 'd', 16: 'x'}[base])):
+            table[token] = i
+            table[token.upper()] = i
+    return table
+
+
+_DECODE_TABLES: dict[int, dict[str, int]] = {base: _decode_table(base) for base in BASES}
+# 0b / 0o / 0x at the start of a token
+_PREFIXES: dict[int, re.Pattern[str]] = {
+    2: re.compile(r'(?<![0-9a-z])0b', re.IGNORECASE),
+    8: re.compile(r'(?<![0-9a-z])0o', re.IGNORECASE),
+    16: re.compile(r'(?<![0-9a-z])0x', re.IGNORECASE),
+}
+_SEPARATORS = re.compile(r'[\s,]+')
+
+
+class BaseConversionError(ValueError):
+    pass
+
+
+def encode(text: str, base: int, *, per_line: int = 16) -> str:
+    """Encodes the UTF-8 bytes of ``text`` as space separated digits in ``base``.
+
+    Every line holds ``per_line`` bytes. The work is done per line with
+    C level table lookups rather than per character.
+    """
+    data = text.encode('utf-8')
+    view = memoryview(data)
+    lines = []
+    if base == 16:
+        for i in range(0, len(data), per_line):
+            lines.append(view[i:i + per_line].hex(' '))
+    else:
+        table = _ENCODE_TABLES[base].__getitem__
+        for i in range(0, len(data), per_line):
+            lines.append(' '.join(map(table, view[i:i + per_line])))
+    return '\n'.join(lines)
+
+
+def _to_bytes(text: str, base: int) -> bytes:
+    prefix = _PREFIXES.get(base)
+    if prefix is not None:
+        text = prefix.sub('', text)
+    text = text.strip()
+    tokens = _SEPARATORS.split(text)
+
+    # a single run of digits longer than one byte, e.g. '0100100001101001' or '4869',
+    # anything shorter is one byte that may be unpadded, e.g. '1' or 'a'
+    if len(tokens) == 1 and base in (2, 16) and len(tokens[0]) > len(_ENCODE_TABLES[base][0]):
+        digits = tokens[0]
+        if base == 16:
+            return bytes.fromhex(digits)
+
+        if len(digits) % 8:
+            raise BaseConversionError('เลขฐาน 2 ต้องมีความยาวเป็นทวีคูณของ 8')
+        return int(digits, 2).to_bytes(len(digits) // 8, 'big')
+
+    return bytes(map(_DECODE_TABLES[base].__getitem__, tokens))
+
+
+def decode(text: str, base: int) -> str:
+    """Decodes space separated digits in ``base`` back to UTF-8 text.
+
+    Invalid UTF-8 sequences are replaced rather than rejected.
+    """
+    try:
+        data = _to_bytes(text, base)
+    except (KeyError, ValueError) as e:
+        if isinstance(e, BaseConversionError):
+            raise
+        raise BaseConversionError(f'ข้อมูลไม่ใช่เลขฐาน {base} ที่ถูกต้อง') from None
+    return data.decode('utf-8', errors='replace')
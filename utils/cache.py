@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any, Generic, Hashable, Optional, TypeVar
+
+__all__ = (
+    'CacheStats',
+    'LRUCache',
+)
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+
+class CacheStats:
+    __slots__ = ('hits', 'misses', 'evictions', 'expirations')
+
+    def __init__(self) -> None:
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.expirations: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def reset(self) -> None:
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+
+class LRUCache(Generic[K, V]):
+    """A bounded least recently used cache with an optional time to live.
+
+    Entries older than ``ttl`` seconds are treated as missing and dropped
+    on access. When the cache is full the least recently used entry is evicted.
+    """
+
+    def __init__(self, max_size: int = 256, *, ttl: Optional[float] = None) -> None:
+        if max_size <= 0:
+            raise ValueError('max_size must be greater than 0')
+
+        self.max_size: int = max_size
+        self.ttl: Optional[float] = ttl
+        self.stats: CacheStats = CacheStats()
+        self._data: OrderedDict[K, tuple[V, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Any) -> bool:
+        return self._get(key) is not None
+
+    def _get(self, key: K) -> Optional[tuple[V, float]]:
+        try:
+            entry = self._data[key]
+        except KeyError:
+            return None
+
+        if self.ttl is not None and time.monotonic() - entry[1] > self.ttl:
+            del self._data[key]
+            self.stats.expirations += 1
+            return None
+        return entry
+
+    def get(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        entry = self._get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return default
+
+        self.stats.hits += 1
+        self._data.move_to_end(key)
+        return entry[0]
+
+    def set(self, key: K, value: V) -> None:
+        self._data[key] = (value, time.monotonic())
+        self._data.move_to_end(key)
+        if len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.stats.evictions += 1
+
+    def invalidate(self, key: K) -> bool:
+        return self._data.pop(key, None) is not None
+
+    def invalidate_where(self, predicate) -> int:
+        keys = [key for key in self._data if predicate(key)]
+        for key in keys:
+            del self._data[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        self._data.clear()
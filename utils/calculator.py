@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import ast
+import math
+import asyncio
+import operator
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, Union
+
+__all__ = (
+    'CalculationError',
+    'CalculationTimeout',
+    'Calculator',
+    'evaluate',
+)
+
+Number = Union[int, float, complex]
+
+MAX_EXPRESSION_LENGTH = 256
+# roughly 1000 decimal digits
+MAX_INT_BITS = 3322
+MAX_FACTORIAL = 450
+# round(x, -n) builds 10 ** n, whatever the size of x
+MAX_ROUND_DIGITS = 1000
+
+
+class CalculationError(Exception):
+    pass
+
+
+class CalculationTimeout(CalculationError):
+    pass
+
+
+def _check_bits(bits: int) -> None:
+    if bits > MAX_INT_BITS:
+        raise CalculationError('ผลลัพธ์มีขนาดใหญ่เกินไป')
+
+
+def _check(value: Any) -> Number:
+    if isinstance(value, bool) or not isinstance(value, (int, float, complex)):
+        raise CalculationError('รองรับเฉพาะตัวเลขเท่านั้น')
+    if isinstance(value, int):
+        _check_bits(value.bit_length())
+    return value
+
+
+def _pow(base: Number, exponent: Number) -> Number:
+    if isinstance(base, int) and isinstance(exponent, int) and exponent > 0 and abs(base) > 1:
+        # |base ** exponent| needs about exponent * bits(base) bits
+        _check_bits(exponent * (abs(base).bit_length() - 1))
+    return operator.pow(base, exponent)
+
+
+def _mul(left: Number, right: Number) -> Number:
+    if isinstance(left, int) and isinstance(right, int):
+        _check_bits(left.bit_length() + right.bit_length() - 1)
+    return operator.mul(left, right)
+
+
+def _lshift(left: int, right: int) -> int:
+    if not isinstance(left, int) or not isinstance(right, int):
+        raise CalculationError('รองรับเฉพาะจำนวนเต็มเท่านั้น')
+    _check_bits(left.bit_length() + right)
+    return operator.lshift(left, right)
+
+
+def _factorial(value: Number) -> int:
+    if not isinstance(value, int) or value > MAX_FACTORIAL:
+        raise CalculationError(f'factorial รองรับจำนวนเต็มไม่เกิน {MAX_FACTORIAL}')
+    return math.factorial(value)
+
+
+def _round(value: Number, ndigits: Optional[Number] = None) -> Number:
+    if ndigits is None:
+        return round(value)
+    if not isinstance(ndigits, int) or abs(ndigits) > MAX_ROUND_DIGITS:
+        raise CalculationError(f'round รองรับจำนวนหลักไม่เกิน {MAX_ROUND_DIGITS}')
+    return round(value, ndigits)
+
+
+_BINARY_OPERATORS: dict[type[ast.operator], Callable[[Any, Any], Any]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: _mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: _pow,
+    ast.LShift: _lshift,
+    ast.RShift: operator.rshift,
+    ast.BitAnd: operator.and_,
+    ast.BitOr: operator.or_,
+    ast.BitXor: operator.xor,
+}
+
+_UNARY_OPERATORS: dict[type[ast.unaryop], Callable[[Any], Any]] = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+    ast.Invert: operator.invert,
+}
+
+_FUNCTIONS: dict[str, Callable[..., Any]] = {
+    'abs': abs,
+    'round': _round,
+    'sqrt': math.sqrt,
+    'exp': math.exp,
+    'log': math.log,
+    'log2': math.log2,
+    'log10': math.log10,
+    'sin': math.sin,
+    'cos': math.cos,
+    'tan': math.tan,
+    'asin': math.asin,
+    'acos': math.acos,
+    'atan': math.atan,
+    'degrees': math.degrees,
+    'radians': math.radians,
+    'floor': math.floor,
+    'ceil': math.ceil,
+    'gcd': math.gcd,
+    'factorial': _factorial,
+}
+
+_CONSTANTS: dict[str, float] = {
+    'pi': math.pi,
+    'e': math.e,
+    'tau': math.tau,
+}
+
+
+def _evaluate(node: ast.AST) -> Number:
+    if isinstance(node, ast.Expression):
+        return _evaluate(node.body)
+
+    if isinstance(node, ast.Constant):
+        return _check(node.value)
+
+    if isinstance(node, ast.Name):
+        try:
+            return _CONSTANTS[node.id]
+        except KeyError:
+            raise CalculationError(f'ไม่รู้จัก `{node.id}`') from None
+
+    if isinstance(node, ast.BinOp):
+        try:
+            op = _BINARY_OPERATORS[type(node.op)]
+        except KeyError:
+            raise CalculationError('ไม่รองรับตัวดำเนินการนี้') from None
+        return _check(op(_evaluate(node.left), _evaluate(node.right)))
+
+    if isinstance(node, ast.UnaryOp):
+        try:
+            op = _UNARY_OPERATORS[type(node.op)]
+        except KeyError:
+            raise CalculationError('ไม่รองรับตัวดำเนินการนี้') from None
+        return _check(op(_evaluate(node.operand)))
+
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+        try:
+            func = _FUNCTIONS[node.func.id]
+        except KeyError:
+            raise CalculationError(f'ไม่รู้จักฟังก์ชัน `{node.func.id}`') from None
+        return _check(func(*(_evaluate(arg) for arg in node.args)))
+
+    raise CalculationError('รองรับเฉพาะนิพจน์ทางคณิตศาสตร์เท่านั้น')
+
+
+def evaluate(expression: str) -> str:
+    """Evaluates an arithmetic expression and returns the formatted result.
+
+    Only numbers, arithmetic operators and a whitelist of :mod:`math` functions
+    and constants are allowed. Integer results are capped at about 1000 digits.
+    """
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise CalculationError(f'นิพจน์ยาวเกิน {MAX_EXPRESSION_LENGTH} อักขระ')
+
+    try:
+        tree = ast.parse(expression.strip(), mode='eval')
+    except SyntaxError:
+        raise CalculationError('รูปแบบนิพจน์ไม่ถูกต้อง') from None
+
+    try:
+        return str(_evaluate(tree))
+    except CalculationError:
+        raise
+    except (ArithmeticError, ValueError, TypeError) as e:
+        raise CalculationError(str(e)) from None
+
+
+class Calculator:
+    """Runs :func:`evaluate` in a process pool so it can never block the event loop.
+
+    If an evaluation takes longer than ``timeout`` seconds the worker processes
+    are killed and a fresh pool is started on the next call.
+    """
+
+    def __init__(self, *, timeout: float = 3.0, max_workers: int = 2) -> None:
+        self.timeout: float = timeout
+        self.max_workers: int = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn, since forking a process with a running event loop isn't safe
+            context = multiprocessing.get_context('spawn')
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+        return self._executor
+
+    def warm_up(self) -> None:
+        """Starts the worker processes in the background so the first call doesn't pay for it."""
+        executor = self._get_executor()
+        for _ in range(self.max_workers):
+            executor.submit(evaluate, '0')
+
+    def _kill(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is None:
+            return
+
+        # ProcessPoolExecutor can't cancel a running task, so kill the workers instead
+        for process in list(getattr(executor, '_processes', {}).values()):
+            process.kill()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def evaluate(self, expression: str) -> str:
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._get_executor(), evaluate, expression)
+        try:
+            return await asyncio.wait_for(future, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self._kill()
+            raise CalculationTimeout('การคำนวณใช้เวลานานเกินไป') from None
+        except BrokenProcessPool:
+            self._kill()
+            raise CalculationError('ไม่สามารถคำนวณได้ กรุณาลองใหม่อีกครั้ง') from None
+
+    def close(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import os
+from typing import Any, Optional
+
+import discord
+
+__all__ = (
+    'PROFILES',
+    'GatewayConfig',
+)
+
+PROFILES = ('lean', 'members', 'full')
+
+
+def _lean_intents() -> discord.Intents:
+    # guilds for roles and channels, messages and message_content for prefix commands
+    intents = discord.Intents.none()
+    intents.guilds = True
+    intents.guild_messages = True
+    intents.dm_messages = True
+    intents.message_content = True
+    return intents
+
+
+class GatewayConfig:
+    """Which gateway events the bot subscribes to and how much of them it caches.
+
+    ``lean``
+        Guilds and messages only. No member list, no presences, no message
+        cache and no chunking. Buttons and slash commands still get the full
+        member from the interaction payload, so the role view works.
+    ``members``
+        ``lean`` plus the members intent, caching members as they join or
+        show up in events. Guilds are still not chunked at startup.
+    ``full``
+        ``Intents.all()`` with every member chunked and cached. This is what
+        the bot always did and is the default, ``lean`` or ``members`` have to
+        be asked for.
+
+    ``BOT_CACHE_PROFILE`` picks the profile, ``BOT_MAX_MESSAGES`` and
+    ``BOT_CHUNK_GUILDS`` override parts of it.
+
+    The bot runs on a single gateway connection unless it's ``sharded``.
+    ``BOT_SHARDED`` turns sharding on with Discord's recommended shard count,
+    ``SHARD_COUNT`` and ``SHARD_IDS`` (comma separated) turn it on with that
+    count, and let one process run a subset of the shards.
+    """
+
+    def __init__(
+            self,
+            profile: str,
+            *,
+            intents: discord.Intents,
+            member_cache_flags: discord.MemberCacheFlags,
+            max_messages: Optional[int],
+            chunk_guilds_at_startup: bool,
+            sharded: bool = False,
+            shard_count: Optional[int] = None,
+            shard_ids: Optional[list[int]] = None,
+    ) -> None:
+        self.profile: str = profile
+        self.intents: discord.Intents = intents
+        self.member_cache_flags: discord.MemberCacheFlags = member_cache_flags
+        self.max_messages: Optional[int] = max_messages
+        self.chunk_guilds_at_startup: bool = chunk_guilds_at_startup
+        self.sharded: bool = sharded or shard_count is not None
+        self.shard_count: Optional[int] = shard_count
+        self.shard_ids: Optional[list[int]] = shard_ids
+
+    @classmethod
+    def from_profile(cls, profile: str) -> GatewayConfig:
+        if profile == 'lean':
+            return cls(
+                profile,
+                intents=_lean_intents(),
+                member_cache_flags=discord.MemberCacheFlags.none(),
+                max_messages=None,
+                chunk_guilds_at_startup=False,
+            )
+
+        if profile == 'members':
+            intents = _lean_intents()
+            intents.members = True
+            return cls(
+                profile,
+                intents=intents,
+                member_cache_flags=discord.MemberCacheFlags.from_intents(intents),
+                max_messages=None,
+                chunk_guilds_at_startup=False,
+            )
+
+        if profile == 'full':
+            intents = discord.Intents.all()
+            return cls(
+                profile,
+                intents=intents,
+                member_cache_flags=discord.MemberCacheFlags.all(),
+                max_messages=1000,
+                chunk_guilds_at_startup=True,
+            )
+
+        raise ValueError(f'unknown cache profile {profile!r}, expected one of {", ".join(PROFILES)}')
+
+    @classmethod
+    def from_env(cls) -> GatewayConfig:
+        config = cls.from_profile(os.getenv('BOT_CACHE_PROFILE', 'full').lower())
+
+        max_messages = os.getenv('BOT_MAX_MESSAGES')
+        if max_messages:
+            # 0 turns the message cache off
+            config.max_messages = int(max_messages) or None
+
+        chunk = os.getenv('BOT_CHUNK_GUILDS')
+        if chunk:
+            config.chunk_guilds_at_startup = chunk.lower() in ('1', 'true', 'yes') and config.intents.members
+
+        sharded = os.getenv('BOT_SHARDED')
+        if sharded:
+            config.sharded = sharded.lower() in ('1', 'true', 'yes')
+
+        shard_count = os.getenv('SHARD_COUNT')
+        shard_ids = os.getenv('SHARD_IDS')
+        if shard_count:
+            config.sharded = True
+            config.shard_count = int(shard_count)
+        if shard_ids:
+            if config.shard_count is None:
+                raise ValueError('SHARD_IDS needs SHARD_COUNT to be set')
+            config.shard_ids = [int(shard_id) for shard_id in shard_ids.split(',') if shard_id.strip()]
+            invalid = [shard_id for shard_id in config.shard_ids if not 0 <= shard_id < config.shard_count]
+            if invalid:
+                raise ValueError(f'SHARD_IDS {invalid} are outside of SHARD_COUNT {config.shard_count}')
+        return config
+
+    def client_options(self) -> dict[str, Any]:
+        """Keyword arguments for :class:`discord.Client`, or :class:`discord.AutoShardedClient` if ``sharded``."""
+        options = {
+            'intents': self.intents,
+            'member_cache_flags': self.member_cache_flags,
+            'max_messages': self.max_messages,
+            'chunk_guilds_at_startup': self.chunk_guilds_at_startup,
+        }
+        if not self.sharded:
+            return options
+        if self.shard_count is not None:
+            options['shard_count'] = self.shard_count
+        if self.shard_ids is not None:
+            options['shard_ids'] = self.shard_ids
+        return options
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any, Callable, Iterable, TypeVar, Union, Optional, Generator
+from typing import IO, TYPE_CHECKING, Any, Callable, Iterable, TypeVar, Union, Optional, Generator
 from discord.ext import commands
 import asyncio
 import discord
+import shutil
+import gzip
 import io
+import os
+import tempfile
 
 if TYPE_CHECKING:
     from bot import RU_COMSCI_bot
@@ -82,6 +86,8 @@ class Context(commands.Context):
         super().__init__(**kwargs)
         self.pool = self.bot.pool
         self._db: Optional[Union[Pool, Connection]] = None
+        # set by the command listeners for latency stats
+        self.started_at: Optional[float] = None
 
     async def entry_to_code(self, entries: Iterable[tuple[str, str]]) -> None:
         width = max(len(a) for a, b in entries)
@@ -188,6 +194,7 @@ class Context(commands.Context):
             author_id=author_id,
         )
         view.message = await self.send(message, view=view)
+        self.bot.view_manager.track(view, author_id)
         await view.wait()
         return view.value
 
@@ -197,6 +204,7 @@ class Context(commands.Context):
 
     async def _acquire(self, timeout: Optional[float]) -> Connection:
         if self._db is None:
+            # the pool reports the wait to bot.pool_monitor
             self._db = await self.pool.acquire(timeout=timeout)
         return self._db
 
@@ -257,6 +265,29 @@ class Context(commands.Context):
         else:
             return await self.send(content)
 
+    async def safe_send_file(self, fp: IO[bytes], *, filename: str, **kwargs) -> Optional[discord.Message]:
+        """Sends a seekable binary file, compressing it if it's over the upload limit.
+
+        The file is read from the start. If it's still too large after gzip then
+        nothing is uploaded and a message is sent instead.
+        """
+        limit = self.guild.filesize_limit if self.guild else discord.utils.DEFAULT_FILE_SIZE_LIMIT_BYTES
+        size = fp.seek(0, os.SEEK_END)
+        fp.seek(0)
+
+        if size <= limit:
+            return await self.send(file=discord.File(fp, filename=filename), **kwargs)
+
+        with tempfile.TemporaryFile() as compressed:
+            with gzip.GzipFile(fileobj=compressed, mode='wb') as gz:
+                await asyncio.to_thread(shutil.copyfileobj, fp, gz)
+
+            if compressed.tell() > limit:
+                return await self.send('The file is too large to upload.')
+
+            compressed.seek(0)
+            return await self.send(file=discord.File(compressed, filename=f'{filename}.gz'), **kwargs)
+
 
 class GuildContext(Context):
     author: discord.Member
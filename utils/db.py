@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import os
+import json
+import time
+import asyncio
+import logging
+import statistics
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Optional
+
+import asyncpg
+
+from utils.queries import PreparedConnection, registry
+
+__all__ = (
+    'PoolConfig',
+    'PoolMonitor',
+    'MonitoredPool',
+    'create_pool',
+    'init_connection',
+)
+
+_log = logging.getLogger(__name__)
+
+# set while PoolMonitor.probe holds a connection, so its acquires aren't counted as callers'
+_probing: ContextVar[bool] = ContextVar('_probing', default=False)
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+class PoolConfig:
+    """PostgreSQL pool settings, read from the environment.
+
+    ``POSTGRES_DSN`` (or ``DATABASE_URL``) is required, everything else
+    has a default.
+    """
+
+    def __init__(
+            self,
+            dsn: Optional[str],
+            *,
+            min_size: int = 5,
+            max_size: int = 20,
+            command_timeout: float = 60.0,
+            statement_cache_size: int = 100,
+            application_name: str = 'RU_COMSCI_bot',
+            connect_retries: int = 5,
+            health_check_interval: float = 30.0,
+    ) -> None:
+        self.dsn: Optional[str] = dsn
+        self.min_size: int = min_size
+        self.max_size: int = max_size
+        self.command_timeout: float = command_timeout
+        self.statement_cache_size: int = statement_cache_size
+        self.application_name: str = application_name
+        self.connect_retries: int = connect_retries
+        self.health_check_interval: float = health_check_interval
+
+    @classmethod
+    def from_env(cls) -> PoolConfig:
+        return cls(
+            os.getenv('POSTGRES_DSN') or os.getenv('DATABASE_URL'),
+            min_size=_env_int('POSTGRES_MIN_SIZE', 5),
+            max_size=_env_int('POSTGRES_MAX_SIZE', 20),
+            command_timeout=_env_float('POSTGRES_COMMAND_TIMEOUT', 60.0),
+            statement_cache_size=_env_int('POSTGRES_STATEMENT_CACHE_SIZE', 100),
+            application_name=os.getenv('POSTGRES_APPLICATION_NAME', 'RU_COMSCI_bot'),
+            connect_retries=_env_int('POSTGRES_CONNECT_RETRIES', 5),
+            health_check_interval=_env_float('POSTGRES_HEALTH_CHECK_INTERVAL', 30.0),
+        )
+
+
+async def init_connection(con: asyncpg.Connection) -> None:
+    """Called by the pool for every new connection."""
+    await con.set_type_codec(
+        'jsonb',
+        schema='pg_catalog',
+        encoder=json.dumps,
+        decoder=json.loads,
+        format='text',
+    )
+    await registry.prepare_all(con)
+
+
+class MonitoredPool(asyncpg.Pool):
+    """An :class:`asyncpg.Pool` that reports every acquire to its :class:`PoolMonitor`.
+
+    ``acquire()``, ``pool.fetch()`` and the rest all wait in ``_acquire``, so
+    callers that use the pool directly are counted too, not only contexts.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.monitor: Optional[PoolMonitor] = None
+
+    async def _acquire(self, timeout: Optional[float]) -> Any:
+        monitor = self.monitor
+        if monitor is None or _probing.get():
+            return await super()._acquire(timeout)
+
+        start = time.perf_counter()
+        try:
+            connection = await super()._acquire(timeout)
+        except asyncio.TimeoutError:
+            monitor.record_timeout()
+            raise
+        monitor.record_wait(time.perf_counter() - start)
+        return connection
+
+
+async def create_pool(config: PoolConfig) -> MonitoredPool:
+    """Creates the connection pool, retrying with exponential backoff.
+
+    Raises the last connection error once ``config.connect_retries`` is exhausted.
+    """
+    if not config.dsn:
+        raise RuntimeError('POSTGRES_DSN is not set')
+
+    delay = 1.0
+    for attempt in range(1, config.connect_retries + 1):
+        try:
+            # what asyncpg.create_pool does, with our pool class
+            return await MonitoredPool(
+                config.dsn,
+                min_size=config.min_size,
+                max_size=config.max_size,
+                max_queries=50000,
+                max_inactive_connection_lifetime=300.0,
+                loop=None,
+                connection_class=PreparedConnection,
+                record_class=asyncpg.Record,
+                init=init_connection,
+                command_timeout=config.command_timeout,
+                statement_cache_size=config.statement_cache_size,
+                # a startup parameter survives the RESET ALL the pool runs on release, set_config doesn't
+                server_settings={'application_name': config.application_name},
+            )
+        except (OSError, asyncio.TimeoutError, asyncpg.PostgresError) as e:
+            if attempt == config.connect_retries:
+                raise
+
+            _log.warning('Could not connect to PostgreSQL (attempt %s/%s): %s. Retrying in %.0fs.',
+                         attempt, config.connect_retries, e, delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    raise RuntimeError('unreachable')
+
+
+class PoolMonitor:
+    """Keeps track of how long callers wait for a connection and how busy the pool is.
+
+    Every acquire on a :class:`MonitoredPool` is recorded in ``waits``. Other
+    pools only see what is passed to :meth:`record_wait`.
+
+    A background liveness probe acquires a connection every ``interval`` seconds,
+    runs ``SELECT 1`` and samples pool utilisation. Its own acquires are kept
+    in ``probe_waits``, apart from the callers' ``waits``.
+    """
+
+    def __init__(self, pool: asyncpg.Pool, *, interval: float = 30.0, history: int = 1024) -> None:
+        self.pool: asyncpg.Pool = pool
+        self.interval: float = interval
+        self.waits: deque[float] = deque(maxlen=history)
+        self.probe_waits: deque[float] = deque(maxlen=history)
+        self.utilisation: deque[float] = deque(maxlen=history)
+        self.acquires: int = 0
+        self.acquire_timeouts: int = 0
+        self.probe_failures: int = 0
+        self.last_probe: Optional[float] = None
+        self.last_probe_latency: Optional[float] = None
+        self.healthy: bool = True
+        self._task: Optional[asyncio.Task[None]] = None
+        if isinstance(pool, MonitoredPool):
+            pool.monitor = self
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._probe_loop())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def record_wait(self, seconds: float) -> None:
+        self.acquires += 1
+        self.waits.append(seconds)
+
+    def record_timeout(self) -> None:
+        self.acquire_timeouts += 1
+
+    def sample_utilisation(self) -> float:
+        size = self.pool.get_size()
+        in_use = size - self.pool.get_idle_size()
+        value = in_use / self.pool.get_max_size()
+        self.utilisation.append(value)
+        return value
+
+    async def probe(self) -> None:
+        token = _probing.set(True)
+        start = time.perf_counter()
+        try:
+            async with self.pool.acquire(timeout=self.interval) as con:
+                acquired = time.perf_counter()
+                self.probe_waits.append(acquired - start)
+                await con.fetchval('SELECT 1;')
+        except Exception as e:
+            self.probe_failures += 1
+            if self.healthy:
+                _log.warning('PostgreSQL liveness probe failed: %s', e)
+            self.healthy = False
+        else:
+            if not self.healthy:
+                _log.info('PostgreSQL liveness probe recovered.')
+            self.healthy = True
+            self.last_probe_latency = time.perf_counter() - acquired
+        finally:
+            _probing.reset(token)
+            self.last_probe = time.time()
+            self.sample_utilisation()
+
+    async def _probe_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.probe()
+
+    @staticmethod
+    def _quantile(values: list[float], q: float) -> float:
+        if len(values) < 2:
+            return values[0] if values else 0.0
+        return statistics.quantiles(values, n=100, method='inclusive')[int(q * 100) - 1]
+
+    def summary(self) -> dict[str, Any]:
+        waits = sorted(self.waits)
+        utilisation = list(self.utilisation)
+        return {
+            'size': self.pool.get_size(),
+            'idle': self.pool.get_idle_size(),
+            'min_size': self.pool.get_min_size(),
+            'max_size': self.pool.get_max_size(),
+            'acquires': self.acquires,
+            'acquire_timeouts': self.acquire_timeouts,
+            'wait_p50': self._quantile(waits, 0.50),
+            'wait_p95': self._quantile(waits, 0.95),
+            'wait_max': waits[-1] if waits else 0.0,
+            'utilisation_avg': sum(utilisation) / len(utilisation) if utilisation else 0.0,
+            'utilisation_max': max(utilisation, default=0.0),
+            'healthy': self.healthy,
+            'probe_failures': self.probe_failures,
+            'probe_latency': self.last_probe_latency,
+            'probe_wait_max': max(self.probe_waits, default=0.0),
+        }
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import re
+from collections import Counter
+from typing import Iterable, Optional
+
+__all__ = (
+    'trigrams',
+    'TrigramIndex',
+)
+
+# pg_trgm treats anything that isn't part of a word as a separator.
+# Thai vowels and tone marks are combining characters, so we only split on
+# whitespace and ASCII punctuation instead of relying on str.isalnum.
+_WORD_SEPARATORS = re.compile(r'[\s!-/:-@\[-`{-~]+')
+
+
+def trigrams(text: str) -> frozenset[str]:
+    """Returns the set of trigrams for ``text`` the same way pg_trgm does.
+
+    Every word is lowercased and padded with two spaces in front and
+    one space at the end before being split into three character chunks.
+    """
+    grams = set()
+    for word in _WORD_SEPARATORS.split(text.lower()):
+        if not word:
+            continue
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+class TrigramIndex:
+    """An in-memory trigram inverted index of names.
+
+    Names are stored case insensitively, each mapped to an arbitrary value
+    (usually the row ID). Similarity is the same Jaccard score used by
+    pg_trgm's ``similarity()`` function.
+    """
+
+    __slots__ = ('_values', '_names', '_grams', '_postings')
+
+    def __init__(self, entries: Iterable[tuple[str, int]] = ()) -> None:
+        # lowercased name -> value
+        self._values: dict[str, int] = {}
+        # lowercased name -> original name
+        self._names: dict[str, str] = {}
+        self._grams: dict[str, frozenset[str]] = {}
+        self._postings: dict[str, set[str]] = {}
+        for name, value in entries:
+            self.add(name, value)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, name: str) -> bool:
+        return name.lower() in self._values
+
+    def add(self, name: str, value: int) -> None:
+        key = name.lower()
+        if key in self._values:
+            self.remove(key)
+
+        grams = trigrams(key)
+        self._values[key] = value
+        self._names[key] = name
+        self._grams[key] = grams
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(key)
+
+    def remove(self, name: str) -> bool:
+        key = name.lower()
+        try:
+            del self._values[key]
+        except KeyError:
+            return False
+
+        del self._names[key]
+        for gram in self._grams.pop(key):
+            bucket = self._postings[gram]
+            bucket.discard(key)
+            if not bucket:
+                del self._postings[gram]
+        return True
+
+    def search(self, query: str, *, limit: Optional[int] = None, threshold: float = 0.3) -> list[tuple[str, int, float]]:
+        """Returns ``(name, value, similarity)`` tuples ordered by similarity."""
+        grams = trigrams(query)
+        if not grams:
+            return []
+
+        shared: Counter[str] = Counter()
+        for gram in grams:
+            bucket = self._postings.get(gram)
+            if bucket:
+                shared.update(bucket)
+
+        query_size = len(grams)
+        results = []
+        for key, count in shared.items():
+            score = count / (query_size + len(self._grams[key]) - count)
+            if score >= threshold:
+                results.append((self._names[key], self._values[key], score))
+
+        results.sort(key=lambda r: (-r[2], r[0]))
+        return results[:limit] if limit is not None else results
+
+    def complete(self, current: str, *, limit: int = 25) -> list[str]:
+        """Returns names to suggest for a partially typed ``current``.
+
+        Names starting with ``current`` come first, followed by fuzzy matches.
+        """
+        current = current.lower().strip()
+        if not current:
+            return [self._names[key] for key in sorted(self._names)[:limit]]
+
+        names = [self._names[key] for key in sorted(k for k in self._names if k.startswith(current))][:limit]
+        if len(names) < limit:
+            seen = set(names)
+            for name, _, _ in self.search(current, threshold=0.1):
+                if name not in seen:
+                    names.append(name)
+                    if len(names) >= limit:
+                        break
+        return names
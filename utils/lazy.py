@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import sys
+import importlib
+import threading
+from types import ModuleType
+from typing import Any, Optional
+
+__all__ = (
+    'LazyModule',
+    'lazy_import',
+)
+
+
+class LazyModule:
+    """Stands in for a module and imports it on the first attribute access.
+
+    Keeps heavy optional modules (pygit2, psutil, jishaku) out of cold start
+    until a command actually needs them. Annotations that only name the module
+    are fine as long as the file uses ``from __future__ import annotations``.
+    """
+
+    __slots__ = ('_name', '_module', '_lock')
+
+    def __init__(self, name: str) -> None:
+        self._name: str = name
+        self._module: Optional[ModuleType] = sys.modules.get(name)
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def load(self) -> ModuleType:
+        module = self._module
+        if module is None:
+            # sampling and git walks run in threads, only import once
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+                module = self._module
+        return module
+
+    def __getattr__(self, attribute: str) -> Any:
+        return getattr(self.load(), attribute)
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f'<LazyModule {self._name!r} ({state})>'
+
+
+def lazy_import(name: str) -> Any:
+    """Returns a :class:`LazyModule` for ``name``, typed as ``Any`` so attribute access type checks."""
+    return LazyModule(name)
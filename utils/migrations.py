@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import re
+import logging
+from pathlib import Path
+from typing import Optional
+
+import asyncpg
+
+__all__ = (
+    'Migration',
+    'Migrations',
+)
+
+_log = logging.getLogger(__name__)
+
+MIGRATIONS_DIRECTORY = Path(__file__).resolve().parent.parent / 'migrations'
+MIGRATION_FILE = re.compile(r'V(?P<version>[0-9]+)__(?P<description>.+)\.sql')
+
+
+class Migration:
+    __slots__ = ('version', 'description', 'path')
+
+    def __init__(self, version: int, description: str, path: Path) -> None:
+        self.version: int = version
+        self.description: str = description
+        self.path: Path = path
+
+    def __repr__(self) -> str:
+        return f'<Migration version={self.version} description={self.description!r}>'
+
+    @property
+    def sql(self) -> str:
+        return self.path.read_text(encoding='utf-8')
+
+
+class Migrations:
+    """Versioned SQL migrations stored as ``migrations/V{version}__{description}.sql``.
+
+    Applied versions are recorded in the ``rucs_schema_migrations`` table and
+    every migration runs in its own transaction.
+    """
+
+    def __init__(self, directory: Optional[str | Path] = None) -> None:
+        self.directory: Path = Path(directory) if directory is not None else MIGRATIONS_DIRECTORY
+        self.migrations: dict[int, Migration] = self._discover()
+
+    def _discover(self) -> dict[int, Migration]:
+        migrations: dict[int, Migration] = {}
+        for path in self.directory.glob('V*__*.sql'):
+            match = MIGRATION_FILE.fullmatch(path.name)
+            if match is None:
+                continue
+
+            version = int(match.group('version'))
+            if version in migrations:
+                raise RuntimeError(f'duplicate migration version {version}: {path.name}')
+
+            description = match.group('description').replace('_', ' ')
+            migrations[version] = Migration(version, description, path)
+
+        return dict(sorted(migrations.items()))
+
+    @property
+    def latest(self) -> int:
+        return max(self.migrations, default=0)
+
+    async def ensure_table(self, con: asyncpg.Connection) -> None:
+        query = """CREATE TABLE IF NOT EXISTS rucs_schema_migrations (
+                       version INTEGER PRIMARY KEY,
+                       description TEXT NOT NULL,
+                       applied_at TIMESTAMP NOT NULL DEFAULT (now() at time zone 'utc')
+                   );
+                """
+        await con.execute(query)
+
+    async def current_version(self, con: asyncpg.Connection) -> int:
+        await self.ensure_table(con)
+        version = await con.fetchval('SELECT MAX(version) FROM rucs_schema_migrations;')
+        return version or 0
+
+    def pending(self, current: int, target: Optional[int] = None) -> list[Migration]:
+        target = self.latest if target is None else target
+        return [m for v, m in self.migrations.items() if current < v <= target]
+
+    async def upgrade(self, con: asyncpg.Connection, *, target: Optional[int] = None) -> list[Migration]:
+        """Applies every pending migration up to ``target`` (defaults to the latest)."""
+        current = await self.current_version(con)
+        applied = []
+        for migration in self.pending(current, target):
+            async with con.transaction():
+                await con.execute(migration.sql)
+                await con.execute(
+                    'INSERT INTO rucs_schema_migrations (version, description) VALUES ($1, $2);',
+                    migration.version,
+                    migration.description,
+                )
+            _log.info('Applied migration V%s (%s)', migration.version, migration.description)
+            applied.append(migration)
+        return applied
@@ -2,15 +2,61 @@
 
 from __future__ import annotations
 
+import io
+import sys
+import math
+import array
+import time
+import codecs
 import asyncio
-from typing import TYPE_CHECKING, Any, Dict, Optional
+import tempfile
+from collections import OrderedDict
+from typing import IO, TYPE_CHECKING, Any, AsyncIterable, Awaitable, BinaryIO, Callable, Dict, List, Optional, TextIO, Union
 import discord
 from discord.ext import commands
 from discord.ext.commands import Context
 from discord.ext.commands import Paginator as CommandPaginator
 from discord.ext import menus
 
+class _PageMenu:
+    """Stands in for the menu while a page is rendered.
+
+    Sources read ``menu.current_page`` and write to ``menu.embed``, so a page
+    rendered ahead of time gets its own page number and its own embed.
+    """
+
+    def __init__(self, menu: RUCS_Pages, page_number: int):
+        self._menu = menu
+        self.current_page = page_number
+        embed = getattr(menu, 'embed', None)
+        if embed is not None:
+            self.embed = embed.copy()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._menu, name)
+
+
+def _copy_embeds(kwargs: Dict[str, Any], menu: _PageMenu) -> Dict[str, Any]:
+    # sources like FieldPageSource hand out the same embed for every page,
+    # only the menu's own copy is safe to keep as is
+    owned = menu.__dict__.get('embed')
+    if kwargs.get('embed') is not None and kwargs['embed'] is not owned:
+        kwargs['embed'] = kwargs['embed'].copy()
+    if kwargs.get('embeds'):
+        kwargs['embeds'] = [embed if embed is owned else embed.copy() for embed in kwargs['embeds']]
+    return kwargs
+
+
 class RUCS_Pages(discord.ui.View):
+    """A button paginator over a :class:`menus.PageSource`.
+
+    Rendered pages are kept in an LRU of ``cache_size`` pages. For sources that
+    fetch or read their pages lazily, the pages on either side are also rendered
+    in the background after every page change, so a button press is usually just
+    the edit. A ``cache_size`` of 0 renders every page on demand, for sources
+    whose pages change while they are shown.
+    """
+
     def __init__(
         self,
         source: menus.PageSource,
@@ -18,6 +64,7 @@ class RUCS_Pages(discord.ui.View):
         ctx: Context,
         check_embeds: bool = True,
         compact: bool = False,
+        cache_size: int = 16,
     ):
         super().__init__()
         self.source: menus.PageSource = source
@@ -26,7 +73,13 @@ class RUCS_Pages(discord.ui.View):
         self.message: Optional[discord.Message] = None
         self.current_page: int = 0
         self.compact: bool = compact
+        self.cache_size: int = cache_size
         self.input_lock = asyncio.Lock()
+        self._rendered: OrderedDict[int, Dict[str, Any]] = OrderedDict()
+        # footers show the page count, a new count makes every rendered page stale
+        self._rendered_max_pages: Optional[int] = None
+        self._render_lock = asyncio.Lock()
+        self._prefetch_task: Optional[asyncio.Task[None]] = None
         self.clear_items()
         self.fill_items()
 
@@ -37,7 +90,11 @@ class RUCS_Pages(discord.ui.View):
 
         if self.source.is_paginating():
             max_pages = self.source.get_max_pages()
-            use_last_and_first = max_pages is not None and max_pages >= 2
+            if max_pages is None and isinstance(self.source, KeysetPageSource):
+                # the total is counted on demand when jumping to the last page
+                use_last_and_first = self.source.can_count
+            else:
+                use_last_and_first = max_pages is not None and max_pages >= 2
             if use_last_and_first:
                 self.add_item(self.go_to_first_page)
             self.add_item(self.go_to_previous_page)
@@ -50,8 +107,8 @@ class RUCS_Pages(discord.ui.View):
                 self.add_item(self.numbered_page)
             self.add_item(self.stop_pages)
 
-    async def _get_kwargs_from_page(self, page: int) -> Dict[str, Any]:
-        value = await discord.utils.maybe_coroutine(self.source.format_page, self, page)
+    async def _get_kwargs_from_page(self, page: int, menu: Optional[_PageMenu] = None) -> Dict[str, Any]:
+        value = await discord.utils.maybe_coroutine(self.source.format_page, menu or self, page)
         if isinstance(value, dict):
             return value
         elif isinstance(value, str):
@@ -62,9 +119,15 @@ class RUCS_Pages(discord.ui.View):
             return {}
 
     async def show_page(self, interaction: discord.Interaction, page_number: int) -> None:
-        page = await self.source.get_page(page_number)
+        started_at = time.perf_counter()
+        try:
+            await self._show_page(interaction, page_number)
+        finally:
+            self.ctx.bot.command_stats.record(f'pages:{type(self.source).__name__}', time.perf_counter() - started_at)
+
+    async def _show_page(self, interaction: discord.Interaction, page_number: int) -> None:
+        kwargs = await self.render_page(page_number)
         self.current_page = page_number
-        kwargs = await self._get_kwargs_from_page(page)
         self._update_labels(page_number)
         if kwargs:
             if interaction.response.is_done():
@@ -72,6 +135,91 @@ class RUCS_Pages(discord.ui.View):
                     await self.message.edit(**kwargs, view=self)
             else:
                 await interaction.response.edit_message(**kwargs, view=self)
+        self._schedule_prefetch(page_number)
+
+    async def render_page(self, page_number: int) -> Dict[str, Any]:
+        """Returns the message kwargs of a page, from the cache if it was rendered before."""
+
+        max_pages = self.source.get_max_pages()
+        if max_pages != self._rendered_max_pages:
+            self._rendered.clear()
+            self._rendered_max_pages = max_pages
+
+        kwargs = self._rendered.get(page_number)
+        if kwargs is not None:
+            self._rendered.move_to_end(page_number)
+            return kwargs
+
+        # sources share their embed between pages, so only one page is rendered at a time
+        async with self._render_lock:
+            kwargs = self._rendered.get(page_number)
+            if kwargs is not None:
+                return kwargs
+
+            page = await self.source.get_page(page_number)
+            menu = _PageMenu(self, page_number)
+            kwargs = _copy_embeds(await self._get_kwargs_from_page(page, menu), menu)
+            if self.cache_size > 0:
+                self._rendered[page_number] = kwargs
+                while len(self._rendered) > self.cache_size:
+                    self._rendered.popitem(last=False)
+            return kwargs
+
+    def _schedule_prefetch(self, page_number: int) -> None:
+        if self.cache_size < 3 or self.is_finished():
+            return
+        if not isinstance(self.source, (KeysetPageSource, StreamingTextPageSource)):
+            # pages already in memory render in microseconds, less than the task costs
+            return
+        if self._prefetch_task is not None:
+            # nothing is cached until a render completes, so this is safe at any point
+            self._prefetch_task.cancel()
+        self._prefetch_task = asyncio.create_task(self._prefetch(page_number))
+
+    async def _prefetch(self, page_number: int) -> None:
+        for neighbour in (page_number + 1, page_number - 1):
+            max_pages = self.source.get_max_pages()
+            if neighbour < 0 or (max_pages is not None and neighbour >= max_pages) or neighbour in self._rendered:
+                continue
+            try:
+                await self.render_page(neighbour)
+            except Exception:
+                # past the end of a lazy source, or broken, either way the press renders it again
+                return
+
+    def release(self) -> None:
+        """Drops the rendered pages and closes streaming sources, once the view is done."""
+        if self._prefetch_task is not None:
+            self._prefetch_task.cancel()
+            self._prefetch_task = None
+        self._rendered.clear()
+        if isinstance(self.source, StreamingTextPageSource):
+            self.source.close()
+
+    def stop(self) -> None:
+        self.release()
+        super().stop()
+
+    def memory(self) -> int:
+        """Rough bytes held by the rendered pages and the source's entries."""
+
+        size = sys.getsizeof(self)
+        for kwargs in self._rendered.values():
+            for value in kwargs.values():
+                if isinstance(value, str):
+                    size += sys.getsizeof(value)
+                elif isinstance(value, discord.Embed):
+                    # characters, close enough for text
+                    size += len(value)
+
+        source = self.source
+        if isinstance(source, StreamingTextPageSource):
+            size += source.offsets.itemsize * len(source.offsets) + sys.getsizeof(source._buffer)
+        elif isinstance(source, KeysetPageSource):
+            size += sum(sys.getsizeof(page) + sum(map(sys.getsizeof, page)) for page in source.pages.values())
+        elif isinstance(source, menus.ListPageSource):
+            size += sys.getsizeof(source.entries) + sum(map(sys.getsizeof, source.entries))
+        return size
 
     def _update_labels(self, page_number: int) -> None:
         self.go_to_first_page.disabled = page_number == 0
@@ -118,6 +266,7 @@ class RUCS_Pages(discord.ui.View):
         return False
 
     async def on_timeout(self) -> None:
+        self.release()
         if self.message:
             await self.message.edit(view=None)
 
@@ -127,19 +276,29 @@ class RUCS_Pages(discord.ui.View):
         else:
             await interaction.response.send_message('An unknown error occurred, sorry', ephemeral=True)
 
-    async def start(self, *, content: Optional[str] = None) -> None:
+    async def start(self, *, content: Optional[str] = None, ephemeral: bool = False) -> None:
         if self.check_embeds and not self.ctx.channel.permissions_for(self.ctx.me).embed_links:  # type: ignore
             await self.ctx.send('Bot does not have embed links permission in this channel.')
             return
 
         await self.source._prepare_once()
-        page = await self.source.get_page(0)
-        kwargs = await self._get_kwargs_from_page(page)
+        # lazy sources only know whether they paginate after preparing
+        self.clear_items()
+        self.fill_items()
+
+        kwargs = await self.render_page(0)
         if content:
-            kwargs.setdefault('content', content)
+            kwargs = {**kwargs, 'content': kwargs.get('content') or content}
 
         self._update_labels(0)
-        self.message = await self.ctx.send(**kwargs, view=self)
+        # ephemeral only applies when the context comes from an interaction
+        self.message = await self.ctx.send(**kwargs, view=self, ephemeral=ephemeral)
+        if not self.source.is_paginating():
+            # a single page has no buttons, nothing will stop the view otherwise
+            self.stop()
+            return
+        self.ctx.bot.view_manager.track(self, self.ctx.author.id)
+        self._schedule_prefetch(0)
 
     @discord.ui.button(label='≪', style=discord.ButtonStyle.grey)
     async def go_to_first_page(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -164,7 +323,10 @@ class RUCS_Pages(discord.ui.View):
     async def go_to_last_page(self, interaction: discord.Interaction, button: discord.ui.Button):
         """go to the last page"""
         # The call here is safe because it's guarded by skip_if
-        await self.show_page(interaction, self.source.get_max_pages() - 1)  # type: ignore
+        max_pages = self.source.get_max_pages()
+        if max_pages is None and isinstance(self.source, KeysetPageSource):
+            max_pages = await self.source.fetch_max_pages()
+        await self.show_page(interaction, max_pages - 1)  # type: ignore
 
     @discord.ui.button(label='Skip to page...', style=discord.ButtonStyle.grey)
     async def numbered_page(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -192,6 +354,9 @@ class RUCS_Pages(discord.ui.View):
             else:
                 page = int(msg.content)
                 await msg.delete()
+                if self.is_finished():
+                    # stopped or evicted while waiting for the answer
+                    return
                 await self.show_checked_page(interaction, page - 1)
 
     @discord.ui.button(label='Quit', style=discord.ButtonStyle.red)
@@ -227,7 +392,12 @@ class FieldPageSource(menus.ListPageSource):
 class TextPageSource(menus.ListPageSource):
     def __init__(self, text, *, prefix='```', suffix='```', max_size=2000):
         pages = CommandPaginator(prefix=prefix, suffix=suffix, max_size=max_size - 200)
+        # CommandPaginator refuses lines that don't fit on a page by themselves
+        width = pages.max_size - pages._prefix_len - pages._suffix_len - 2
         for line in text.split('\n'):
+            while len(line) > width:
+                pages.add_line(line[:width])
+                line = line[width:]
             pages.add_line(line)
 
         super().__init__(entries=pages.pages, per_page=1)
@@ -239,6 +409,185 @@ class TextPageSource(menus.ListPageSource):
         return content
 
 
+class StreamingTextPageSource(menus.PageSource):
+    """Same as :class:`TextPageSource`, but for text too large to keep in memory.
+
+    ``stream`` is a file-like object with ``read`` or an async iterable of
+    ``str`` or ``bytes`` chunks, and the source takes ownership of it. It's
+    only read as far as the pages asked for so far, and a read from a file
+    happens in a thread.
+
+    The pages that were cut are kept so going back doesn't re-read the
+    stream. They're kept in memory up to ``spool_size`` bytes, past that they
+    move to a temporary file which is written and read in a thread, and only
+    the byte offsets of the pages stay in memory.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+    SPOOL_SIZE = 1024 * 1024
+
+    def __init__(
+        self,
+        stream: Union[BinaryIO, TextIO, AsyncIterable[Union[str, bytes]]],
+        *,
+        prefix: str = '```',
+        suffix: str = '```',
+        max_size: int = 2000,
+        encoding: str = 'utf-8',
+        spool_size: int = SPOOL_SIZE,
+    ):
+        self.stream = stream
+        self.prefix: str = prefix
+        self.suffix: str = suffix
+        # same room for the page number as TextPageSource, each line ends with a newline
+        self.width: int = max_size - 200 - len(prefix) - len(suffix) - 1
+        # 8 bytes per page
+        self.offsets: array.array[int] = array.array('Q', [0])
+        self._iterator = None if hasattr(stream, 'read') else stream.__aiter__()
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        self._buffer: str = ''
+        self._position: int = 0
+        self._eof: bool = False
+        self._next_line: Optional[str] = None
+        self._indexed: bool = False
+        self.spool_size: int = spool_size
+        self._memory: Optional[bytearray] = bytearray()
+        self._spool: Optional[IO[bytes]] = None
+        self._lock = asyncio.Lock()
+
+    async def _read(self) -> bool:
+        if self._eof:
+            return False
+
+        if self._iterator is None:
+            chunk = await asyncio.to_thread(self.stream.read, self.CHUNK_SIZE)
+        else:
+            try:
+                chunk = await self._iterator.__anext__()
+            except StopAsyncIteration:
+                chunk = None
+            else:
+                # an empty chunk from an iterator doesn't mean the end
+                chunk = chunk or ''
+
+        if chunk is None or (self._iterator is None and not chunk):
+            self._eof = True
+            text = self._decoder.decode(b'', final=True)
+        elif isinstance(chunk, bytes):
+            text = self._decoder.decode(chunk)
+        else:
+            text = chunk
+
+        self._buffer = self._buffer[self._position:] + text
+        self._position = 0
+        return not self._eof
+
+    async def _read_line(self) -> Optional[str]:
+        # a line that fits on a page by itself, longer ones are split like TextPageSource does
+        while True:
+            index = self._buffer.find('\n', self._position, self._position + self.width)
+            if index != -1:
+                line = self._buffer[self._position:index + 1]
+                self._position = index + 1
+                return line
+            if len(self._buffer) - self._position >= self.width or not await self._read():
+                break
+
+        if self._position >= len(self._buffer):
+            return None
+        line = self._buffer[self._position:self._position + self.width - 1]
+        self._position += len(line)
+        return line + '\n'
+
+    async def _index_next_page(self) -> None:
+        lines = []
+        size = 0
+        while True:
+            line = self._next_line if self._next_line is not None else await self._read_line()
+            self._next_line = None
+            if line is None:
+                break
+            if lines and size + len(line) > self.width:
+                self._next_line = line
+                break
+            lines.append(line)
+            size += len(line)
+
+        data = ''.join(lines).encode('utf-8')
+        await self._write(data)
+        self.offsets.append(self.offsets[-1] + len(data))
+
+        # look ahead so the page count is known as soon as the last page is cut
+        if self._next_line is None:
+            self._next_line = await self._read_line()
+        if self._next_line is None:
+            self._indexed = True
+
+    async def _write(self, data: bytes) -> None:
+        if self._memory is not None and len(self._memory) + len(data) <= self.spool_size:
+            self._memory += data
+            return
+
+        if self._spool is None:
+            # past the threshold, everything so far moves to disk in one go
+            data, self._memory = bytes(self._memory or b'') + data, None
+            self._spool = await asyncio.to_thread(tempfile.TemporaryFile)
+        await asyncio.to_thread(self._spool.write, data)
+
+    @staticmethod
+    def _read_spool(fp: IO[bytes], start: int, end: int) -> bytes:
+        fp.seek(start)
+        data = fp.read(end - start)
+        # writes append at the position left by the last read otherwise
+        fp.seek(0, io.SEEK_END)
+        return data
+
+    async def prepare(self) -> None:
+        await self.get_page(0)
+
+    def is_paginating(self) -> bool:
+        return not self._indexed or len(self.offsets) > 2
+
+    def get_max_pages(self) -> Optional[int]:
+        return len(self.offsets) - 1 if self._indexed else None
+
+    async def get_page(self, page_number: int) -> str:
+        if page_number < 0:
+            raise IndexError(page_number)
+
+        # the lock also keeps a read from moving the file position under a write
+        async with self._lock:
+            while len(self.offsets) - 1 <= page_number and not self._indexed:
+                await self._index_next_page()
+
+            if page_number >= len(self.offsets) - 1:
+                raise IndexError(page_number)
+
+            start, end = self.offsets[page_number], self.offsets[page_number + 1]
+            if self._spool is None:
+                data = bytes(self._memory[start:end]) if self._memory is not None else b''
+            else:
+                data = await asyncio.to_thread(self._read_spool, self._spool, start, end)
+        return data.decode('utf-8')
+
+    async def format_page(self, menu, content) -> str:
+        text = f'{self.prefix}\n{content}{self.suffix}' if self.prefix else f'{content}{self.suffix}'
+        maximum = self.get_max_pages()
+        if maximum is None:
+            return f'{text}\nPage {menu.current_page + 1}'
+        if maximum > 1:
+            return f'{text}\nPage {menu.current_page + 1}/{maximum}'
+        return text
+
+    def close(self) -> None:
+        self._memory = None
+        if self._spool is not None:
+            self._spool.close()
+        close = getattr(self.stream, 'close', None)
+        if close is not None and not asyncio.iscoroutinefunction(close):
+            close()
+
+
 class SimplePageSource(menus.ListPageSource):
     async def format_page(self, menu, entries) -> discord.Embed:
         pages = []
@@ -253,6 +602,149 @@ class SimplePageSource(menus.ListPageSource):
         menu.embed.description = '\n'.join(pages)
         return menu.embed
 
+class KeysetPageSource(menus.PageSource):
+    """A page source that fetches its entries lazily with keyset pagination.
+
+    ``fetch`` is called as ``fetch(after, limit)`` where ``after`` is the key of the
+    last entry seen (``None`` for the first page) and must return at most ``limit``
+    entries ordered by ``key``. Pages that were already fetched are kept around.
+
+    Jumping doesn't fetch the pages in between when the source can do better:
+    ``fetch_before(before, limit)`` returns the ``limit`` entries before the key
+    ``before`` (the last ones for ``None``) in descending order, which serves the
+    last page and paging back from it, and ``seek(offset, limit)`` fetches from
+    an offset for jumps to a page number.
+
+    The total number of entries is only counted through ``count`` when it's
+    actually needed, e.g. to jump to the last page.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[Optional[Any], int], Awaitable[List[Any]]],
+        *,
+        key: Callable[[Any], Any],
+        count: Optional[Callable[[], Awaitable[int]]] = None,
+        fetch_before: Optional[Callable[[Optional[Any], int], Awaitable[List[Any]]]] = None,
+        seek: Optional[Callable[[int, int], Awaitable[List[Any]]]] = None,
+        per_page: int = 12,
+    ):
+        self.fetch = fetch
+        self.key = key
+        self.count = count
+        self.fetch_before = fetch_before
+        self.seek = seek
+        self.per_page: int = per_page
+        self.pages: Dict[int, List[Any]] = {}
+        self.total: Optional[int] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def can_count(self) -> bool:
+        return self.count is not None
+
+    @property
+    def has_entries(self) -> bool:
+        return any(self.pages.values())
+
+    def _store(self, page_number: int, entries: List[Any]) -> None:
+        for i in range(0, len(entries), self.per_page):
+            self.pages[page_number + i // self.per_page] = entries[i:i + self.per_page]
+
+    def _ended(self, page_number: int, entries: List[Any], limit: int) -> None:
+        # one extra row was asked for, getting fewer means the end was reached
+        if len(entries) <= limit and (entries or page_number == 0):
+            self.total = page_number * self.per_page + len(entries)
+
+    async def _fetch_until(self, page_number: int) -> None:
+        async with self._lock:
+            if page_number in self.pages:
+                return
+            if self.total is not None and page_number * self.per_page >= self.total:
+                return
+
+            loaded = [number for number in self.pages if number < page_number]
+            start = max(loaded) + 1 if loaded else 0
+            last_page = self.get_max_pages()
+
+            if start == page_number:
+                # the next page after one we have, or the first one
+                after = self.key(self.pages[start - 1][-1]) if start else None
+                entries = await self.fetch(after, self.per_page + 1)
+                self._ended(start, entries, self.per_page)
+                self._store(start, entries[:self.per_page])
+            elif page_number + 1 in self.pages and self.fetch_before is not None:
+                # paging back, e.g. from the last page
+                entries = await self.fetch_before(self.key(self.pages[page_number + 1][0]), self.per_page)
+                self._store(page_number, entries[::-1])
+            elif last_page is not None and page_number == last_page - 1 and self.fetch_before is not None:
+                entries = await self.fetch_before(None, self.total - page_number * self.per_page)  # type: ignore
+                self._store(page_number, entries[::-1])
+            elif self.seek is not None:
+                entries = await self.seek(page_number * self.per_page, self.per_page + 1)
+                self._ended(page_number, entries, self.per_page)
+                self._store(page_number, entries[:self.per_page])
+            else:
+                # nothing better, fetch everything up to the page
+                limit = (page_number + 1 - start) * self.per_page
+                after = self.key(self.pages[start - 1][-1]) if start else None
+                entries = await self.fetch(after, limit + 1)
+                self._ended(start, entries, limit)
+                self._store(start, entries[:limit])
+
+    async def prepare(self) -> None:
+        await self._fetch_until(0)
+
+    def is_paginating(self) -> bool:
+        max_pages = self.get_max_pages()
+        return max_pages is None or max_pages > 1
+
+    def get_max_pages(self) -> Optional[int]:
+        if self.total is not None:
+            return max(1, math.ceil(self.total / self.per_page))
+        return None
+
+    async def fetch_max_pages(self) -> Optional[int]:
+        if self.total is None and self.count is not None:
+            self.total = await self.count()
+        return self.get_max_pages()
+
+    async def get_page(self, page_number: int) -> List[Any]:
+        if page_number < 0:
+            raise IndexError(page_number)
+
+        await self._fetch_until(page_number)
+        try:
+            return self.pages[page_number]
+        except KeyError:
+            raise IndexError(page_number) from None
+
+    async def format_page(self, menu, entries) -> discord.Embed:
+        pages = []
+        for index, entry in enumerate(entries, start=menu.current_page * self.per_page):
+            pages.append(f'{index + 1}. {entry}')
+
+        maximum = self.get_max_pages()
+        if maximum is None:
+            menu.embed.set_footer(text=f'Page {menu.current_page + 1}')
+        elif maximum > 1:
+            footer = f'Page {menu.current_page + 1}/{maximum}'
+            if self.total is not None:
+                footer = f'{footer} ({self.total} entries)'
+            menu.embed.set_footer(text=footer)
+
+        menu.embed.description = '\n'.join(pages)
+        return menu.embed
+
+
+class KeysetPages(RUCS_Pages):
+    """Same as :class:`SimplePages` but backed by a :class:`KeysetPageSource`."""
+
+    def __init__(self, source: KeysetPageSource, *, ctx: Context):
+        super().__init__(source, ctx=ctx)
+        self.embed = discord.Embed(colour=discord.Colour.blurple())
+
+
 class SimplePages(RUCS_Pages):
     """A simple pagination session reminiscent of the old Pages interface.
     Basically an embed with some normal formatting.
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import re
+import logging
+from typing import Iterable, Optional, Union
+
+import asyncpg
+import discord
+
+from utils.queries import registry
+
+__all__ = (
+    'DEFAULT_PREFIXES',
+    'MAX_PREFIXES',
+    'MAX_PREFIX_LENGTH',
+    'PrefixMatcher',
+    'PrefixManager',
+)
+
+_log = logging.getLogger(__name__)
+
+DEFAULT_PREFIXES: tuple[str, ...] = ('!', '.', '?')
+MAX_PREFIXES = 10
+MAX_PREFIX_LENGTH = 15
+
+# ---------- Queries ---------- #
+
+PREFIX_ALL = registry.add(
+    'prefix_all',
+    """SELECT guild_id, prefixes FROM rucs_prefixes;""",
+)
+
+PREFIX_SET = registry.add(
+    'prefix_set',
+    """INSERT INTO rucs_prefixes(guild_id, prefixes) VALUES ($1, $2)
+       ON CONFLICT (guild_id) DO UPDATE SET prefixes=EXCLUDED.prefixes;
+    """,
+)
+
+PREFIX_DELETE = registry.add(
+    'prefix_delete',
+    """DELETE FROM rucs_prefixes WHERE guild_id=$1;""",
+)
+
+
+class PrefixMatcher:
+    """A fixed set of prefixes, compiled once.
+
+    Most messages are chatter, so the first character is checked against a
+    set before the regex runs. The regex tries longer prefixes first.
+    """
+
+    __slots__ = ('prefixes', 'custom', '_first', '_pattern')
+
+    def __init__(self, mentions: tuple[str, ...], custom: tuple[str, ...]) -> None:
+        # longest first, so discord.py's own linear search picks the same prefix as the regex
+        self.prefixes: tuple[str, ...] = tuple(sorted(mentions + custom, key=len, reverse=True))
+        self.custom: tuple[str, ...] = custom
+        self._first: frozenset[str] = frozenset(prefix[0] for prefix in self.prefixes)
+        self._pattern: re.Pattern[str] = re.compile('|'.join(map(re.escape, self.prefixes)))
+
+    def match(self, content: str) -> Optional[str]:
+        if not content or content[0] not in self._first:
+            return None
+
+        match = self._pattern.match(content)
+        return match.group() if match is not None else None
+
+
+class PrefixManager:
+    """Per guild command prefixes, stored in ``rucs_prefixes`` and cached as compiled matchers.
+
+    :meth:`setup` has to run after login since the mention prefixes need the
+    bot's user ID. Guilds without a row use :data:`DEFAULT_PREFIXES`.
+    """
+
+    def __init__(self) -> None:
+        self._mentions: tuple[str, ...] = ()
+        self.default: PrefixMatcher = PrefixMatcher((), DEFAULT_PREFIXES)
+        self._guilds: dict[int, PrefixMatcher] = {}
+
+    def _matcher(self, prefixes: Iterable[str]) -> PrefixMatcher:
+        return PrefixMatcher(self._mentions, tuple(prefixes))
+
+    async def setup(self, user: discord.abc.Snowflake, pool: asyncpg.Pool) -> None:
+        self._mentions = (f'<@!{user.id}> ', f'<@{user.id}> ')
+        self.default = self._matcher(DEFAULT_PREFIXES)
+
+        try:
+            records = await registry.fetch(pool, PREFIX_ALL)
+        except asyncpg.UndefinedTableError:
+            _log.warning('rucs_prefixes does not exist, run "launcher.py db upgrade". Using the default prefixes.')
+            records = []
+        self._guilds = {record['guild_id']: self._matcher(record['prefixes']) for record in records}
+
+    def get(self, guild: Optional[discord.abc.Snowflake]) -> PrefixMatcher:
+        if guild is None:
+            return self.default
+        return self._guilds.get(guild.id, self.default)
+
+    def match(self, message: discord.Message) -> Optional[str]:
+        return self.get(message.guild).match(message.content)
+
+    async def set(self, con: Union[asyncpg.Pool, asyncpg.Connection], guild_id: int, prefixes: Iterable[str]) -> PrefixMatcher:
+        prefixes = list(dict.fromkeys(prefixes))
+        if not prefixes:
+            raise ValueError('at least one prefix is required')
+        if len(prefixes) > MAX_PREFIXES:
+            raise ValueError(f'a guild can have at most {MAX_PREFIXES} prefixes')
+        for prefix in prefixes:
+            if not prefix.strip() or len(prefix) > MAX_PREFIX_LENGTH:
+                raise ValueError(f'prefixes must be 1 to {MAX_PREFIX_LENGTH} characters and not only whitespace')
+
+        await registry.fetchval(con, PREFIX_SET, guild_id, prefixes)
+        matcher = self._guilds[guild_id] = self._matcher(prefixes)
+        return matcher
+
+    async def reset(self, con: Union[asyncpg.Pool, asyncpg.Connection], guild_id: int) -> None:
+        await registry.fetchval(con, PREFIX_DELETE, guild_id)
+        self._guilds.pop(guild_id, None)
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Any, Optional, Union
+
+import asyncpg
+
+if TYPE_CHECKING:
+    from asyncpg.prepared_stmt import PreparedStatement
+
+__all__ = (
+    'Query',
+    'QueryRegistry',
+    'PreparedConnection',
+    'registry',
+)
+
+_log = logging.getLogger(__name__)
+
+
+class PreparedConnection(asyncpg.Connection):
+    """A connection that keeps its prepared statements around by query name."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.prepared: dict[str, PreparedStatement] = {}
+
+
+class Query:
+    __slots__ = ('name', 'sql')
+
+    def __init__(self, name: str, sql: str) -> None:
+        self.name: str = name
+        self.sql: str = sql
+
+    def __repr__(self) -> str:
+        return f'<Query name={self.name!r}>'
+
+
+class QueryRegistry:
+    """SQL prepared once per connection, by name.
+
+    Every feature registers its queries in its own module, next to the code
+    that runs them, e.g. :mod:`utils.tag_queries`. Queries registered by the
+    time the pool opens a connection are prepared then (see
+    :func:`utils.db.init_connection`), the rest on first use.
+
+    The ``fetch`` family accepts either a pool or a connection, so callers
+    can keep passing ``ctx.db`` around. Only a :class:`PreparedConnection`
+    keeps the statements, on any other connection the query goes through
+    asyncpg's statement cache.
+    """
+
+    def __init__(self) -> None:
+        self._queries: dict[str, Query] = {}
+
+    def __iter__(self):
+        return iter(self._queries.values())
+
+    def __len__(self) -> int:
+        return len(self._queries)
+
+    def add(self, name: str, sql: str) -> Query:
+        if name in self._queries:
+            raise ValueError(f'query {name!r} is already registered')
+
+        query = Query(name, sql)
+        self._queries[name] = query
+        return query
+
+    async def prepare_all(self, con: asyncpg.Connection) -> None:
+        prepared = getattr(con, 'prepared', None)
+        if prepared is None:
+            return
+
+        for query in self._queries.values():
+            try:
+                prepared[query.name] = await con.prepare(query.sql)
+            except asyncpg.PostgresError as e:
+                # e.g. the schema hasn't been migrated yet, try again on first use
+                _log.warning('Could not prepare query %r: %s', query.name, e)
+
+    @staticmethod
+    async def _execute(con: asyncpg.Connection, query: Query, method: str, args: tuple) -> Any:
+        prepared: Optional[dict[str, PreparedStatement]] = getattr(con, 'prepared', None)
+        if prepared is None:
+            # a plain connection, con.fetch() goes through asyncpg's statement cache, prepare() doesn't
+            return await getattr(con, method)(query.sql, *args)
+
+        try:
+            statement = prepared[query.name]
+        except KeyError:
+            statement = prepared[query.name] = await con.prepare(query.sql)
+        return await getattr(statement, method)(*args)
+
+    async def _run(self, con: Union[asyncpg.Pool, asyncpg.Connection], query: Query, method: str, args: tuple) -> Any:
+        if isinstance(con, asyncpg.Pool):
+            async with con.acquire() as connection:
+                return await self._execute(connection, query, method, args)
+
+        return await self._execute(con, query, method, args)
+
+    async def fetch(self, con: Union[asyncpg.Pool, asyncpg.Connection], query: Query, *args: Any) -> list[asyncpg.Record]:
+        return await self._run(con, query, 'fetch', args)
+
+    async def fetchrow(self, con: Union[asyncpg.Pool, asyncpg.Connection], query: Query, *args: Any) -> Optional[asyncpg.Record]:
+        return await self._run(con, query, 'fetchrow', args)
+
+    async def fetchval(self, con: Union[asyncpg.Pool, asyncpg.Connection], query: Query, *args: Any) -> Any:
+        return await self._run(con, query, 'fetchval', args)
+
+
+registry = QueryRegistry()
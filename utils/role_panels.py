@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import logging
+from typing import Iterator, Optional, Union
+
+import asyncpg
+import discord
+from discord import ui
+
+from utils.queries import registry
+from utils.views import RoleID
+
+__all__ = (
+    'MAX_BUTTONS',
+    'DANGEROUS_PERMISSIONS',
+    'dangerous_permissions',
+    'RoleButton',
+    'RolePanel',
+    'RolePanelView',
+    'RolePanelRegistry',
+)
+
+_log = logging.getLogger(__name__)
+
+# 5 rows of 5 buttons
+MAX_BUTTONS = 25
+
+# anyone can click a panel button, so these are never handed out through one
+DANGEROUS_PERMISSIONS = discord.Permissions(
+    administrator=True,
+    manage_guild=True,
+    manage_roles=True,
+    manage_channels=True,
+    manage_webhooks=True,
+    manage_messages=True,
+    manage_threads=True,
+    manage_nicknames=True,
+    manage_expressions=True,
+    manage_events=True,
+    kick_members=True,
+    ban_members=True,
+    moderate_members=True,
+    mention_everyone=True,
+    view_audit_log=True,
+)
+
+
+# ---------- Queries ---------- #
+
+ROLE_PANEL_ALL = registry.add(
+    'role_panel_all',
+    """SELECT id, guild_id, name, description, channel_id, message_id FROM rucs_role_panels;""",
+)
+
+ROLE_BUTTON_ALL = registry.add(
+    'role_button_all',
+    """SELECT custom_id, panel_id, role_id, label, emoji FROM rucs_role_buttons ORDER BY panel_id, position;""",
+)
+
+ROLE_PANEL_CREATE = registry.add(
+    'role_panel_create',
+    """INSERT INTO rucs_role_panels(guild_id, name, description) VALUES ($1, $2, $3) RETURNING id;""",
+)
+
+ROLE_PANEL_POSTED = registry.add(
+    'role_panel_posted',
+    """UPDATE rucs_role_panels SET channel_id=$2, message_id=$3 WHERE id=$1;""",
+)
+
+ROLE_PANEL_DELETE = registry.add(
+    'role_panel_delete',
+    """DELETE FROM rucs_role_panels WHERE id=$1;""",
+)
+
+ROLE_BUTTON_ADD = registry.add(
+    'role_button_add',
+    """INSERT INTO rucs_role_buttons(custom_id, panel_id, role_id, label, emoji, position)
+       VALUES ($1, $2, $3, $4, $5, $6);
+    """,
+)
+
+ROLE_BUTTON_REMOVE = registry.add(
+    'role_button_remove',
+    """DELETE FROM rucs_role_buttons WHERE panel_id=$1 AND role_id=$2;""",
+)
+
+
+def dangerous_permissions(role: discord.Role) -> list[str]:
+    """The names of the permissions in :data:`DANGEROUS_PERMISSIONS` that ``role`` has."""
+    return [name for name, value in role.permissions & DANGEROUS_PERMISSIONS if value]
+
+
+class RoleButton:
+    __slots__ = ('custom_id', 'panel_id', 'role_id', 'label', 'emoji')
+
+    def __init__(self, custom_id: str, panel_id: int, role_id: int, label: str, emoji: Optional[str] = None) -> None:
+        self.custom_id: str = custom_id
+        self.panel_id: int = panel_id
+        self.role_id: int = role_id
+        self.label: str = label
+        self.emoji: Optional[str] = emoji
+
+    def __repr__(self) -> str:
+        return f'<RoleButton custom_id={self.custom_id!r} role_id={self.role_id}>'
+
+
+class RolePanel:
+    """A message of role buttons. Panel ``0`` is the built-in one and isn't stored."""
+
+    __slots__ = ('id', 'guild_id', 'name', 'description', 'channel_id', 'message_id', 'buttons')
+
+    def __init__(
+            self,
+            id: int,
+            guild_id: Optional[int],
+            name: str,
+            description: Optional[str] = None,
+            channel_id: Optional[int] = None,
+            message_id: Optional[int] = None,
+    ) -> None:
+        self.id: int = id
+        self.guild_id: Optional[int] = guild_id
+        self.name: str = name
+        self.description: Optional[str] = description
+        self.channel_id: Optional[int] = channel_id
+        self.message_id: Optional[int] = message_id
+        self.buttons: list[RoleButton] = []
+
+    def __repr__(self) -> str:
+        return f'<RolePanel id={self.id} name={self.name!r} buttons={len(self.buttons)}>'
+
+    def view(self) -> RolePanelView:
+        return RolePanelView(self)
+
+
+class _RoleButtonItem(ui.Button['RolePanelView']):
+    async def callback(self, interaction: discord.Interaction) -> None:
+        # look the button up again, it may have been removed since the view was built
+        button = interaction.client.role_panels.get(self.custom_id)
+        if button is None:
+            return await interaction.response.send_message('ปุ่มนี้ถูกนำออกแล้ว', ephemeral=True)
+
+        # the role may have been given more permissions since the button was added
+        role = interaction.guild.get_role(button.role_id) if interaction.guild is not None else None
+        if role is not None and dangerous_permissions(role):
+            return await interaction.response.send_message('ยศนี้ไม่สามารถรับผ่านปุ่มได้', ephemeral=True)
+
+        # the edit itself goes through the bot's role queue, so a burst of clicks
+        # gets answered right away and only the net change per member is sent
+        added = interaction.client.role_queue.toggle(interaction.user, button.role_id, interaction=interaction)
+        if added:
+            content = f'{interaction.user.mention} ได้รับยศ <@&{button.role_id}>'
+        else:
+            content = f'{interaction.user.mention} ถูกนำยศ <@&{button.role_id}> ออก'
+        await interaction.response.send_message(
+            content,
+            ephemeral=True,
+            allowed_mentions=discord.AllowedMentions(users=False, roles=False)
+        )
+
+
+class RolePanelView(ui.View):
+    def __init__(self, panel: RolePanel):
+        super().__init__(timeout=None)
+        for button in panel.buttons:
+            self.add_item(_RoleButtonItem(
+                label=button.label,
+                emoji=button.emoji,
+                style=discord.ButtonStyle.blurple,
+                custom_id=button.custom_id,
+            ))
+
+
+def _default_panel() -> RolePanel:
+    # the custom IDs of the panel that was hard-coded before, already posted messages keep working
+    panel = RolePanel(0, None, 'ru_cs', 'สวัสดีครับเพื่อน ๆ RU CS ทุกท่าน')
+    panel.buttons = [
+        RoleButton('persistent_view:ru_cs_teacher', 0, RoleID.teacher.value, 'อาจารย์', '👩‍🏫'),
+        RoleButton('persistent_view:ru_cs_64', 0, RoleID.student.value, 'นักศึกษา', '👩‍🎓'),
+        RoleButton('persistent_view:ru_cs_other', 0, RoleID.other.value, 'อื่นๆ', '<:member:904565339835232276>'),
+    ]
+    return panel
+
+
+class RolePanelRegistry:
+    """Role button panels stored in ``rucs_role_panels`` and ``rucs_role_buttons``.
+
+    Everything is loaded at startup into a map from custom ID to button, so a
+    click costs a dict lookup. Every panel is registered as a persistent view,
+    see :meth:`views`.
+    """
+
+    def __init__(self) -> None:
+        self.default: RolePanel = _default_panel()
+        self.panels: dict[int, RolePanel] = {}
+        self._buttons: dict[str, RoleButton] = {}
+        self._add(self.default)
+
+    def _add(self, panel: RolePanel) -> None:
+        self.panels[panel.id] = panel
+        for button in panel.buttons:
+            self._buttons[button.custom_id] = button
+
+    async def setup(self, pool: asyncpg.Pool) -> None:
+        try:
+            panels = await registry.fetch(pool, ROLE_PANEL_ALL)
+            buttons = await registry.fetch(pool, ROLE_BUTTON_ALL)
+        except asyncpg.UndefinedTableError:
+            _log.warning('rucs_role_panels does not exist, run "launcher.py db upgrade". Only the built-in panel is available.')
+            return
+
+        loaded = {record['id']: RolePanel(**record) for record in panels}
+        for record in buttons:
+            loaded[record['panel_id']].buttons.append(RoleButton(**record))
+        for panel in loaded.values():
+            self._add(panel)
+
+    def get(self, custom_id: str) -> Optional[RoleButton]:
+        return self._buttons.get(custom_id)
+
+    def views(self) -> Iterator[RolePanelView]:
+        for panel in self.panels.values():
+            if panel.buttons:
+                yield panel.view()
+
+    def guild_panels(self, guild_id: int) -> list[RolePanel]:
+        return [panel for panel in self.panels.values() if panel.guild_id == guild_id]
+
+    def find(self, guild_id: int, name: str) -> Optional[RolePanel]:
+        return next((panel for panel in self.guild_panels(guild_id) if panel.name == name), None)
+
+    async def create(
+            self,
+            con: Union[asyncpg.Pool, asyncpg.Connection],
+            guild_id: int,
+            name: str,
+            description: Optional[str] = None,
+    ) -> RolePanel:
+        if self.find(guild_id, name) is not None:
+            raise ValueError(f'a panel named {name!r} already exists')
+
+        panel_id = await registry.fetchval(con, ROLE_PANEL_CREATE, guild_id, name, description)
+        panel = RolePanel(panel_id, guild_id, name, description)
+        self._add(panel)
+        return panel
+
+    async def add_button(
+            self,
+            con: Union[asyncpg.Pool, asyncpg.Connection],
+            panel: RolePanel,
+            role_id: int,
+            label: str,
+            emoji: Optional[str] = None,
+    ) -> RoleButton:
+        if len(panel.buttons) >= MAX_BUTTONS:
+            raise ValueError(f'a panel can have at most {MAX_BUTTONS} buttons')
+        if any(button.role_id == role_id for button in panel.buttons):
+            raise ValueError('that role already has a button on this panel')
+
+        button = RoleButton(f'role_panel:{panel.id}:{role_id}', panel.id, role_id, label, emoji)
+        await registry.fetchval(con, ROLE_BUTTON_ADD, button.custom_id, panel.id, role_id, label, emoji, len(panel.buttons))
+        panel.buttons.append(button)
+        self._buttons[button.custom_id] = button
+        return button
+
+    async def remove_button(self, con: Union[asyncpg.Pool, asyncpg.Connection], panel: RolePanel, role_id: int) -> None:
+        button = next((button for button in panel.buttons if button.role_id == role_id), None)
+        if button is None:
+            raise ValueError('that role has no button on this panel')
+
+        await registry.fetchval(con, ROLE_BUTTON_REMOVE, panel.id, role_id)
+        panel.buttons.remove(button)
+        del self._buttons[button.custom_id]
+
+    async def posted(self, con: Union[asyncpg.Pool, asyncpg.Connection], panel: RolePanel, message: discord.Message) -> None:
+        await registry.fetchval(con, ROLE_PANEL_POSTED, panel.id, message.channel.id, message.id)
+        panel.channel_id = message.channel.id
+        panel.message_id = message.id
+
+    async def delete(self, con: Union[asyncpg.Pool, asyncpg.Connection], panel: RolePanel) -> None:
+        await registry.fetchval(con, ROLE_PANEL_DELETE, panel.id)
+        del self.panels[panel.id]
+        for button in panel.buttons:
+            self._buttons.pop(button.custom_id, None)
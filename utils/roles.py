@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import TYPE_CHECKING, Any, Optional, Protocol
+
+import discord
+
+if TYPE_CHECKING:
+    from discord.abc import Snowflake
+
+__all__ = (
+    'RateLimitBucket',
+    'RoleAssignmentQueue',
+)
+
+_log = logging.getLogger(__name__)
+
+
+class _RoleHTTP(Protocol):
+    async def edit_member(self, guild_id: Snowflake, user_id: Snowflake, *, reason: Optional[str] = None, **fields: Any) -> Any:
+        ...
+
+
+class RateLimitBucket:
+    """Allows ``rate`` acquisitions in any ``per`` second window.
+
+    Discord counts requests per reset window rather than refilling tokens
+    gradually, so a sliding window never sends more than the bucket allows,
+    which a token bucket with a full burst could.
+    """
+
+    def __init__(self, rate: int, per: float) -> None:
+        self.rate: int = rate
+        self.per: float = per
+        self._sent: deque[float] = deque()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                while self._sent and now - self._sent[0] >= self.per:
+                    self._sent.popleft()
+                if len(self._sent) < self.rate:
+                    self._sent.append(now)
+                    return
+                await asyncio.sleep(self.per - (now - self._sent[0]))
+
+
+class _Pending:
+    __slots__ = ('guild_id', 'member_id', 'member', 'base', 'add', 'remove', 'first', 'due', 'interaction')
+
+    def __init__(self, member: discord.Member, now: float) -> None:
+        self.guild_id: int = member.guild.id
+        self.member_id: int = member.id
+        # the member as of the latest click, its roles are the base of the edit
+        self.member: discord.Member = member
+        # the roles of an edit that was in flight at the latest click, newer than the member's
+        self.base: Optional[set[int]] = None
+        # the net change, only roles that differ from what the member has
+        self.add: set[int] = set()
+        self.remove: set[int] = set()
+        self.first: float = now
+        self.due: float = now
+        self.interaction: Optional[discord.Interaction] = None
+
+    def roles(self) -> set[int]:
+        """The member's roles once the change is applied."""
+        current = self.base
+        if current is None:
+            # the default role is implied, Discord rejects it in the list
+            current = {role.id for role in self.member.roles if role.id != self.guild_id}
+        return (current | self.add) - self.remove
+
+
+class RoleAssignmentQueue:
+    """Coalesces role toggles into one member edit per member, paced per guild.
+
+    :meth:`toggle` only records the change and returns straight away, so the
+    button can be acknowledged immediately. Changes for the same member are
+    debounced for ``debounce`` seconds, but never held longer than ``max_delay``
+    after the first click, and clicks that cancel each other out are dropped.
+    What's left is sent as a single member edit, the member's roles as of the
+    latest click with the net change applied, however many roles it touches.
+
+    Every guild drains on its own through a :class:`RateLimitBucket` of
+    ``rate`` edits per ``per`` seconds with at most ``concurrency`` in flight,
+    so a burst in one guild queues up there instead of hitting the rate limit
+    or holding up the others.
+    """
+
+    def __init__(
+            self,
+            http: _RoleHTTP,
+            *,
+            debounce: float = 2.0,
+            max_delay: float = 10.0,
+            rate: int = 10,
+            per: float = 10.0,
+            concurrency: int = 4,
+            reason: Optional[str] = 'Role panel',
+    ) -> None:
+        self.http: _RoleHTTP = http
+        self.debounce: float = debounce
+        self.max_delay: float = max_delay
+        self.rate: int = rate
+        self.per: float = per
+        self.concurrency: int = concurrency
+        self.reason: Optional[str] = reason
+        self.edits: int = 0
+        self.failures: int = 0
+        self.skipped: int = 0
+        self._pending: dict[tuple[int, int], _Pending] = {}
+        # members whose edit is due, waiting for their guild's bucket
+        self._ready: dict[int, deque[tuple[int, int]]] = {}
+        self._queued: set[tuple[int, int]] = set()
+        # (guild, member) -> the roles being sent, for edits that left the queue but haven't finished
+        self._applying: dict[tuple[int, int], set[int]] = {}
+        self._buckets: dict[int, RateLimitBucket] = {}
+        self._semaphores: dict[int, asyncio.Semaphore] = {}
+        self._drainers: dict[int, asyncio.Task[None]] = {}
+        self._inflight: set[asyncio.Task[None]] = set()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task[None]] = None
+
+    @classmethod
+    def from_env(cls, http: _RoleHTTP) -> RoleAssignmentQueue:
+        """Reads ``ROLE_DEBOUNCE``, ``ROLE_MAX_DELAY``, ``ROLE_EDIT_RATE`` and ``ROLE_EDIT_PER``."""
+        return cls(
+            http,
+            debounce=float(os.getenv('ROLE_DEBOUNCE', 2.0)),
+            max_delay=float(os.getenv('ROLE_MAX_DELAY', 10.0)),
+            rate=int(os.getenv('ROLE_EDIT_RATE', 10)),
+            per=float(os.getenv('ROLE_EDIT_PER', 10.0)),
+        )
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self, *, timeout: float = 5.0) -> None:
+        """Sends what's still pending, then stops.
+
+        Edits that can't be sent within ``timeout`` seconds are dropped and
+        the members who clicked are told so.
+        """
+        if self._task is not None and self._pending:
+            now = time.monotonic()
+            for pending in self._pending.values():
+                pending.due = now
+            self._wakeup.set()
+            try:
+                await asyncio.wait_for(self.join(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+        for task in (self._task, *self._drainers.values()):
+            if task is not None:
+                task.cancel()
+        self._task = None
+        self._drainers.clear()
+        self._ready.clear()
+        self._queued.clear()
+
+        dropped, self._pending = list(self._pending.values()), {}
+        if dropped:
+            _log.warning('Dropping %d pending role edits', len(dropped))
+            await asyncio.gather(*(self._apologise(pending) for pending in dropped))
+
+    async def join(self) -> None:
+        """Waits until everything queued so far has been sent."""
+        while self._pending or self._applying or self._inflight:
+            await asyncio.sleep(0.05)
+
+    def toggle(self, member: discord.Member, role_id: int, *, interaction: Optional[discord.Interaction] = None) -> bool:
+        """Queues adding ``role_id`` if the member doesn't have it, removing it otherwise.
+
+        Returns ``True`` if the role will be added.
+        """
+        key = (member.guild.id, member.id)
+        now = time.monotonic()
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = _Pending(member, now)
+        else:
+            pending.member = member
+
+        # the member's roles, unless an edit for them is still on its way
+        applying = self._applying.get(key)
+        pending.base = None if applying is None else set(applying)
+        if applying is not None:
+            current = role_id in applying
+        else:
+            current = any(role.id == role_id for role in member.roles)
+
+        if role_id in pending.add or (current and role_id not in pending.remove):
+            pending.add.discard(role_id)
+            if current:
+                pending.remove.add(role_id)
+            added = False
+        else:
+            pending.remove.discard(role_id)
+            if not current:
+                pending.add.add(role_id)
+            added = True
+
+        pending.due = min(now + self.debounce, pending.first + self.max_delay)
+        if interaction is not None:
+            pending.interaction = interaction
+        self._wakeup.set()
+        return added
+
+    def _bucket(self, guild_id: int) -> RateLimitBucket:
+        try:
+            return self._buckets[guild_id]
+        except KeyError:
+            bucket = self._buckets[guild_id] = RateLimitBucket(self.rate, self.per)
+            return bucket
+
+    def _semaphore(self, guild_id: int) -> asyncio.Semaphore:
+        try:
+            return self._semaphores[guild_id]
+        except KeyError:
+            semaphore = self._semaphores[guild_id] = asyncio.Semaphore(self.concurrency)
+            return semaphore
+
+    async def _run(self) -> None:
+        while True:
+            # a member with an edit in flight waits for it, its roles are the base of the next one
+            waiting = [
+                pending for key, pending in self._pending.items()
+                if key not in self._queued and key not in self._applying
+            ]
+            if not waiting:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            now = time.monotonic()
+            due = [pending for pending in waiting if pending.due <= now]
+            if not due:
+                # a new click may come due sooner, or push this one back
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=min(p.due for p in waiting) - now)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            for pending in sorted(due, key=lambda p: p.due):
+                key = (pending.guild_id, pending.member_id)
+                self._queued.add(key)
+                self._ready.setdefault(pending.guild_id, deque()).append(key)
+                drainer = self._drainers.get(pending.guild_id)
+                if drainer is None or drainer.done():
+                    self._drainers[pending.guild_id] = asyncio.create_task(self._drain(pending.guild_id))
+
+    async def _drain(self, guild_id: int) -> None:
+        bucket = self._bucket(guild_id)
+        semaphore = self._semaphore(guild_id)
+        ready = self._ready[guild_id]
+        while ready:
+            # the token last, so the edit goes out in the window it was counted in
+            await semaphore.acquire()
+            await bucket.acquire()
+
+            key = ready.popleft()
+            self._queued.discard(key)
+            # clicks that came in while this waited for a token are in it too
+            pending = self._pending.pop(key)
+            roles = pending.roles()
+            if not pending.add and not pending.remove:
+                # toggled back to where it started
+                self.skipped += 1
+                semaphore.release()
+                continue
+
+            self._applying[key] = roles
+            task = asyncio.create_task(self._send(pending, roles, semaphore))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+        del self._ready[guild_id]
+
+    async def _send(self, pending: _Pending, roles: set[int], semaphore: asyncio.Semaphore) -> None:
+        key = (pending.guild_id, pending.member_id)
+        try:
+            await self.http.edit_member(pending.guild_id, pending.member_id, roles=list(roles), reason=self.reason)
+            self.edits += 1
+        except discord.HTTPException as e:
+            self.failures += 1
+            _log.warning('Could not edit the roles of member %s in guild %s: %s', pending.member_id, pending.guild_id, e)
+            await self._apologise(pending)
+        finally:
+            del self._applying[key]
+            semaphore.release()
+            # the member may have clicked again meanwhile
+            self._wakeup.set()
+
+    @staticmethod
+    async def _apologise(pending: _Pending) -> None:
+        if pending.interaction is not None and not pending.interaction.is_expired():
+            try:
+                await pending.interaction.followup.send('ไม่สามารถเปลี่ยนยศได้ กรุณาลองใหม่อีกครั้ง', ephemeral=True)
+            except discord.HTTPException:
+                pass
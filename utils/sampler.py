@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import gc
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import TYPE_CHECKING, Optional, Sequence
+
+from utils.lazy import lazy_import
+
+if TYPE_CHECKING:
+    import psutil
+
+    from utils.stats import LatencyHistogram
+else:
+    psutil = lazy_import('psutil')
+
+__all__ = (
+    'Snapshot',
+    'ProcessSampler',
+    'sparkline',
+)
+
+_log = logging.getLogger(__name__)
+
+_SPARK_BLOCKS = '▁▂▃▄▅▆▇█'
+
+
+def sparkline(values: Sequence[float], *, width: int = 12) -> str:
+    """Renders the last ``width`` values as a unicode sparkline."""
+    values = list(values)[-width:]
+    if not values:
+        return ''
+
+    low, high = min(values), max(values)
+    if high == low:
+        return _SPARK_BLOCKS[0] * len(values)
+
+    scale = (len(_SPARK_BLOCKS) - 1) / (high - low)
+    return ''.join(_SPARK_BLOCKS[round((v - low) * scale)] for v in values)
+
+
+class Snapshot:
+    __slots__ = (
+        'timestamp',
+        'cpu_percent',
+        'system_cpu_percent',
+        'rss',
+        'vms',
+        'uss',
+        'threads',
+        'loop_lag',
+        'gc_counts',
+        'gc_collections',
+    )
+
+    def __init__(
+            self,
+            *,
+            timestamp: float,
+            cpu_percent: float,
+            system_cpu_percent: float,
+            rss: int,
+            vms: int,
+            uss: Optional[int],
+            threads: int,
+            loop_lag: float,
+            gc_counts: tuple[int, int, int],
+            gc_collections: int,
+    ) -> None:
+        self.timestamp: float = timestamp
+        self.cpu_percent: float = cpu_percent
+        self.system_cpu_percent: float = system_cpu_percent
+        self.rss: int = rss
+        self.vms: int = vms
+        self.uss: Optional[int] = uss
+        self.threads: int = threads
+        self.loop_lag: float = loop_lag
+        self.gc_counts: tuple[int, int, int] = gc_counts
+        self.gc_collections: int = gc_collections
+
+    @property
+    def memory(self) -> int:
+        """USS if it could be read, otherwise RSS."""
+        return self.uss if self.uss is not None else self.rss
+
+
+class ProcessSampler:
+    """Samples process and host metrics in the background into a ring buffer.
+
+    Commands read :attr:`latest` instead of calling psutil themselves, since
+    ``memory_full_info`` has to read ``/proc/self/smaps`` and is slow.
+    Sampling runs in a thread every ``interval`` seconds. Event loop lag isn't
+    measured here, each sample takes the mean lag that ``loop_lag`` (the
+    histogram a :class:`~utils.stats.LoopLagMonitor` fills) saw since the last one.
+    """
+
+    def __init__(self, *, loop_lag: Optional[LatencyHistogram] = None, interval: float = 10.0, history: int = 360) -> None:
+        self.loop_lag: Optional[LatencyHistogram] = loop_lag
+        self.interval: float = interval
+        self.samples: deque[Snapshot] = deque(maxlen=history)
+        # psutil is imported by the first sample, off the event loop
+        self._process: Optional[psutil.Process] = None
+        self.pid: int = os.getpid()
+        self._task: Optional[asyncio.Task[None]] = None
+        # the histogram's count and total at the last sample
+        self._lag_seen: tuple[int, float] = (0, 0.0)
+
+    @property
+    def process(self) -> psutil.Process:
+        if self._process is None:
+            self._process = psutil.Process(self.pid)
+        return self._process
+
+    @property
+    def name(self) -> str:
+        return self.process.name()
+
+    @property
+    def latest(self) -> Optional[Snapshot]:
+        return self.samples[-1] if self.samples else None
+
+    def series(self, attribute: str) -> list[float]:
+        return [getattr(sample, attribute) for sample in self.samples]
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _lag(self) -> float:
+        histogram = self.loop_lag
+        if histogram is None:
+            return 0.0
+
+        count, total = self._lag_seen
+        if histogram.count < count:
+            # the histogram was reset in between
+            count, total = 0, 0.0
+        self._lag_seen = (histogram.count, histogram.total)
+        observed = histogram.count - count
+        return (histogram.total - total) / observed if observed else 0.0
+
+    def _collect(self, loop_lag: float) -> Snapshot:
+        process = self.process
+        with process.oneshot():
+            cpu_percent = process.cpu_percent(None)
+            try:
+                memory = process.memory_full_info()
+                uss = memory.uss
+            except psutil.AccessDenied:
+                memory = process.memory_info()
+                uss = None
+            threads = process.num_threads()
+
+        return Snapshot(
+            timestamp=time.time(),
+            cpu_percent=cpu_percent,
+            system_cpu_percent=psutil.cpu_percent(None),
+            rss=memory.rss,
+            vms=memory.vms,
+            uss=uss,
+            threads=threads,
+            loop_lag=loop_lag,
+            gc_counts=gc.get_count(),
+            gc_collections=sum(stat['collections'] for stat in gc.get_stats()),
+        )
+
+    async def _run(self) -> None:
+        # the first cpu_percent call only sets the baseline
+        self.samples.append(await asyncio.to_thread(self._collect, self._lag()))
+
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                # read on the loop, the monitor writes to the histogram there
+                self.samples.append(await asyncio.to_thread(self._collect, self._lag()))
+            except psutil.Error:
+                _log.exception('Could not sample process metrics')
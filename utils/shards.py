@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import time
+from typing import Iterable, Optional
+
+__all__ = (
+    'EventRate',
+    'ShardStats',
+    'ShardMetrics',
+)
+
+
+class EventRate:
+    """Counts events in fixed time buckets over a sliding window.
+
+    Memory is a handful of integers per counter no matter how busy the shard is.
+    """
+
+    __slots__ = ('total', 'window', 'width', '_counts', '_stamps')
+
+    def __init__(self, *, window: float = 60.0, buckets: int = 12) -> None:
+        self.total: int = 0
+        self.window: float = window
+        self.width: float = window / buckets
+        self._counts: list[int] = [0] * buckets
+        # which time slot each bucket currently holds
+        self._stamps: list[int] = [-1] * buckets
+
+    def hit(self, now: Optional[float] = None) -> None:
+        slot = int((time.monotonic() if now is None else now) // self.width)
+        index = slot % len(self._counts)
+        if self._stamps[index] != slot:
+            self._stamps[index] = slot
+            self._counts[index] = 0
+        self._counts[index] += 1
+        self.total += 1
+
+    def per_minute(self, now: Optional[float] = None) -> float:
+        slot = int((time.monotonic() if now is None else now) // self.width)
+        oldest = slot - len(self._counts) + 1
+        count = sum(c for c, s in zip(self._counts, self._stamps) if s >= oldest)
+        return count * 60.0 / self.window
+
+
+class ShardStats:
+    __slots__ = (
+        'shard_id',
+        'connects',
+        'disconnects',
+        'resumes',
+        'last_connect',
+        'last_disconnect',
+        'messages',
+        'interactions',
+    )
+
+    def __init__(self, shard_id: int) -> None:
+        self.shard_id: int = shard_id
+        self.connects: int = 0
+        self.disconnects: int = 0
+        self.resumes: int = 0
+        self.last_connect: Optional[float] = None
+        self.last_disconnect: Optional[float] = None
+        self.messages: EventRate = EventRate()
+        self.interactions: EventRate = EventRate()
+
+    @property
+    def connected(self) -> bool:
+        if self.last_connect is None:
+            return False
+        return self.last_disconnect is None or self.last_connect >= self.last_disconnect
+
+
+class ShardMetrics:
+    """Connection history and event rates per shard, fed by the gateway listeners."""
+
+    def __init__(self) -> None:
+        self.shards: dict[int, ShardStats] = {}
+
+    def get(self, shard_id: Optional[int]) -> ShardStats:
+        # DMs have no guild, those events arrive on shard 0
+        shard_id = shard_id or 0
+        try:
+            return self.shards[shard_id]
+        except KeyError:
+            stats = self.shards[shard_id] = ShardStats(shard_id)
+            return stats
+
+    def connected(self, shard_id: int) -> None:
+        stats = self.get(shard_id)
+        stats.connects += 1
+        stats.last_connect = time.time()
+
+    def disconnected(self, shard_id: int) -> None:
+        stats = self.get(shard_id)
+        stats.disconnects += 1
+        stats.last_disconnect = time.time()
+
+    def resumed(self, shard_id: int) -> None:
+        stats = self.get(shard_id)
+        stats.resumes += 1
+        stats.last_connect = time.time()
+
+    def prometheus(self, latencies: Iterable[tuple[int, float]]) -> str:
+        """Per shard series in the Prometheus text format, labelled by shard."""
+        latencies = dict(latencies)
+        shard_ids = sorted(set(self.shards) | set(latencies))
+        series = (
+            ('rucs_shard_latency_seconds', 'gauge', 'Gateway heartbeat latency.',
+             lambda s: latencies.get(s.shard_id, float('nan'))),
+            ('rucs_shard_connected', 'gauge', 'Whether the shard is connected.', lambda s: int(s.connected)),
+            ('rucs_shard_disconnects_total', 'counter', 'Gateway disconnects.', lambda s: s.disconnects),
+            ('rucs_shard_resumes_total', 'counter', 'Gateway session resumes.', lambda s: s.resumes),
+            ('rucs_shard_messages_total', 'counter', 'Messages received.', lambda s: s.messages.total),
+            ('rucs_shard_interactions_total', 'counter', 'Interactions received.', lambda s: s.interactions.total),
+        )
+
+        lines = []
+        for name, kind, description, value in series:
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} {kind}')
+            for shard_id in shard_ids:
+                lines.append(f'{name}{{shard="{shard_id}"}} {value(self.get(shard_id))}')
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import sys
+import time
+import asyncio
+import logging
+import importlib
+import contextlib
+import subprocess
+from typing import Iterable, Iterator, Optional
+
+__all__ = (
+    'StartupTimings',
+    'warm_imports',
+    'parse_importtime',
+    'measure_imports',
+)
+
+_log = logging.getLogger(__name__)
+
+
+class StartupTimings:
+    """Ordered record of how long each startup step took."""
+
+    def __init__(self) -> None:
+        self.created_at: float = time.perf_counter()
+        self.steps: dict[str, float] = {}
+        self.ready_after: Optional[float] = None
+
+    @contextlib.contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps[name] = time.perf_counter() - start
+
+    def mark_ready(self) -> None:
+        if self.ready_after is None:
+            self.ready_after = time.perf_counter() - self.created_at
+
+    def format(self) -> str:
+        width = max((len(name) for name in self.steps), default=0)
+        lines = [f'{name:<{width}} : {seconds * 1000:8.1f} ms' for name, seconds in self.steps.items()]
+        if self.ready_after is not None:
+            lines.append(f'{"ready":<{width}} : {self.ready_after * 1000:8.1f} ms')
+        return '\n'.join(lines)
+
+
+def _import(name: str) -> float:
+    start = time.perf_counter()
+    importlib.import_module(name)
+    return time.perf_counter() - start
+
+
+async def warm_imports(names: Iterable[str]) -> dict[str, float]:
+    """Imports modules concurrently in worker threads and returns how long each took.
+
+    Meant for the third-party packages extensions depend on. They end up in
+    :data:`sys.modules`, so the extension's own import of them is free once it's
+    loaded on the event loop. Don't pass extension modules: ``load_extension``
+    executes them again from their spec instead of reusing :data:`sys.modules`.
+    Failures are ignored here and surface from ``load_extension``.
+    """
+    names = list(names)
+    results = await asyncio.gather(*(asyncio.to_thread(_import, name) for name in names), return_exceptions=True)
+
+    timings = {}
+    for name, result in zip(names, results):
+        if isinstance(result, BaseException):
+            _log.debug('Could not pre-import %s', name, exc_info=result)
+        else:
+            timings[name] = result
+    return timings
+
+
+def parse_importtime(output: str) -> dict[str, tuple[int, int]]:
+    """Parses ``python -X importtime`` stderr into ``{module: (self_us, cumulative_us)}``."""
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+            modules[name.strip()] = (int(self_us), int(cumulative_us))
+        except ValueError:
+            # the header line
+            continue
+    return modules
+
+
+def measure_imports(module: str, *, cwd: Optional[str] = None) -> dict[str, tuple[int, int]]:
+    """Imports ``module`` in a fresh interpreter under ``-X importtime``."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr)
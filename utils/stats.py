@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import os
+import time
+import asyncio
+import logging
+import tempfile
+from bisect import bisect_left
+from collections import Counter
+from typing import Callable, Iterable, Optional
+
+from aiohttp import web
+
+__all__ = (
+    'LatencyHistogram',
+    'CommandStats',
+    'LoopLagMonitor',
+    'MetricsExporter',
+)
+
+_log = logging.getLogger(__name__)
+
+# upper bounds in seconds, 0.5ms doubling up to ~65s
+BUCKETS: tuple[float, ...] = tuple(0.0005 * 2 ** i for i in range(18))
+
+
+class LatencyHistogram:
+    """A fixed bucket latency histogram.
+
+    Recording is a binary search and an increment, and quantiles are
+    interpolated within the matching bucket, so memory stays constant
+    no matter how many samples are observed.
+    """
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self) -> None:
+        # the extra bucket at the end is for anything above the last bound
+        self.counts: list[int] = [0] * (len(BUCKETS) + 1)
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+
+    def clear(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                lower = BUCKETS[index - 1] if index > 0 else 0.0
+                upper = BUCKETS[index] if index < len(BUCKETS) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / count, self.max)
+            seen += count
+        return self.max
+
+
+class CommandStats:
+    """Per command latency histograms and error counts, plus event loop lag."""
+
+    def __init__(self) -> None:
+        self.latencies: dict[str, LatencyHistogram] = {}
+        self.errors: Counter[str] = Counter()
+        self.loop_lag: LatencyHistogram = LatencyHistogram()
+        self.started_at: float = time.time()
+
+    def reset(self) -> None:
+        self.latencies.clear()
+        self.errors.clear()
+        self.loop_lag.clear()
+        self.started_at = time.time()
+
+    def record(self, name: str, seconds: float, *, failed: bool = False) -> None:
+        try:
+            histogram = self.latencies[name]
+        except KeyError:
+            histogram = self.latencies[name] = LatencyHistogram()
+
+        histogram.observe(seconds)
+        if failed:
+            self.errors[name] += 1
+
+    def top(self, limit: Optional[int] = None) -> list[tuple[str, LatencyHistogram]]:
+        """Commands ordered by the total time spent in them."""
+        items = sorted(self.latencies.items(), key=lambda item: item[1].total, reverse=True)
+        return items[:limit] if limit is not None else items
+
+    def prometheus(self, extra: Iterable[tuple[str, str, float]] = ()) -> str:
+        """Renders everything in the Prometheus text exposition format.
+
+        ``extra`` is an iterable of ``(name, help, value)`` gauges to append.
+        """
+        lines = [
+            '# HELP rucs_command_latency_seconds Command latency.',
+            '# TYPE rucs_command_latency_seconds histogram',
+        ]
+        for name, histogram in sorted(self.latencies.items()):
+            label = name.replace('\\', '\\\\').replace('"', '\\"')
+            cumulative = 0
+            for bound, count in zip(BUCKETS, histogram.counts):
+                cumulative += count
+                lines.append(f'rucs_command_latency_seconds_bucket{{command="{label}",le="{bound:g}"}} {cumulative}')
+            lines.append(f'rucs_command_latency_seconds_bucket{{command="{label}",le="+Inf"}} {histogram.count}')
+            lines.append(f'rucs_command_latency_seconds_sum{{command="{label}"}} {histogram.total}')
+            lines.append(f'rucs_command_latency_seconds_count{{command="{label}"}} {histogram.count}')
+
+        lines.append('# HELP rucs_command_errors_total Failed command invocations.')
+        lines.append('# TYPE rucs_command_errors_total counter')
+        for name, count in sorted(self.errors.items()):
+            label = name.replace('\\', '\\\\').replace('"', '\\"')
+            lines.append(f'rucs_command_errors_total{{command="{label}"}} {count}')
+
+        lines.append('# HELP rucs_event_loop_lag_seconds Event loop lag.')
+        lines.append('# TYPE rucs_event_loop_lag_seconds summary')
+        for q in (0.5, 0.95, 0.99):
+            lines.append(f'rucs_event_loop_lag_seconds{{quantile="{q}"}} {self.loop_lag.quantile(q)}')
+        lines.append(f'rucs_event_loop_lag_seconds_sum {self.loop_lag.total}')
+        lines.append(f'rucs_event_loop_lag_seconds_count {self.loop_lag.count}')
+
+        for name, description, value in extra:
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} gauge')
+            lines.append(f'{name} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up from a short sleep."""
+
+    def __init__(self, histogram: LatencyHistogram, *, interval: float = 0.5) -> None:
+        self.histogram: LatencyHistogram = histogram
+        self.interval: float = interval
+        self._task: Optional[asyncio.Task[None]] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.histogram.observe(max(0.0, loop.time() - expected))
+
+
+class MetricsExporter:
+    """Publishes :meth:`CommandStats.prometheus` output for a scraper.
+
+    The text is either rewritten to ``path`` every ``interval`` seconds, served
+    over HTTP on ``host:port`` at ``/metrics``, or both.
+    """
+
+    def __init__(
+            self,
+            render: Callable[[], str],
+            *,
+            path: Optional[str] = None,
+            host: str = '127.0.0.1',
+            port: Optional[int] = None,
+            interval: float = 15.0,
+    ) -> None:
+        self.render: Callable[[], str] = render
+        self.path: Optional[str] = path
+        self.host: str = host
+        self.port: Optional[int] = port
+        self.interval: float = interval
+        self._task: Optional[asyncio.Task[None]] = None
+        self._runner: Optional[web.AppRunner] = None
+
+    @classmethod
+    def from_env(cls, render: Callable[[], str]) -> Optional[MetricsExporter]:
+        """Reads ``METRICS_FILE``, ``METRICS_HOST``, ``METRICS_PORT`` and ``METRICS_INTERVAL``.
+
+        Returns ``None`` when neither a file nor a port is configured.
+        """
+        path = os.getenv('METRICS_FILE') or None
+        port = os.getenv('METRICS_PORT')
+        if path is None and not port:
+            return None
+
+        return cls(
+            render,
+            path=path,
+            host=os.getenv('METRICS_HOST', '127.0.0.1'),
+            port=int(port) if port else None,
+            interval=float(os.getenv('METRICS_INTERVAL', 15.0)),
+        )
+
+    async def start(self) -> None:
+        if self.path is not None and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._write_loop())
+
+        if self.port is not None and self._runner is None:
+            app = web.Application()
+            app.router.add_get('/metrics', self._handle)
+            self._runner = web.AppRunner(app, access_log=None)
+            await self._runner.setup()
+            await web.TCPSite(self._runner, self.host, self.port).start()
+            _log.info('Serving metrics on http://%s:%s/metrics', self.host, self.port)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        return web.Response(text=self.render(), content_type='text/plain', charset='utf-8')
+
+    def _write(self, text: str) -> None:
+        assert self.path is not None
+        # write next to the target and swap it in so a scraper never sees half a file
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix='.metrics-')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as fp:
+                fp.write(text)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    async def _write_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self._write, self.render())
+            except OSError:
+                _log.exception('Could not write metrics to %s', self.path)
+            await asyncio.sleep(self.interval)
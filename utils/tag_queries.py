@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from utils.queries import registry
+
+__all__ = (
+    'TAG_GET',
+    'TAG_SIMILAR',
+    'TAG_SEARCH',
+    'TAG_GUILD_NAMES',
+    'TAG_EXISTS',
+    'TAG_INSERT',
+    'TAG_EDIT',
+    'TAG_DELETE',
+    'TAG_DELETE_OWNED',
+    'TAG_SELECT_ID',
+    'TAG_SELECT_ID_OWNED',
+    'TAG_RENAME',
+    'TAG_LIST_FIRST',
+    'TAG_LIST_AFTER',
+    'TAG_LIST_LAST',
+    'TAG_LIST_BEFORE',
+    'TAG_LIST_AT',
+    'TAG_LIST_COUNT',
+    'TAG_LIST_OWNED_FIRST',
+    'TAG_LIST_OWNED_AFTER',
+    'TAG_LIST_OWNED_LAST',
+    'TAG_LIST_OWNED_BEFORE',
+    'TAG_LIST_OWNED_AT',
+    'TAG_LIST_OWNED_COUNT',
+    'TAG_INFO',
+)
+
+TAG_GET = registry.add(
+    'tag_get',
+    """SELECT id, name, content FROM rucs_tags WHERE guild_id=$1 AND LOWER(name)=$2;""",
+)
+
+TAG_SIMILAR = registry.add(
+    'tag_similar',
+    """SELECT     name
+       FROM       rucs_tags
+       WHERE      guild_id=$1 AND name % $2
+       ORDER BY   similarity(name, $2) DESC
+       LIMIT 3;
+    """,
+)
+
+TAG_SEARCH = registry.add(
+    'tag_search',
+    """SELECT     name, id
+       FROM       rucs_tags
+       WHERE      guild_id=$1 AND name % $2
+       ORDER BY   similarity(name, $2) DESC
+       LIMIT 100;
+    """,
+)
+
+TAG_GUILD_NAMES = registry.add(
+    'tag_guild_names',
+    """SELECT id, name FROM rucs_tags WHERE guild_id=$1;""",
+)
+
+TAG_EXISTS = registry.add(
+    'tag_exists',
+    """SELECT name FROM rucs_tags WHERE guild_id=$1 AND LOWER(name)=$2;""",
+)
+
+TAG_INSERT = registry.add(
+    'tag_insert',
+    """INSERT INTO rucs_tags(name, content, owner_id, guild_id) VALUES ($1, $2, $3, $4)
+       ON CONFLICT (guild_id, LOWER(name)) DO NOTHING
+       RETURNING id;
+    """,
+)
+
+TAG_EDIT = registry.add(
+    'tag_edit',
+    """UPDATE rucs_tags SET content=$1 WHERE LOWER(name)=$2 AND guild_id=$3 AND owner_id=$4 RETURNING id;""",
+)
+
+TAG_DELETE = registry.add(
+    'tag_delete',
+    """DELETE FROM rucs_tags WHERE LOWER(name)=$1 AND guild_id=$2 RETURNING name;""",
+)
+
+TAG_DELETE_OWNED = registry.add(
+    'tag_delete_owned',
+    """DELETE FROM rucs_tags WHERE LOWER(name)=$1 AND guild_id=$2 AND owner_id=$3 RETURNING name;""",
+)
+
+TAG_SELECT_ID = registry.add(
+    'tag_select_id',
+    """SELECT id FROM rucs_tags WHERE LOWER(name)=$1 AND guild_id=$2;""",
+)
+
+TAG_SELECT_ID_OWNED = registry.add(
+    'tag_select_id_owned',
+    """SELECT id FROM rucs_tags WHERE LOWER(name)=$1 AND guild_id=$2 AND owner_id=$3;""",
+)
+
+TAG_RENAME = registry.add(
+    'tag_rename',
+    """UPDATE rucs_tags SET name=$2 WHERE id=$1;""",
+)
+
+TAG_LIST_FIRST = registry.add(
+    'tag_list_first',
+    """SELECT name, id FROM rucs_tags WHERE guild_id=$1 ORDER BY name, id LIMIT $2;""",
+)
+
+TAG_LIST_AFTER = registry.add(
+    'tag_list_after',
+    """SELECT name, id FROM rucs_tags WHERE guild_id=$1 AND (name, id) > ($2, $3) ORDER BY name, id LIMIT $4;""",
+)
+
+TAG_LIST_LAST = registry.add(
+    'tag_list_last',
+    """SELECT name, id FROM rucs_tags WHERE guild_id=$1 ORDER BY name DESC, id DESC LIMIT $2;""",
+)
+
+TAG_LIST_BEFORE = registry.add(
+    'tag_list_before',
+    """SELECT name, id FROM rucs_tags WHERE guild_id=$1 AND (name, id) < ($2, $3) ORDER BY name DESC, id DESC LIMIT $4;""",
+)
+
+TAG_LIST_AT = registry.add(
+    'tag_list_at',
+    """SELECT name, id FROM rucs_tags WHERE guild_id=$1 ORDER BY name, id OFFSET $2 LIMIT $3;""",
+)
+
+TAG_LIST_COUNT = registry.add(
+    'tag_list_count',
+    """SELECT COUNT(*) FROM rucs_tags WHERE guild_id=$1;""",
+)
+
+TAG_LIST_OWNED_FIRST = registry.add(
+    'tag_list_owned_first',
+    """SELECT name, id FROM rucs_tags WHERE guild_id=$1 AND owner_id=$2 ORDER BY name, id LIMIT $3;""",
+)
+
+TAG_LIST_OWNED_AFTER = registry.add(
+    'tag_list_owned_after',
+    """SELECT name, id
+       FROM rucs_tags
+       WHERE guild_id=$1 AND owner_id=$2 AND (name, id) > ($3, $4)
+       ORDER BY name, id
+       LIMIT $5;
+    """,
+)
+
+TAG_LIST_OWNED_LAST = registry.add(
+    'tag_list_owned_last',
+    """SELECT name, id FROM rucs_tags WHERE guild_id=$1 AND owner_id=$2 ORDER BY name DESC, id DESC LIMIT $3;""",
+)
+
+TAG_LIST_OWNED_BEFORE = registry.add(
+    'tag_list_owned_before',
+    """SELECT name, id
+       FROM rucs_tags
+       WHERE guild_id=$1 AND owner_id=$2 AND (name, id) < ($3, $4)
+       ORDER BY name DESC, id DESC
+       LIMIT $5;
+    """,
+)
+
+TAG_LIST_OWNED_AT = registry.add(
+    'tag_list_owned_at',
+    """SELECT name, id FROM rucs_tags WHERE guild_id=$1 AND owner_id=$2 ORDER BY name, id OFFSET $3 LIMIT $4;""",
+)
+
+TAG_LIST_OWNED_COUNT = registry.add(
+    'tag_list_owned_count',
+    """SELECT COUNT(*) FROM rucs_tags WHERE guild_id=$1 AND owner_id=$2;""",
+)
+
+TAG_INFO = registry.add(
+    'tag_info',
+    """SELECT name, owner_id, created_at FROM rucs_tags WHERE LOWER(name)=$1 AND guild_id=$2;""",
+)
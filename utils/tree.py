@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import os
+import json
+import time
+import hashlib
+import logging
+from typing import TYPE_CHECKING, Any, Optional, Union
+
+import discord
+from discord import app_commands
+from discord.abc import Snowflake
+
+if TYPE_CHECKING:
+    from bot import RU_COMSCI_bot
+
+__all__ = (
+    'RUCommandTree',
+)
+
+_log = logging.getLogger(__name__)
+
+
+class RUCommandTree(app_commands.CommandTree['RU_COMSCI_bot']):
+    """Command tree that times every application command it dispatches.
+
+    It also remembers a hash of what was last synced per scope in
+    ``hash_file`` (``TREE_HASH_FILE``, ``.tree_hash`` by default) so
+    :meth:`sync_if_changed` can skip the upload when nothing changed.
+    """
+
+    def __init__(self, client: RU_COMSCI_bot, **kwargs: Any) -> None:
+        super().__init__(client, **kwargs)
+        self.hash_file: str = os.getenv('TREE_HASH_FILE', '.tree_hash')
+
+    def payload_hash(self, *, guild: Optional[Snowflake] = None) -> str:
+        """A stable hash of the payload :meth:`sync` would upload for ``guild``."""
+        payload = sorted(
+            (command.to_dict(self) for command in self.get_commands(guild=guild)),
+            key=lambda data: (data.get('type', 1), data['name']),
+        )
+        # the application is part of the hash so a token change always syncs
+        data = json.dumps([self.client.application_id, payload], sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def _read_hashes(self) -> dict[str, str]:
+        try:
+            with open(self.hash_file, encoding='utf-8') as fp:
+                return json.load(fp)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_hashes(self, hashes: dict[str, str]) -> None:
+        tmp = f'{self.hash_file}.tmp'
+        try:
+            with open(tmp, 'w', encoding='utf-8') as fp:
+                json.dump(hashes, fp, indent=2, sort_keys=True)
+            os.replace(tmp, self.hash_file)
+        except OSError:
+            _log.warning('Could not persist the command tree hash to %s', self.hash_file, exc_info=True)
+
+    async def sync_if_changed(
+            self,
+            *,
+            guild: Optional[Snowflake] = None,
+            force: bool = False,
+    ) -> Optional[list[app_commands.AppCommand]]:
+        """Syncs ``guild`` (or the global commands) only if the tree changed since the last sync.
+
+        Returns ``None`` when the sync was skipped.
+        """
+        scope = 'global' if guild is None else str(guild.id)
+        digest = self.payload_hash(guild=guild)
+        hashes = self._read_hashes()
+        if not force and hashes.get(scope) == digest:
+            _log.info('Command tree for %s is unchanged, skipping sync', scope)
+            return None
+
+        synced = await self.sync(guild=guild)
+        hashes[scope] = digest
+        self._write_hashes(hashes)
+        _log.info('Synced %d application commands for %s', len(synced), scope)
+        return synced
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        # runs right before the command is transformed and invoked
+        interaction.extras['started_at'] = time.perf_counter()
+        return True
+
+    def record(
+            self,
+            interaction: discord.Interaction,
+            command: Union[app_commands.Command, app_commands.ContextMenu, None],
+            *,
+            failed: bool = False,
+    ) -> None:
+        # hybrid commands are recorded by their Context instead
+        if interaction.extras.get('recorded'):
+            return
+
+        started_at = interaction.extras.get('started_at')
+        if started_at is None or command is None:
+            return
+
+        interaction.extras['recorded'] = True
+        name = command.qualified_name if isinstance(command, app_commands.Command) else command.name
+        self.client.command_stats.record(f'/{name}', time.perf_counter() - started_at, failed=failed)
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import os
+import sys
+import time
+import asyncio
+import logging
+from collections import Counter, OrderedDict
+from typing import Any, Optional
+
+import discord
+
+__all__ = (
+    'ViewManager',
+)
+
+_log = logging.getLogger(__name__)
+
+
+class _Tracked:
+    __slots__ = ('user_id', 'started_at')
+
+    def __init__(self, user_id: int) -> None:
+        self.user_id: int = user_id
+        self.started_at: float = time.monotonic()
+
+
+class ViewManager:
+    """Bounds how many interactive views wait for input at once.
+
+    Paginators and prompts register themselves with :meth:`track`. A user
+    gets at most ``per_user`` live views and the bot at most ``total``. Going
+    over either limit evicts the oldest view, which is timed out early: its
+    ``on_timeout`` runs and it stops, the same as if nobody had touched it.
+
+    Views that finish, by stopping, timing out or being evicted, are
+    forgotten and their ``release`` method is called if they have one, so
+    page sources and rendered pages can be dropped right away.
+    """
+
+    def __init__(self, *, per_user: int = 3, total: int = 200) -> None:
+        self.per_user: int = per_user
+        self.total: int = total
+        self.evictions: int = 0
+        self._views: OrderedDict[discord.ui.View, _Tracked] = OrderedDict()
+        self._by_user: dict[int, OrderedDict[discord.ui.View, None]] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    @classmethod
+    def from_env(cls) -> ViewManager:
+        """Reads ``VIEW_LIMIT_PER_USER`` and ``VIEW_LIMIT_TOTAL``."""
+        return cls(
+            per_user=int(os.getenv('VIEW_LIMIT_PER_USER', 3)),
+            total=int(os.getenv('VIEW_LIMIT_TOTAL', 200)),
+        )
+
+    def __len__(self) -> int:
+        return len(self._views)
+
+    def _spawn(self, coro: Any) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def track(self, view: discord.ui.View, user_id: int) -> None:
+        if view.is_finished() or view in self._views:
+            return
+
+        self._views[view] = _Tracked(user_id)
+        user_views = self._by_user.setdefault(user_id, OrderedDict())
+        user_views[view] = None
+        self._spawn(self._forget_when_done(view))
+
+        while len(user_views) > self.per_user:
+            self.evict(next(iter(user_views)))
+        while len(self._views) > self.total:
+            self.evict(next(iter(self._views)))
+
+    async def _forget_when_done(self, view: discord.ui.View) -> None:
+        # resolves on stop and on timeout
+        await view.wait()
+        self._forget(view)
+
+    def _forget(self, view: discord.ui.View) -> None:
+        tracked = self._views.pop(view, None)
+        if tracked is None:
+            return
+
+        user_views = self._by_user.get(tracked.user_id)
+        if user_views is not None:
+            user_views.pop(view, None)
+            if not user_views:
+                del self._by_user[tracked.user_id]
+
+        release = getattr(view, 'release', None)
+        if release is not None:
+            release()
+
+    def evict(self, view: discord.ui.View) -> None:
+        if view not in self._views:
+            return
+
+        self.evictions += 1
+        self._forget(view)
+        self._spawn(self._time_out(view))
+
+    async def _time_out(self, view: discord.ui.View) -> None:
+        try:
+            await view.on_timeout()
+        except discord.HTTPException:
+            pass
+        except Exception:
+            _log.exception('Error timing out evicted view %r', view)
+        finally:
+            view.stop()
+
+    def user_count(self, user_id: int) -> int:
+        return len(self._by_user.get(user_id, ()))
+
+    def counts(self) -> Counter[str]:
+        """Live views by class name."""
+        return Counter(type(view).__name__ for view in self._views)
+
+    def memory(self) -> int:
+        """Rough bytes held by the live views, using their ``memory`` method if they have one.
+
+        This walks page sources, so it's meant for commands, not for every metrics scrape.
+        """
+        total = 0
+        for view in self._views:
+            memory = getattr(view, 'memory', None)
+            total += memory() if memory is not None else sys.getsizeof(view)
+        return total
+
+    def oldest(self) -> Optional[float]:
+        """Seconds the oldest live view has been around."""
+        for tracked in self._views.values():
+            return time.monotonic() - tracked.started_at
+        return None